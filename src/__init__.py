@@ -5,17 +5,31 @@
 # ======================== ======================== ================================================ ======================== ========================
 from .data.project_dataset import ProjectDataset, describe_datasets, preload_datasets
 from .utils.data_utils import ExtraDatasetInfo
-from .plots.sentiment_analysis import mrt_get_scatterplots, mrt_get_boxplots
-from .utils.general_utils import display_all_plotly_figures as show_all
-from .plots.oscars import osc_get_awrd_win_prop, osc_get_awrd_win_comp, osc_get_prop_bo_per_country, osc_get_total_bo_per_country
-from .plots.genres import cmu_get_genres_split
-from .plots.subgenres import cmu_subgenre_get_multi_pies
-from .plots.timely import cmu_monthly_get_rev,cmu_yearly_get_dual_trends
-from .plots.plot import cmu_plots_get_topic_distributions,cmu_plots_get_money_distr
-from .plots.rating import get_rt_audience_tomato_corr
-from .utils.other_data_processing import *
+from .utils.cache_utils import memo_info, clear_memo
+from .utils.general_utils import display_all_plotly_figures as show_all, lazy_function
 from functools import partial
 
+# The plotting/analysis functions pull in heavy dependencies (spaCy, scikit-learn, plotly, seaborn, scipy, ipywidgets, ...)
+# They are therefore exported as lightweight proxies, which only import their module on first call (see `lazy_function`)
+_LAZY_EXPORTS = {
+    ".plots.sentiment_analysis": ["mrt_get_scatterplots", "mrt_get_boxplots"],
+    ".plots.oscars": ["osc_get_awrd_win_prop", "osc_get_awrd_win_comp", "osc_get_prop_bo_per_country", "osc_get_total_bo_per_country"],
+    ".plots.genres": ["cmu_get_genres_split"],
+    ".plots.subgenres": ["cmu_subgenre_get_multi_pies"],
+    ".plots.timely": ["cmu_monthly_get_rev", "cmu_yearly_get_dual_trends"],
+    ".plots.plot": ["cmu_plots_get_topic_distributions", "cmu_plots_get_money_distr"],
+    ".plots.rating": ["get_rt_audience_tomato_corr"],
+    ".utils.other_data_processing": ["filter_comedy_movies", "merge_movie_and_character_datasets", "process_and_merge_datasets",
+                                     "analyze_actor_associations", "compute_actor_pair_revenue_with_titles", "plot_actor_pair_revenue_tight",
+                                     "plot_collaboration_vs_revenue_with_logscale", "data_for_best_2_collaboration", "process_titles_and_visualize",
+                                     "filter_comedy_movies_sequels", "filter_dataframe", "extract_base_and_sequel", "data_part_1",
+                                     "plot_movie_suites", "plot_sequel_ratings"],
+    "ipywidgets": ["interact"],
+}
+for _module, _names in _LAZY_EXPORTS.items():
+    for _name in _names:
+        globals()[_name] = lazy_function(__name__+_module if _module.startswith(".") else _module, _name)
+
 # Constants
 # Dataset setups
 RAW_DATA_FOLDER = "data/raw/" # ! this is relative to the root of the file which will import this (i.e. the file calling `from src import *`)
@@ -33,6 +47,15 @@ CMU_MOVIES_DS = ProjectDataset(RAW_DATA_FOLDER+"movie.metadata.tsv",
                                     "languages": "The languages spoken in the movie. Dict[<Freebase Language Identifier String>:<Language>]",
                                     "countries": "The countries where the movie was produced or primarily associated. Dict[<Freebase Country Identifier String>:<Country>]",
                                     "genres": "Movie genre(s), such as action, drama, comedy, ..."
+                                },
+                               dtypes={
+                                    "wikipedia_id": "int32",
+                                    "freebase_id": "string[pyarrow]",
+                                    "title": "string[pyarrow]",
+                                    "runtime": "float32",
+                                    "languages": "string[pyarrow]",
+                                    "countries": "string[pyarrow]",
+                                    "genres": "string[pyarrow]"
                                 }
 )
 
@@ -52,7 +75,20 @@ CMU_CHARACTER_DS = ProjectDataset(RAW_DATA_FOLDER+"character.metadata.tsv",
                                         "freebase_character_map": "A UID or mapping of the character in the Freebase FB.",
                                         "freebase_character_id":"A UID identifying the character portrayed by the actor in the Freebase DB",
                                         "freebase_actor_id":  "A UID identifying the actor in the Freebase DB"
-                                    }
+                                    },
+                                  dtypes={
+                                        "wikipedia_id": "int32",
+                                        "freebase_id": "string[pyarrow]",
+                                        "character_name": "string[pyarrow]",
+                                        "actor_gender": "category",
+                                        "actor_height": "float32",
+                                        "actor_ethnicity": "category",
+                                        "actor_name": "string[pyarrow]",
+                                        "actor_age_at_movie_release": "float32",
+                                        "freebase_actor_id": "string[pyarrow]"
+                                    },
+                                  default_columns=["wikipedia_id","freebase_id","character_name","actor_dob","actor_gender","actor_height",
+                                                   "actor_ethnicity","actor_name","actor_age_at_movie_release","freebase_actor_id"]
                                   )
 
 CMU_PLOTS_DS = ProjectDataset(RAW_DATA_FOLDER+"plot_summaries.txt",
@@ -61,6 +97,10 @@ CMU_PLOTS_DS = ProjectDataset(RAW_DATA_FOLDER+"plot_summaries.txt",
                               {
                                   "wikipedia_id":"The UID corresponding to the movie",
                                   "plot": "The (summarized) plot of the movie"
+                              },
+                              dtypes={
+                                  "wikipedia_id": "int32",
+                                  "plot": "string[pyarrow]"
                               })
 
 MASSIVE_RT_MOVIE_DS = ProjectDataset(RAW_DATA_FOLDER+"rotten_tomatoes_movies.csv",
@@ -83,7 +123,23 @@ MASSIVE_RT_MOVIE_DS = ProjectDataset(RAW_DATA_FOLDER+"rotten_tomatoes_movies.csv
                                     "boxOffice": "The total box office earnings of the movie.",
                                     "distributor": "The company responsible for distributing the movie.",
                                     "soundMix": "The sound mixing format(s) used in the movie."
-                                }
+                                },
+                               dtypes={
+                                    "id": "string[pyarrow]",
+                                    "title": "string[pyarrow]",
+                                    "audienceScore": "float32",
+                                    "tomatoMeter": "float32",
+                                    "rating": "category",
+                                    "runtimeMinutes": "float32",
+                                    "genre": "string[pyarrow]",
+                                    "originalLanguage": "category",
+                                    "director": "string[pyarrow]",
+                                    "writer": "string[pyarrow]",
+                                    "boxOffice": "string[pyarrow]",
+                                    "distributor": "category"
+                                },
+                               default_columns=["id","title","audienceScore","tomatoMeter","rating","releaseDateTheaters","releaseDateStreaming",
+                                                "runtimeMinutes","genre","originalLanguage","director","writer","boxOffice","distributor"]
                             )
 
 MASSIVE_RT_REVIEW_DS = ProjectDataset(RAW_DATA_FOLDER+"rotten_tomatoes_movie_reviews.csv",
@@ -101,7 +157,21 @@ MASSIVE_RT_REVIEW_DS = ProjectDataset(RAW_DATA_FOLDER+"rotten_tomatoes_movie_rev
                                     "reviewText": "The full text of the critic review.",
                                     "scoreSentiment": "The sentiment of the critic's score (e.g., 'positive', 'negative', 'neutral').",
                                     "reviewUrl": "The url of the review"
-                                }
+                                },
+                               dtypes={
+                                    "id": "string[pyarrow]",
+                                    "creationDate": "string[pyarrow]",
+                                    "criticName": "string[pyarrow]",
+                                    "isTopCritic": "bool",
+                                    "originalScore": "string[pyarrow]",
+                                    "reviewState": "category",
+                                    "publicatioName": "category",
+                                    "reviewText": "string[pyarrow]",
+                                    "scoreSentiment": "category",
+                                    "reviewUrl": "string[pyarrow]"
+                                },
+                               # The review texts/urls are only needed by the NLP scripts, which stream them (see `ProjectDataset.iter_chunks`)
+                               default_columns=["id","reviewId","creationDate","criticName","isTopCritic","originalScore","reviewState","publicatioName","scoreSentiment"]
                             )
 
 RT_EXTRA_MOVIE_INFO_DS = ProjectDataset(RAW_DATA_FOLDER+"movie_info.csv",
@@ -113,6 +183,13 @@ RT_EXTRA_MOVIE_INFO_DS = ProjectDataset(RAW_DATA_FOLDER+"movie_info.csv",
                                             "release_date": "Release date of the movie (format is one of ['Released <DATE as text>',<YEAR>]).",
                                             "critic_score": "The rating given by professional critics.",
                                             "audience_score": "The rating given by the general audience."
+                                        },
+                                        dtypes={
+                                            "title": "string[pyarrow]",
+                                            "url": "string[pyarrow]",
+                                            "release_date": "string[pyarrow]",
+                                            "critic_score": "string[pyarrow]",
+                                            "audience_score": "string[pyarrow]"
                                         }
                                     )
 
@@ -127,6 +204,15 @@ OSCAR_AWARDS_DS = ProjectDataset(RAW_DATA_FOLDER+"the_oscar_award.csv",
                                         "name": "The name of the nominee/movie.",
                                         "film": "The title of the film for which the nominee was considered. Same as `name` whenever the whole film is nominated",
                                         "winner": "True or False, whether the nominated row won."
+                                    },
+                                    dtypes={
+                                        "year_film": "int16",
+                                        "year_ceremony": "int16",
+                                        "ceremony": "int16",
+                                        "category": "category",
+                                        "name": "string[pyarrow]",
+                                        "film": "string[pyarrow]",
+                                        "winner": "bool"
                                     }
                                 )
 
@@ -1,12 +1,24 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from functools import cached_property
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from threading import Lock, Thread, Event
+from time import perf_counter
+import hashlib
+import json
+import os
+import psutil
 import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
 from pathlib import Path
+from typing import Iterator
 from tqdm import tqdm
 from prettytable import PrettyTable
 from ..utils.general_utils import number_to_emoji
 
 VALID_FILETYPES = [".csv",".tsv",".txt"]
+CACHE_FOLDER_NAME = ".cache" # Created next to each raw file, holds the Arrow sidecars (see `ProjectDataset.cache_path`)
+CACHE_FORMAT_VERSION = 2 # Bump this whenever the way we parse the raw files changes, to invalidate all existing sidecars
 
 @dataclass
 class ProjectDataset:
@@ -16,17 +28,37 @@ class ProjectDataset:
     #     - `name` is how we decided to name the dataset, and how we will reference it in our Markdown explanations/report
     #     - `description` is a brief description of the dataset
     #     - `columns_descriptions` is a dictionnary containing all the columns of our dataset, as well as a short description for each of those columns
+    # Optionally :
+    #     - `dtypes` maps columns to the (compact) dtype they should be parsed as, e.g. "category", "bool", "int32" or "string[pyarrow]"
+    #       (columns which are not listed are inferred by pandas)
+    #     - `default_columns` is the projection loaded by `df` (all columns by default). Other columns can be loaded on demand with `load`
+    #     - `use_cache` (default True) controls whether the parsed dataframe is kept in an Arrow sidecar file (see `df`)
 
 
     path:str
     name:str
     description:str
     columns_descriptions:dict[str,str]
+    dtypes:dict[str,str] = field(default_factory=dict)
+    default_columns:list[str]|None = None
+    use_cache:bool = True
+    # Loaded lazily by `df`. The lock is per-dataset (unlike `cached_property`'s, which is shared by all instances in Python < 3.12),
+    # so that several datasets can be loaded concurrently, while accessing `df` still blocks until *this* dataset is ready
+    _df:pd.DataFrame|None = field(default=None,init=False,repr=False,compare=False)
+    _df_lock:Lock = field(default_factory=Lock,init=False,repr=False,compare=False)
+    _path_validated:bool = field(default=False,init=False,repr=False,compare=False)
 
     def __str__(self):
         return self.name
 
     def __post_init__(self):
+        # Only the (cheap) declarations are checked here: the path itself is validated on first access (see `validate_path`),
+        # so that defining all the datasets does not require all of the raw files to be present
+        self._validate_columns([*self.dtypes.keys(), *(self.default_columns or [])])
+
+    def validate_path(self):
+        if self._path_validated:
+            return
         p = Path(self.path)
         if not p.exists():
             raise ValueError(f"Path validation for {self}: {self.path} (-> {p.absolute().as_posix()}) does not exist!")
@@ -34,6 +66,12 @@ class ProjectDataset:
             raise ValueError(f"Path validation for {self}: {self.path} is not a file!")
         if p.suffix not in VALID_FILETYPES:
             raise ValueError(f"Path validation for {self}: {self.path} is not of the expected type (one of {', '.join(VALID_FILETYPES)}), but rather {p.suffix}!")
+        self._path_validated = True
+
+    def _validate_columns(self, columns):
+        unknown = set(columns) - self.columns_descriptions.keys()
+        if unknown:
+            raise ValueError(f"{self} has no column(s) {', '.join(sorted(unknown))}")
 
     @cached_property
     def __file_separator(self):
@@ -48,19 +86,224 @@ class ProjectDataset:
     def get_columns(self):
         return list(self.columns_descriptions.keys())
 
+    def get_default_columns(self):
+        return self.get_columns() if self.default_columns is None else list(self.default_columns)
+
     @cached_property
-    def df(self):
+    def cache_path(self) -> Path:
+        # The Arrow sidecar lives in a `.cache` folder next to the raw file, e.g. data/raw/.cache/movie.metadata.tsv.arrow
+        p = Path(self.path)
+        return p.parent / CACHE_FOLDER_NAME / (p.name + ".arrow")
+
+    def _source_fingerprint(self, with_hash=True) -> dict[str,str]:
+        # Key used to decide whether a sidecar is still valid: size, mtime and (optionally, as it requires reading the whole file) a content hash
+        self.validate_path()
+        stat = os.stat(self.path)
+        fingerprint = {"version":str(CACHE_FORMAT_VERSION),"dtypes":json.dumps(self.dtypes,sort_keys=True),"size":str(stat.st_size),"mtime_ns":str(stat.st_mtime_ns)}
+        if with_hash:
+            h = hashlib.blake2b(digest_size=16)
+            with open(self.path,"rb") as f:
+                for block in iter(lambda: f.read(1<<20), b""):
+                    h.update(block)
+            fingerprint["blake2b"] = h.hexdigest()
+        return fingerprint
+
+    def _read_csv_kwargs(self, columns: list[str]|None = None) -> dict:
         # Infer if file has headers heuristically by looking if it the first line is a string with no spaces and commas
         with open(self.path,"r") as f:
             first_line = f.readline()
             has_headers = " " not in first_line and ("," in first_line or first_line.lower().isalpha()) 
 
-        return pd.read_csv(
-            self.path,sep=self.__file_separator,
+        return dict(
+            sep=self.__file_separator,
             header=0 if has_headers else None,
-            names=self.columns_descriptions.keys()
+            names=self.columns_descriptions.keys(),
+            dtype={col:dtype for col,dtype in self.dtypes.items() if columns is None or col in columns}
         )
 
+    def _read_source(self, columns: list[str]|None = None, compact=True) -> pd.DataFrame:
+        # The "slow" path: parse (the given `columns` of) the raw CSV/TSV file, with the declared `dtypes` unless `compact` is False
+        self.validate_path()
+        return pd.read_csv(self.path,usecols=columns,**self._read_csv_kwargs(columns if compact else []))
+
+    def _cached_fingerprint(self) -> dict[str,str]|None:
+        # Reads the fingerprint stored in the schema metadata of the sidecar (cheap, only the footer is read)
+        if not self.cache_path.is_file():
+            return None
+        try:
+            with pa.memory_map(self.cache_path.as_posix(),"r") as source:
+                metadata = pa.ipc.open_file(source).schema.metadata or {}
+        except (pa.ArrowInvalid, OSError):
+            return None
+        raw = metadata.get(b"project_dataset_fingerprint")
+        return json.loads(raw) if raw is not None else None
+
+    def _open_cache_table(self) -> pa.Table|None:
+        # Returns the (memory-mapped) cached Arrow table if the sidecar is still valid for the current source file, None otherwise
+        cached = self._cached_fingerprint()
+        if cached is None:
+            return None
+        current = self._source_fingerprint(with_hash=False)
+        if any(cached.get(key) != current[key] for key in ["version","dtypes","size"]):
+            return None
+        if cached["mtime_ns"] == current["mtime_ns"]:
+            return self._load_cache_table()
+
+        # The file was touched (e.g. re-extracted from the zip): only trust the sidecar if the content is the same
+        current = self._source_fingerprint(with_hash=True)
+        if cached.get("blake2b") != current["blake2b"]:
+            return None
+        table = self._load_cache_table()
+        try:
+            # Refresh the stored mtime so that the next load does not need to hash the file again
+            self._write_cache_table(table, current)
+        except OSError:
+            pass # e.g. Windows refuses to replace a memory-mapped file -- we will simply hash again next time
+        return table
+
+    def _load_cache_table(self) -> pa.Table:
+        # The sidecar is uncompressed Arrow IPC, so it can be memory-mapped instead of being copied/decoded
+        return feather.read_table(self.cache_path.as_posix(),memory_map=True)
+
+    def _read_cache(self) -> pd.DataFrame|None:
+        table = self._open_cache_table()
+        return self._table_to_pandas(table) if table is not None else None
+
+    def _table_to_pandas(self, table: pa.Table) -> pd.DataFrame:
+        # Arrow -> pandas conversion which keeps the "string[pyarrow]" columns backed by Arrow (`to_pandas` would turn them into python strings)
+        arrow_strings = [col for col in table.column_names if self.dtypes.get(col) == "string[pyarrow]"]
+        df = table.drop_columns(arrow_strings).to_pandas()
+        for col in arrow_strings:
+            df[col] = pd.arrays.ArrowStringArray(table.column(col))
+        return df[table.column_names]
+
+    def _write_cache(self, df: pd.DataFrame, fingerprint: dict[str,str]):
+        self._write_cache_table(pa.Table.from_pandas(df), fingerprint)
+
+    def _write_cache_table(self, table: pa.Table, fingerprint: dict[str,str]):
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            b"project_dataset_fingerprint": json.dumps(fingerprint).encode()
+        })
+        self.cache_path.parent.mkdir(exist_ok=True)
+        # Write to a temporary file first, so that an interrupted write never leaves a corrupted sidecar behind
+        tmp_path = self.cache_path.with_suffix(".arrow.tmp")
+        feather.write_feather(table,tmp_path.as_posix(),compression="uncompressed")
+        os.replace(tmp_path,self.cache_path)
+
+    def clear_cache(self):
+        self.cache_path.unlink(missing_ok=True)
+        with self._df_lock:
+            self._df = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._df is not None
+
+    @property
+    def df(self):
+        # Loaded once, then kept in memory (see `_load`)
+        if self._df is None:
+            with self._df_lock:
+                if self._df is None: # Another thread (e.g. `preload_datasets`) may have loaded it while we were waiting
+                    self._df = self._load()
+        return self._df
+
+    def load(self, extra_columns: list[str]) -> pd.DataFrame:
+        # Same as `df`, but with some `extra_columns` which are not part of the default projection.
+        # The result is not kept in memory: use it for the (few) analyses needing e.g. the review texts
+        self._validate_columns(extra_columns)
+        return self._load(list(dict.fromkeys([*self.get_default_columns(), *extra_columns])))
+
+    def _load(self, columns: list[str]|None = None) -> pd.DataFrame:
+        # Transparently cached: the first load parses the (whole) raw file and writes an Arrow sidecar (see `cache_path`),
+        # later loads (e.g. in a new kernel) memory-map the sidecar as long as the raw file did not change, and only convert the needed columns
+        columns = columns or self.get_default_columns()
+        if not self.use_cache:
+            return self._read_source(columns)
+
+        table = self._open_cache_table()
+        if table is not None:
+            return self._table_to_pandas(table.select(columns))
+
+        df = self._read_source()
+        try:
+            self._write_cache(df, self._source_fingerprint())
+        except (pa.ArrowException, OSError) as e:
+            # Some columns mixing types cannot be represented in Arrow: simply fall back to the raw file every time
+            print(f"Could not cache {self} ({type(e).__name__}: {e}), it will be re-parsed from {self.path} on every load.")
+        return df if columns == self.get_columns() else df[columns]
+
+    def memory_footprint(self) -> int:
+        # In-memory size of `df`, in bytes
+        return int(self.df.memory_usage(deep=True).sum())
+
+    def footprint_report(self):
+        # Compares `df` to what a plain `pd.read_csv` (all columns, inferred dtypes) would take in memory. Parses the raw file!
+        naive = int(self._read_source(compact=False).memory_usage(deep=True).sum())
+        compact = self.memory_footprint()
+        print(f"{self}: {naive/2**20:.1f}MB with all columns and inferred dtypes -> {compact/2**20:.1f}MB "
+              f"with {len(self.get_default_columns())}/{len(self.columns_descriptions)} columns and compact dtypes (-{100*(1-compact/naive):.0f}%)")
+
+    def iter_chunks(self, chunksize: int = 100_000, columns: list[str]|None = None, filters: list[tuple]|None = None) -> Iterator[pd.DataFrame]:
+        """
+        Iterates over the dataset in fixed-size chunks, without ever materializing the whole dataframe (unlike `df`).
+        Reads from the Arrow sidecar when it is valid (zero-copy slices of the memory-mapped file), otherwise streams the raw file
+        with the same separator/header inference as `df`.
+
+        Args:
+            chunksize (int): Number of (raw) rows per chunk. Chunks can be smaller once `filters` are applied.
+            columns (list[str]|None): Columns to keep (the default projection, as for `df`, by default).
+            filters (list[tuple]|None): Conjunction of `(column, op, value)` conditions rows have to satisfy,
+                with `op` in ==, !=, <, <=, >, >=, in, not in. E.g. `[("isTopCritic","==",True), ("id","in",comedy_ids)]`
+
+        Yields:
+            pd.DataFrame: The successive chunks, with their index matching the row numbers in `df`.
+        """
+        self.validate_path()
+        filters = filters or []
+        columns = columns or self.get_default_columns()
+        self._validate_columns([*columns, *(col for col,_,_ in filters)])
+        # The filtered columns have to be read too, even if they are not part of the projection
+        read_columns = list(dict.fromkeys([*columns, *(col for col,_,_ in filters)]))
+
+        table = self._open_cache_table() if self.use_cache else None
+        if table is not None:
+            table = table.select(read_columns)
+            offset = 0
+            for batch in table.to_batches(max_chunksize=chunksize):
+                chunk = self._table_to_pandas(pa.Table.from_batches([batch]))
+                chunk.index = pd.RangeIndex(offset, offset+len(chunk))
+                offset += len(chunk)
+                yield _apply_filters(chunk, filters, columns)
+        else:
+            with pd.read_csv(self.path,chunksize=chunksize,usecols=read_columns,**self._read_csv_kwargs(read_columns)) as reader:
+                for chunk in reader:
+                    yield _apply_filters(chunk, filters, columns)
+
+
+_FILTER_OPS = {
+    "==": lambda s,v: s == v,
+    "!=": lambda s,v: s != v,
+    "<": lambda s,v: s < v,
+    "<=": lambda s,v: s <= v,
+    ">": lambda s,v: s > v,
+    ">=": lambda s,v: s >= v,
+    "in": lambda s,v: s.isin(v),
+    "not in": lambda s,v: ~s.isin(v),
+}
+
+def _apply_filters(chunk: pd.DataFrame, filters: list[tuple], columns: list[str]) -> pd.DataFrame:
+    # Applies the `(column, op, value)` filters of `ProjectDataset.iter_chunks`, then the column projection
+    if filters:
+        mask = pd.Series(True,index=chunk.index)
+        for col, op, value in filters:
+            if op not in _FILTER_OPS:
+                raise ValueError(f"Unknown filter operation {op} (expected one of {', '.join(_FILTER_OPS)})")
+            mask &= _FILTER_OPS[op](chunk[col], value)
+        chunk = chunk[mask]
+    return chunk[columns]
+
 
 def describe_datasets(all_datasets: list[ProjectDataset]):
     print(f"We will use {len(all_datasets)} datasets in total, namely {', '.join(str(ds) for ds in all_datasets)}.\
@@ -80,6 +323,127 @@ def describe_datasets(all_datasets: list[ProjectDataset]):
         print(table)
         print("\n")
 
-def preload_datasets(all_datasets: list[ProjectDataset]):
-    for dataset in tqdm(all_datasets,total=len(all_datasets),desc="Preloading datasets..."):
-        _ = dataset.df
\ No newline at end of file
+class _RSSSampler(Thread):
+    # Polls the resident memory of the process in the background, so that we can know the peak reached while a dataset was loading
+    # (with `include_children`, the memory of its child processes, e.g. the workers of a process pool, is added to it)
+    def __init__(self, interval=0.05, include_children=False):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.include_children = include_children
+        self.process = psutil.Process()
+        self.current = self.peak = self._rss()
+        self._peaks: dict[str,int] = {}
+        self._lock = Lock()
+        self._stop_event = Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+    def _rss(self) -> int:
+        rss = self.process.memory_info().rss
+        if self.include_children:
+            for child in self.process.children(recursive=True):
+                try:
+                    rss += child.memory_info().rss
+                except psutil.Error: # The child exited in the meantime
+                    pass
+        return rss
+
+    def sample(self):
+        rss = self._rss()
+        with self._lock:
+            self.current = rss
+            self.peak = max(self.peak, rss)
+            for key, peak in self._peaks.items():
+                self._peaks[key] = max(peak, rss)
+
+    def start_tracking(self, key: str) -> int:
+        self.sample()
+        with self._lock:
+            self._peaks[key] = self.current
+            return self.current
+
+    def stop_tracking(self, key: str) -> int:
+        self.sample()
+        with self._lock:
+            return self._peaks.pop(key)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def _timed_load(dataset: ProjectDataset, sampler: _RSSSampler) -> dict:
+    rss_before = sampler.start_tracking(dataset.name)
+    start = perf_counter()
+    try:
+        df = dataset.df
+    except BaseException:
+        sampler.stop_tracking(dataset.name)
+        raise
+    return {
+        "dataset": dataset,
+        "seconds": perf_counter() - start,
+        "peak_rss_delta": sampler.stop_tracking(dataset.name) - rss_before,
+        "df_bytes": df.memory_usage(deep=True).sum(),
+    }
+
+
+def _print_preload_report(results: list[dict], total_seconds: float, peak_rss: int):
+    table = PrettyTable()
+    table.field_names = ["Dataset", "Wall time (s)", "Peak RSS increase (MB)", "In-memory size (MB)"]
+    table.align["Dataset"] = "l"
+    for r in sorted(results, key=lambda r: r["seconds"], reverse=True):
+        table.add_row([r["dataset"].name, f"{r['seconds']:.2f}", f"{r['peak_rss_delta']/2**20:.0f}", f"{r['df_bytes']/2**20:.0f}"])
+    print(table)
+    print(f"Total: {total_seconds:.2f}s, peak RSS of the process: {peak_rss/2**20:.0f}MB")
+    print("(Datasets are loaded concurrently: the peak RSS increase of a dataset also includes the datasets loading at the same time)")
+
+
+def preload_datasets(all_datasets: list[ProjectDataset], max_workers: int|None = None, background=False, report=True) -> dict[str,Future]:
+    """
+    Loads all datasets concurrently, in a thread pool (parsing CSVs and reading Arrow sidecars mostly happen outside of the GIL).
+
+    Args:
+        all_datasets (list[ProjectDataset]): The datasets to load.
+        max_workers (int|None): Number of threads to use (default: one per dataset).
+        background (bool): If True, returns immediately. Accessing `ds.df` then only blocks until that particular dataset is loaded.
+        report (bool): Whether to print a per-dataset wall time and memory report once everything is loaded.
+
+    Returns:
+        dict[str,Future]: One future per dataset name, resolving to its timing/memory statistics.
+    """
+    sampler = _RSSSampler()
+    sampler.start()
+    executor = ThreadPoolExecutor(max_workers=max_workers or len(all_datasets),thread_name_prefix="preload")
+    start = perf_counter()
+    futures = {ds.name:executor.submit(_timed_load,ds,sampler) for ds in all_datasets}
+    executor.shutdown(wait=False)
+
+    def wait_and_report():
+        # The sampler is stopped whatever happens, and the failed datasets are reported (in the background, their exceptions would
+        # otherwise only show up when accessing their `df`); in the foreground, the first failure is then raised
+        names = {future:name for name,future in futures.items()}
+        results, failures = [], {}
+        try:
+            for future in tqdm(as_completed(futures.values()),total=len(futures),desc="Preloading datasets...",disable=background):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    failures[names[future]] = e
+        finally:
+            total_seconds = perf_counter() - start
+            sampler.sample()
+            sampler.stop()
+        if report and results:
+            _print_preload_report(results, total_seconds, sampler.peak)
+        for name, e in failures.items():
+            print(f"Failed to preload {name}: {type(e).__name__}: {e}")
+        if failures and not background:
+            raise next(iter(failures.values()))
+
+    if background:
+        Thread(target=wait_and_report,daemon=True,name="preload-report").start()
+    else:
+        wait_and_report()
+    return futures
@@ -0,0 +1,97 @@
+# Density rendering of the scatter plots with too many points to be drawn one by one (multi-MB notebooks, sluggish figures):
+# the points are aggregated on a 2D grid (in NumPy), and the regression line and the Pearson correlation are still computed on the raw data.
+# Used by `scatter_plot_corr` (sentiment_analysis.py) and `plot_audience_score_tomatoe_meter` (rating.py), which switch to it automatically
+# above `cfg.DENSITY_SCATTER_THRESHOLD` points.
+from dataclasses import dataclass
+import numpy as np
+import plotly.graph_objects as go
+from scipy.stats import pearsonr
+from ..utils.constants import NOTEBOOK_RUNCONFIG as cfg
+
+@dataclass
+class Density2D:
+    # Counts of the points per cell of a (x_bins, y_bins) grid, with the edges of the cells
+    counts: np.ndarray
+    x_edges: np.ndarray
+    y_edges: np.ndarray
+
+    @property
+    def x_centers(self) -> np.ndarray:
+        return (self.x_edges[:-1] + self.x_edges[1:]) / 2
+
+    @property
+    def y_centers(self) -> np.ndarray:
+        return (self.y_edges[:-1] + self.y_edges[1:]) / 2
+
+    def masked_counts(self) -> np.ndarray:
+        # (y, x) counts, with NaN for the empty cells (which are then left blank rather than drawn in the lowest color)
+        counts = self.counts.T.astype(np.float64)
+        counts[counts == 0] = np.nan
+        return counts
+
+
+def use_density(n_points: int, density: bool|None = None) -> bool:
+    # `density` forces the mode, None picks it from the number of points
+    return n_points > cfg.DENSITY_SCATTER_THRESHOLD if density is None else density
+
+def _edges(values: np.ndarray, bins: int) -> np.ndarray:
+    low, high = values.min(), values.max()
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    return np.linspace(low, high, bins + 1)
+
+def bin_2d(x, y, bins: int|None = None) -> Density2D:
+    """
+    Counts the (x, y) points per cell of a regular grid, with a single `np.bincount` on the flattened cell indices
+    (several times faster than `np.histogram2d`). Points with a NaN coordinate are dropped.
+
+    Args:
+        x, y (array-like): The coordinates of the points.
+        bins (int|None): Number of cells along each axis (`cfg.DENSITY_BINS` when None).
+
+    Returns:
+        Density2D: The counts and the edges of the grid.
+    """
+    bins = cfg.DENSITY_BINS if bins is None else bins
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[valid], y[valid]
+    if len(x) == 0:
+        return Density2D(np.zeros((bins, bins), dtype=np.int64), np.linspace(0, 1, bins + 1), np.linspace(0, 1, bins + 1))
+    x_edges, y_edges = _edges(x, bins), _edges(y, bins)
+    # The last edge is included in the last cell (like np.histogram2d)
+    x_idx = np.minimum(((x - x_edges[0]) / (x_edges[-1] - x_edges[0]) * bins).astype(np.int64), bins - 1)
+    y_idx = np.minimum(((y - y_edges[0]) / (y_edges[-1] - y_edges[0]) * bins).astype(np.int64), bins - 1)
+    counts = np.bincount(x_idx * bins + y_idx, minlength=bins * bins).reshape(bins, bins)
+    return Density2D(counts, x_edges, y_edges)
+
+def regression_line(x, y, n_points: int = 100) -> tuple[np.ndarray,np.ndarray,float,float]:
+    """
+    Least squares line and Pearson correlation of the raw points (whichever way they are drawn).
+
+    Returns:
+        tuple: The x and y of `n_points` points of the line over the range of x, the correlation and its p-value.
+    """
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    slope, intercept = np.polyfit(x, y, 1)
+    correlation, p_value = pearsonr(x, y)
+    x_line = np.linspace(x.min(), x.max(), n_points)
+    return x_line, slope * x_line + intercept, float(correlation), float(p_value)
+
+# ============ ============ Rendering ============ ============
+
+def density_heatmap(density: Density2D, name: str = "Density") -> go.Heatmap:
+    # The plotly trace of the density (the counts are log-scaled in the colors, as a few cells hold most of the points)
+    counts = density.masked_counts()
+    return go.Heatmap(x=density.x_centers, y=density.y_centers, z=np.log10(counts).round(3), customdata=counts, name=name,
+                      colorscale="Blues", colorbar=dict(title="Points", tickprefix="1e"),
+                      hovertemplate="x: %{x:.3g}<br>y: %{y:.3g}<br>points: %{customdata:.0f}<extra></extra>")
+
+def draw_density(ax, density: Density2D, cmap: str = "Blues"):
+    # The matplotlib counterpart of `density_heatmap`, on the axes `ax` (log-scaled colors)
+    from matplotlib.colors import LogNorm
+    counts = density.masked_counts()
+    mesh = ax.pcolormesh(density.x_edges, density.y_edges, np.ma.masked_invalid(counts), cmap=cmap,
+                         norm=LogNorm(vmin=1, vmax=max(np.nanmax(counts) if np.isfinite(counts).any() else 1, 1)))
+    ax.figure.colorbar(mesh, ax=ax, label="Points")
+    return mesh
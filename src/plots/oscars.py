@@ -336,10 +336,9 @@ else:
         return fig
     
 def _get_ccd(cmu_df,oscars_df):
-    renamed_oscars = rename_oscars_cols(oscars_df)
     cmu_cleaned = prepro_cmu_movies(cmu_df)
-    movies_awards_df = merge_ccmu_rosc(cmu_cleaned,renamed_oscars)
-    return prepare_award_comparison_data(movies_awards_df)
+    movie_award_summary = merge_ccmu_award_summary(cmu_cleaned,oscars_df)
+    return prepare_award_comparison_data(movie_award_summary)
 
 def osc_get_awrd_win_comp(cmu_df,oscars_df):
     return plot_comedy_vs_total_awards(_get_ccd(cmu_df,oscars_df), COLOR_PALETTE)
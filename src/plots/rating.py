@@ -10,9 +10,23 @@ import plotly.express as px
 import numpy as np
 import seaborn as sns
 from scipy import stats
+from .density import use_density, bin_2d, regression_line, density_heatmap, draw_density
 
 if cfg.USE_MATPLOTLIB:
-    def plot_audience_score_tomatoe_meter(df):
+    def plot_audience_score_tomatoe_meter(df, density=None):
+        if use_density(len(df), density):
+            # Too many movies to draw them one by one: their density, with the regression line and the correlation of the raw points
+            df = df.dropna(subset=['audienceScore', 'tomatoMeter'])
+            x_line, y_line, r_value, _ = regression_line(df['audienceScore'], df['tomatoMeter'])
+            f, ax = plt.subplots(figsize=(9, 6))
+            draw_density(ax, bin_2d(df['audienceScore'], df['tomatoMeter']))
+            ax.plot(x_line, y_line, color='red', label=f'Regression Line (r = {r_value:.2f})')
+            ax.legend()
+            ax.set_title("Relationship between Audience Score and Tomato Meter")
+            ax.set_xlabel("Audience Score (%)")
+            ax.set_ylabel("Critics' Score (Tomato Meter %)")
+            return f
+
         f = plt.figure(figsize=(8, 6))
         # Create a scatter plot with a regression line
         sns.lmplot(
@@ -31,7 +45,26 @@ if cfg.USE_MATPLOTLIB:
         return f
 else:
 
-    def plot_audience_score_tomatoe_meter(df):
+    def plot_audience_score_tomatoe_meter(df, density=None):
+        if use_density(len(df), density):
+            # Too many movies to draw them one by one: their density, with the regression line and the correlation of the raw points
+            df = df.dropna(subset=['audienceScore', 'tomatoMeter'])
+            x_line, y_line, r_value, _ = regression_line(df['audienceScore'], df['tomatoMeter'])
+            fig = go.Figure(density_heatmap(bin_2d(df['audienceScore'], df['tomatoMeter'])))
+            fig.add_trace(go.Scatter(x=x_line, y=y_line, mode='lines', name=f'Regression Line (r = {r_value:.2f})',
+                                     line=dict(color='red'), hoverinfo='skip'))
+            fig.update_layout(
+                title={'text': 'Relationship between Audience Score and Tomato Meter', 'y': 0.95, 'x': 0.5,
+                       'xanchor': 'center', 'yanchor': 'top'},
+                xaxis_title='Audience Score (%)',
+                yaxis_title="Critics' Score (Tomato Meter %)",
+                width=800,
+                height=600,
+                showlegend=True,
+                template='plotly_white'
+            )
+            return fig
+
         # Create the scatter plot
         fig = px.scatter(
             df,
@@ -82,5 +115,5 @@ else:
 
         return fig
 
-def get_rt_audience_tomato_corr(mrt_movies):
-    return plot_audience_score_tomatoe_meter(data_corr_analysis(mrt_movies))
\ No newline at end of file
+def get_rt_audience_tomato_corr(mrt_movies, density=None):
+    return plot_audience_score_tomatoe_meter(data_corr_analysis(mrt_movies), density)
\ No newline at end of file
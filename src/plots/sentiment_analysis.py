@@ -1,21 +1,34 @@
 # This file contains the code for generating the 2 plots used for intefence from the sentiment analysis data
 import plotly.express as px
 import plotly.graph_objects as go
-from scipy.stats import pearsonr, ttest_ind
+from scipy.stats import pearsonr
 import pandas as pd
 import numpy as np
 from functools import partial, cache
-from ..utils.data_utils import mrt_preprocess_df
+from ..utils.data_utils import mrt_preprocess_cells, mrt_cells_from_aggregates, mrt_cell_view
+from ..utils.cache_utils import memoize_frames
+from ..utils.stats_utils import compare_groups, QuantileSketch, BoxStats
+from .density import use_density, bin_2d, regression_line, density_heatmap, draw_density
 import matplotlib.pyplot as plt
 import seaborn as sns
 from ..utils.constants import NOTEBOOK_RUNCONFIG as cfg
 
 if cfg.USE_MATPLOTLIB:
     ## MATPLOTLIB VERSION
-    def scatter_plot_corr(df_tuple, col1, col2, merge_col, movie_type):
+    def scatter_plot_corr(df_tuple, col1, col2, merge_col, movie_type, density=None):
         df1,df2 = df_tuple 
         df_corr = pd.merge(df1, df2, on=merge_col)
-        
+        if use_density(len(df_corr), density):
+            # Too many points to draw them one by one: their density, with the regression line and the correlation of the raw points
+            x_line, y_line, correlation_value, _ = regression_line(df_corr[col1], df_corr[col2])
+            f, ax = plt.subplots(figsize=(8, 6))
+            draw_density(ax, bin_2d(df_corr[col1], df_corr[col2]))
+            ax.plot(x_line, y_line, color="red")
+            ax.set_title(f"Density of the {len(df_corr)} movies with correlation {movie_type}: {correlation_value:.2f}")
+            ax.set_xlabel(col1)
+            ax.set_ylabel(col2)
+            return f
+
         #correlation_value = df_corr[col1].corr(df_corr[col2])
         correlation_value, p_value = pearsonr(df_corr[col1], df_corr[col2]) 
         f = plt.figure(figsize=(8, 6))
@@ -34,11 +47,11 @@ if cfg.USE_MATPLOTLIB:
         comedies = df_comedy_sa[column]
         not_comedies = df_not_comedy_sa[column]
 
-        t_stat, p_value = ttest_ind(comedies, not_comedies, equal_var=False)
-        print(f"T-Statistic: {t_stat:.2f}")
-        print(f"P-Value: {p_value:.4f}")
+        # Welch's t-test, and the resampling-based p-value and CI (the per-movie distributions are skewed)
+        comparison = compare_groups(comedies, not_comedies)
+        print(comparison.summary())
 
-        if p_value < 0.05:
+        if comparison.p_permutation < 0.05:
             print("Conclusion: Significant difference between the two groups.")
         else:
             print("Conclusion: No significant difference between the two groups.")
@@ -60,10 +73,24 @@ if cfg.USE_MATPLOTLIB:
 else:
     ## PLOTLY VERSION
 
-    def scatter_plot_corr(df_tuple, col1, col2, merge_col, movie_type):
+    def scatter_plot_corr(df_tuple, col1, col2, merge_col, movie_type, density=None):
         df1, df2 = df_tuple
         df_corr = pd.merge(df1, df2, on=merge_col)
-        
+        if use_density(len(df_corr), density):
+            # Too many points to draw them one by one: their density, with the regression line and the correlation of the raw points
+            x_line, y_line, correlation_value, _ = regression_line(df_corr[col1], df_corr[col2])
+            fig = go.Figure(density_heatmap(bin_2d(df_corr[col1], df_corr[col2])))
+            fig.add_trace(go.Scatter(x=x_line, y=y_line, mode='lines', name='Regression line', line=dict(color='red')))
+            fig.update_layout(
+                title=f"Density of the {len(df_corr)} movies with correlation {movie_type}: {correlation_value:.2f}",
+                xaxis_title=col1,
+                yaxis_title=col2,
+                showlegend=True,
+                height=600,
+                width=800
+            )
+            return fig
+
         correlation_value, _ = pearsonr(df_corr[col1], df_corr[col2])
         
         # Regression line
@@ -106,6 +133,14 @@ else:
         
         return fig
 
+    def sketch_box_traces(stats: BoxStats, name: str, color: str) -> list:
+        # A box from precomputed statistics (see `QuantileSketch.box_stats`), and its sampled outliers (which `go.Box` only draws from raw values)
+        box = go.Box(x=[name], q1=[stats.q1], median=[stats.median], q3=[stats.q3], lowerfence=[stats.lowerfence],
+                     upperfence=[stats.upperfence], mean=[stats.mean], sd=[stats.sd], name=name, marker_color=color)
+        outliers = go.Scatter(x=[name] * len(stats.outliers), y=stats.outliers, mode='markers', name=f'{name} outliers',
+                              marker=dict(color=color, size=4, opacity=0.6), showlegend=False)
+        return [box, outliers]
+
     def ttest_and_boxplot(df_comedy_tuple, df_not_comedy_tuple, column, expert_str):
         df_comedy_score, df_comedy_sa = df_comedy_tuple
         df_not_comedy_score, df_not_comedy_sa = df_not_comedy_tuple
@@ -113,28 +148,24 @@ else:
         comedies = df_comedy_sa[column]
         not_comedies = df_not_comedy_sa[column]
         
-        # Perform t-test
-        t_stat, p_value = ttest_ind(comedies, not_comedies, equal_var=False)
+        # Welch's t-test, and the resampling-based p-value and CI (the per-movie distributions are skewed)
+        comparison = compare_groups(comedies, not_comedies)
         
-        # Temporary dfs used for the visualization only
-        comedies_df = pd.DataFrame({column: comedies, 'Group': 'Comedy'})
-        not_comedies_df = pd.DataFrame({column: not_comedies, 'Group': 'Non-Comedy'})
-        combined_df = pd.concat([comedies_df, not_comedies_df])
-        summary_stats = combined_df.groupby('Group')[column]
+        # The boxes are drawn from quantile sketches of the groups: the figure holds O(1) values per group, rather than all of them
+        sketches = {'Comedy': QuantileSketch.from_values(comedies), 'Non-Comedy': QuantileSketch.from_values(not_comedies)}
+        summary_stats = pd.DataFrame({group: sketch.describe() for group, sketch in sketches.items()}).T.rename_axis('Group')
 
         # Create box plots for each group
         fig = go.Figure()
-        for group in ['Comedy', 'Non-Comedy']:
-            fig.add_trace(go.Box(
-                y=combined_df[combined_df['Group'] == group][column],
-                name=group,
-                boxpoints='outliers'
-            ))
+        for (group, sketch), color in zip(sketches.items(), px.colors.qualitative.Plotly):
+            fig.add_traces(sketch_box_traces(sketch.box_stats(), group, color))
         
         # Update layout
         fig.update_layout(
             title=f"{column} distribution of {expert_str}: Comedy vs. Non-Comedy<br>"+
-                f"T-Statistic: {t_stat:.2f}, P-Value: {p_value:.4f}",
+                f"T-Statistic: {comparison.t_stat:.2f}, P-Value: {comparison.p_ttest:.4f}, "+
+                f"Permutation P-Value: {comparison.p_permutation:.4f}, "+
+                f"{comparison.confidence:.0%} CI: [{comparison.ci_low:.3f}, {comparison.ci_high:.3f}]",
             xaxis_title="Movie Type",
             yaxis_title=column,
             height=600,
@@ -142,31 +173,40 @@ else:
         )
         
         # Print statistical results
-        print(f"T-Statistic: {t_stat:.2f}")
-        print(f"P-Value: {p_value:.4f}")
-        print("Conclusion:", "Significant difference between the two groups." if p_value < 0.05 
+        print(comparison.summary())
+        print("Conclusion:", "Significant difference between the two groups." if comparison.p_permutation < 0.05 
             else "No significant difference between the two groups.")
         print("\nSummary Statistics:")
-        print(summary_stats.describe())
+        print(summary_stats)
         
         return fig
 
 
-# @cache would have been very relevant -- unfortunately, it is not possible without monkey patching a custom dataframe hash
+def _mrt_cells(sa_df, col1, col2, merge_col, ci_df):
+    # The cells of the reviews of `EDI` are read from its per-movie aggregates (see `mrt_cells_from_aggregates`) rather than computed
+    # again from the 1.4M reviews; any other reviews (or columns) go through a single pass over them (see `mrt_preprocess_cells`)
+    from .. import EDI
+    if sa_df is EDI.__dict__.get('mrtrev_sa_df') and (col1, col2, merge_col) == ('originalScore', 'sa', 'id'):
+        return mrt_cells_from_aggregates(EDI.mrt_movie_aggregates, ci_df, col1, col2, merge_col)
+    return mrt_preprocess_cells(sa_df, col1, col2, merge_col, ci_df, use_zscore=False)
+
+# Memoized (see `memoize_frames`): the scatter plots and the boxplots are built from the same four dataframes
+@memoize_frames(persist=True)
 def _mrt_get_dfs(sa_df,col1, col2, merge_col,ci_df):
-    preprocess_func = partial(mrt_preprocess_df,df=sa_df, col1=col1, col2=col2, merge_col=merge_col,comedy_ids=ci_df,use_zscore=False) 
+    cells = _mrt_cells(sa_df, col1, col2, merge_col, ci_df)
+    cell_view = partial(mrt_cell_view, cells, col1, col2, merge_col)
 
-    df_expert_comedies= preprocess_func(expert=True, comedy=True)
-    df_non_expert_comedies = preprocess_func(expert=False, comedy=True)
-    df_expert_not_comedies = preprocess_func(expert=True, comedy=False)
-    df_non_expert_not_comedies = preprocess_func(expert=False, comedy=False)
+    df_expert_comedies= cell_view(expert=True, comedy=True)
+    df_non_expert_comedies = cell_view(expert=False, comedy=True)
+    df_expert_not_comedies = cell_view(expert=True, comedy=False)
+    df_non_expert_not_comedies = cell_view(expert=False, comedy=False)
 
     return [df_expert_comedies,df_non_expert_comedies,df_expert_not_comedies,df_non_expert_not_comedies]
 
 
-def mrt_get_scatterplots(sa_df,col1, col2, merge_col,ci_df):
-    # Gets the first scatter plots of the data story
-    return [scatter_plot_corr(df, 'originalScore' ,'sa', 'id',title) for df,title in zip(_mrt_get_dfs(sa_df,col1, col2, merge_col,ci_df),['for comedies reviewed by experts','for comedies reviewed by non experts','for movies without comedies reviewed by experts', 'for movies without comedies reviewed by non-experts'])]
+def mrt_get_scatterplots(sa_df,col1, col2, merge_col,ci_df,density=None):
+    # Gets the first scatter plots of the data story (drawn as densities above `cfg.DENSITY_SCATTER_THRESHOLD` movies, unless `density` is given)
+    return [scatter_plot_corr(df, 'originalScore' ,'sa', 'id',title,density) for df,title in zip(_mrt_get_dfs(sa_df,col1, col2, merge_col,ci_df),['for comedies reviewed by experts','for comedies reviewed by non experts','for movies without comedies reviewed by experts', 'for movies without comedies reviewed by non-experts'])]
 
 def mrt_get_boxplots(sa_df,col1, col2, merge_col,ci_df):
     # Get the boxplots of the data story
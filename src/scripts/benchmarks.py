@@ -0,0 +1,456 @@
+# Benchmarks for the performance-related helpers of the project.
+# Run them from the root of the repository (like the other scripts), e.g. :
+#     python -m src.scripts.benchmarks dataset_cache
+import argparse
+import json
+import subprocess
+import sys
+from time import perf_counter
+from prettytable import PrettyTable
+
+
+def _timed(func, *args, **kwargs):
+    # Returns (result, elapsed seconds) of `func(*args, **kwargs)`
+    start = perf_counter()
+    result = func(*args, **kwargs)
+    return result, perf_counter() - start
+
+
+def bench_dataset_cache():
+    # Compares parsing the raw CSV/TSV files to memory-mapping their Arrow sidecars (see `ProjectDataset.df`)
+    from src import ALL_DATASETS
+
+    table = PrettyTable()
+    table.field_names = ["Dataset", "Rows", "CSV (s)", "Sidecar (s)", "Speedup"]
+    for ds in ALL_DATASETS:
+        source_df, source_time = _timed(ds._read_source)
+        if ds._read_cache() is None:
+            ds._write_cache(source_df, ds._source_fingerprint())
+        _, cache_time = _timed(ds._read_cache)
+        table.add_row([ds.name, len(source_df), f"{source_time:.2f}", f"{cache_time:.3f}", f"x{source_time/cache_time:.1f}"])
+    print(table)
+
+
+def bench_dataset_footprint():
+    # In-memory size of each dataset, with vs without the declared column projections and compact dtypes
+    from src import ALL_DATASETS
+
+    for ds in ALL_DATASETS:
+        ds.footprint_report()
+
+
+def bench_freebase_parser():
+    # `ast.literal_eval` row by row vs `parse_freebase_column` on the Freebase dict columns of the CMU movies
+    import ast
+    from src import CMU_MOVIES_DS
+    from src.utils.freebase_utils import parse_freebase_column
+
+    table = PrettyTable()
+    table.field_names = ["Column", "Rows", "literal_eval (s)", "Bulk parser (s)", "Bulk parser + lists (s)", "Speedup", "Same output"]
+    for col in ["languages", "countries", "genres"]:
+        column = CMU_MOVIES_DS.df[col]
+        reference, eval_time = _timed(lambda: column.apply(lambda cell: list(ast.literal_eval(cell).values())).tolist())
+        parsed, parse_time = _timed(parse_freebase_column, column)
+        lists, lists_time = _timed(parsed.to_lists)
+        table.add_row([col, len(column), f"{eval_time:.2f}", f"{parse_time:.3f}", f"{parse_time+lists_time:.3f}",
+                       f"x{eval_time/parse_time:.1f}", lists == reference])
+    print(table)
+
+
+def _reference_mrt_preprocess_df(df, col1, col2, merge_col, expert, comedy_ids, comedy):
+    # The former implementation of `mrt_preprocess_df`: one filter/copy/standardization/two groupbys per (expert, comedy) cell
+    from src.utils.data_utils import mrt_standardize_score
+    from src.utils.general_utils import normalize_sa
+
+    df = df[df['isTopCritic'] == expert].copy()
+    df = df[df[merge_col].isin(comedy_ids)] if comedy else df[~df[merge_col].isin(comedy_ids)]
+    df[col1] = df[col1].apply(mrt_standardize_score)
+    df[col2] = df[col2].apply(normalize_sa)
+    return df.groupby(merge_col)[col1].mean().reset_index().dropna(), df.groupby(merge_col)[col2].mean().reset_index().dropna()
+
+def bench_mrt_preprocess():
+    # Four `mrt_preprocess_df` calls (one per (expert, comedy) cell) vs the single pass of `mrt_preprocess_cells`, on `reviews_with_compound.csv`
+    import pandas as pd
+    from src import EDI
+    from src.utils.data_utils import _mrt_preprocess_cells, mrt_cell_view, mrt_preprocess_cells
+
+    (sa_df, comedy_ids), load_time = _timed(lambda: (EDI.mrtrev_sa_df, EDI.mrt_cmu_expertrevd_comedy_ids))
+    args = ('originalScore', 'sa', 'id')
+    cells_keys = [(True, True), (False, True), (True, False), (False, False)]
+
+    reference, reference_time = _timed(lambda: [_reference_mrt_preprocess_df(sa_df, *args, expert, comedy_ids, comedy) for expert, comedy in cells_keys])
+    _mrt_preprocess_cells.cache_clear() # Without the memoization
+    cells, cells_time = _timed(mrt_preprocess_cells, sa_df, *args, comedy_ids, use_zscore=False, all_formats=False, normalize_by=None)
+    views, views_time = _timed(lambda: [mrt_cell_view(cells, *args, expert, comedy) for expert, comedy in cells_keys])
+    same = True
+    for ref_dfs, dfs in zip(reference, views):
+        for ref_df, df in zip(ref_dfs, dfs):
+            try:
+                pd.testing.assert_frame_equal(ref_df, df)
+            except AssertionError:
+                same = False
+
+    table = PrettyTable()
+    table.field_names = ["Reviews", "Load (s)", "4 x mrt_preprocess_df (s)", "Single pass (s)", "4 views (s)", "Speedup", "Same output"]
+    table.add_row([len(sa_df), f"{load_time:.2f}", f"{reference_time:.2f}", f"{cells_time:.2f}", f"{views_time:.3f}",
+                   f"x{reference_time/(cells_time+views_time):.1f}", same])
+    print(table)
+
+
+def bench_score_normalizer():
+    # `.apply(mrt_standardize_score)` vs `mrt_normalize_scores` on the `originalScore` of the MRT reviews: time, and share of the scores understood
+    import numpy as np
+    from src import EDI
+    from src.utils.data_utils import mrt_standardize_score, mrt_normalize_scores, ScoreStatus
+
+    scores = EDI.mrtrev_sa_df['originalScore']
+    reference, reference_time = _timed(scores.apply, mrt_standardize_score)
+    normalized, normalized_time = _timed(mrt_normalize_scores, scores)
+    both = reference.notna() & normalized['score'].notna()
+    agree = np.allclose(reference[both], normalized.loc[both, 'score'], atol=1e-6)
+
+    table = PrettyTable()
+    table.field_names = ["Reviews", ".apply (s)", "Vectorized (s)", "Speedup", "Same fraction scores"]
+    table.add_row([len(scores), f"{reference_time:.2f}", f"{normalized_time:.3f}", f"x{reference_time/normalized_time:.1f}", agree])
+    print(table)
+
+    n_scores = int((normalized['status'] != ScoreStatus.MISSING).sum())
+    table = PrettyTable()
+    table.field_names = ["Status", "Reviews", "Share of the given scores"]
+    for status in ScoreStatus:
+        count = int((normalized['status'] == status).sum())
+        table.add_row([status.name, count, "" if status == ScoreStatus.MISSING else f"{count/max(n_scores,1):.1%}"])
+    print(table)
+    old_coverage, new_coverage = reference.notna().sum() / max(n_scores,1), normalized['score'].notna().sum() / max(n_scores,1)
+    print(f"Coverage of the given scores: {old_coverage:.1%} (mrt_standardize_score) -> {new_coverage:.1%} (mrt_normalize_scores)")
+
+
+def _reference_resampling(a, b, n_resamples, seed=0):
+    # One permutation and one bootstrap resampling per Python iteration
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    pooled, observed = np.concatenate([a, b]), a.mean() - b.mean()
+    n_extreme, differences = 0, []
+    for _ in range(n_resamples):
+        shuffled = rng.permutation(pooled)
+        n_extreme += abs(shuffled[:len(a)].mean() - shuffled[len(a):].mean()) >= abs(observed)
+        differences.append(rng.choice(a, len(a)).mean() - rng.choice(b, len(b)).mean())
+    return (n_extreme + 1) / (n_resamples + 1), tuple(np.quantile(differences, [0.025, 0.975]))
+
+def bench_resampling(n_resamples=2_000):
+    # Python loop vs the blocked replicates of `src/utils/stats_utils.py` (1 process, then all the cores),
+    # on the per-movie sentiment of the comedies vs the other movies (reviewed by non-experts, like the second boxplot of the data story)
+    import os
+    from src import EDI
+    from src.utils.data_utils import mrt_preprocess_cells, mrt_cell_view
+    from src.utils.stats_utils import permutation_test, bootstrap_ci
+
+    cells = mrt_preprocess_cells(EDI.mrtrev_sa_df, 'originalScore', 'sa', 'id', EDI.mrt_cmu_expertrevd_comedy_ids)
+    comedies = mrt_cell_view(cells, 'originalScore', 'sa', 'id', expert=False, comedy=True)[1]['sa'].to_numpy()
+    not_comedies = mrt_cell_view(cells, 'originalScore', 'sa', 'id', expert=False, comedy=False)[1]['sa'].to_numpy()
+
+    table = PrettyTable()
+    table.field_names = ["Movies", "Replicates", "Method", "Time (s)", "Speedup", "Permutation p", "95% bootstrap CI"]
+    (p_value, ci), reference_time = _timed(_reference_resampling, comedies, not_comedies, n_resamples)
+    table.add_row([f"{len(comedies)} vs {len(not_comedies)}", n_resamples, "Python loop", f"{reference_time:.2f}", "x1.0",
+                   f"{p_value:.4f}", f"[{ci[0]:.4f}, {ci[1]:.4f}]"])
+    for n_jobs in sorted({1, os.cpu_count()}):
+        ((_, p_value), ci), elapsed = _timed(lambda: (permutation_test(comedies, not_comedies, n_resamples=n_resamples, n_jobs=n_jobs),
+                                                      bootstrap_ci(comedies, not_comedies, n_resamples=n_resamples, n_jobs=n_jobs)))
+        table.add_row([f"{len(comedies)} vs {len(not_comedies)}", n_resamples, f"Blocks, {n_jobs} process(es)", f"{elapsed:.2f}",
+                       f"x{reference_time/elapsed:.1f}", f"{p_value:.4f}", f"[{ci[0]:.4f}, {ci[1]:.4f}]"])
+    print(table)
+
+
+def _figure_payload(fig) -> int:
+    # Size of the figure as embedded in a notebook: its JSON for plotly, its PNG for matplotlib
+    if hasattr(fig, "to_json"):
+        return len(fig.to_json())
+    import io
+    import matplotlib.pyplot as plt
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    plt.close(fig)
+    return buffer.tell()
+
+def bench_density_scatter(sizes=(2_000, 20_000, 200_000)):
+    # `scatter_plot_corr` drawing every point vs the density mode (with the backend of `cfg`): time to build and render the figure
+    # (serialize it for plotly, draw it as a PNG for matplotlib), and size of the payload embedded in the notebook
+    import numpy as np
+    import pandas as pd
+    from src.plots.density import bin_2d
+    from src.plots.sentiment_analysis import scatter_plot_corr
+    from src.utils.constants import NOTEBOOK_RUNCONFIG as cfg
+
+    rng = np.random.default_rng(0)
+    table = PrettyTable()
+    table.field_names = ["Points", "Backend", "Mode", "Build + render (s)", "Payload (KB)", "Payload ratio"]
+    for n in sizes:
+        ids = np.arange(n)
+        scores = rng.beta(5, 2, n)
+        df_tuple = (pd.DataFrame({'id': ids, 'originalScore': scores}),
+                    pd.DataFrame({'id': ids, 'sa': np.clip(scores * 0.3 + rng.normal(0.35, 0.1, n), 0, 1)}))
+        payloads = {}
+        for density in (False, True):
+            payloads[density], elapsed = _timed(lambda: _figure_payload(scatter_plot_corr(df_tuple, 'originalScore', 'sa', 'id', '', density)))
+            table.add_row([n, "matplotlib" if cfg.USE_MATPLOTLIB else "plotly", "density" if density else "points", f"{elapsed:.2f}",
+                           f"{payloads[density]/2**10:.0f}", "" if not density else f"/{payloads[False]/payloads[True]:.0f}"])
+    print(table)
+    print(f"Density mode above {cfg.DENSITY_SCATTER_THRESHOLD} points (cfg.DENSITY_SCATTER_THRESHOLD), on a {cfg.DENSITY_BINS}x{cfg.DENSITY_BINS} grid")
+
+    x, y = rng.random(2_000_000), rng.random(2_000_000)
+    _, bincount_time = _timed(bin_2d, x, y)
+    _, histogram_time = _timed(np.histogram2d, x, y, bins=cfg.DENSITY_BINS)
+    print(f"Binning 2M points: {bincount_time:.3f}s (bin_2d) vs {histogram_time:.3f}s (np.histogram2d)")
+
+
+def bench_box_sketch(n_values=2_000_000, n_chunks=20):
+    # Boxplot of review-level values (two groups) from the raw values vs from `QuantileSketch`es built per chunk and merged:
+    # time, figure payload, memory of the sketches, and rank error of their quartiles
+    import numpy as np
+    import pandas as pd
+    import plotly.graph_objects as go
+    from src.utils.stats_utils import sketch_groups
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'group': rng.choice(['Comedy', 'Non-Comedy'], n_values, p=[0.2, 0.8]),
+                       'sa': np.clip(rng.normal(0.1, 0.45, n_values), -1, 1)})
+
+    def raw_figure():
+        fig = go.Figure([go.Box(y=values.to_numpy(), name=group, boxpoints='outliers') for group, values in df.groupby('group')['sa']])
+        return len(fig.to_json())
+
+    def sketch_figure():
+        chunks = (df.iloc[i:i + len(df) // n_chunks] for i in range(0, len(df), len(df) // n_chunks))
+        sketches = sketch_groups(chunks, 'sa', 'group')
+        fig = go.Figure()
+        for group, sketch in sketches.items():
+            stats = sketch.box_stats()
+            fig.add_trace(go.Box(x=[group], q1=[stats.q1], median=[stats.median], q3=[stats.q3], name=group,
+                                 lowerfence=[stats.lowerfence], upperfence=[stats.upperfence]))
+            fig.add_trace(go.Scatter(x=[group] * len(stats.outliers), y=stats.outliers, mode='markers'))
+        return len(fig.to_json()), sketches
+
+    raw_payload, raw_time = _timed(raw_figure)
+    (sketch_payload, sketches), sketch_time = _timed(sketch_figure)
+    table = PrettyTable()
+    table.field_names = ["Values", "Method", "Time (s)", "Payload (KB)"]
+    table.add_row([n_values, "go.Box(y=values)", f"{raw_time:.2f}", f"{raw_payload/2**10:.0f}"])
+    table.add_row([n_values, f"Sketches ({n_chunks} chunks, merged)", f"{sketch_time:.2f}", f"{sketch_payload/2**10:.0f}"])
+    print(table)
+
+    table = PrettyTable()
+    table.field_names = ["Group", "Values", "Sketch (KB)", "Max rank error of q1/median/q3"]
+    for group, sketch in sketches.items():
+        values = np.sort(df.loc[df['group'] == group, 'sa'].to_numpy())
+        ranks = np.searchsorted(values, sketch.quantiles([0.25, 0.5, 0.75]), side='right') / len(values)
+        table.add_row([group, len(values), f"{sketch.nbytes/2**10:.1f}", f"{np.abs(ranks - [0.25, 0.5, 0.75]).max():.4f}"])
+    print(table)
+
+
+def bench_critic_scales(chunksize=100_000):
+    # Per-critic (and per-publication) normalization of the scores of `reviews_with_compound.csv`: a naive `groupby().transform()`
+    # on the full frame vs the streaming pass of `mrt_score_scales` (chunk by chunk, mergeable moments) and `mrt_scale_normalized_scores`
+    import numpy as np
+    from src import EDI
+    from src.utils.data_utils import MRT_SCALE_GROUPS, mrt_standardized_scores, mrt_score_scales, mrt_scale_normalized_scores
+    from src.utils.constants import NOTEBOOK_RUNCONFIG as cfg
+
+    reviews = EDI.mrtrev_sa_df
+    table = PrettyTable()
+    table.field_names = ["Reviews", "Grouped by", "Groups", "groupby().transform (s)", "Streaming (s)", "Speedup", "Scales table (KB)", "Same scores"]
+    for group_col in MRT_SCALE_GROUPS:
+        def naive():
+            scores = reviews.assign(score=mrt_standardized_scores(reviews['originalScore']))
+            normalized = scores.groupby(group_col, observed=True)['score'].transform(
+                lambda x: (x - x.mean()) / x.std() if x.count() >= cfg.SCALE_MIN_SCORES and x.std() > 0 else np.nan)
+            return normalized.to_numpy(np.float64)
+
+        def streaming():
+            chunks = (reviews.iloc[start:start + chunksize] for start in range(0, len(reviews), chunksize))
+            scales = mrt_score_scales(chunks, group_col)
+            return scales, mrt_scale_normalized_scores(reviews, scales, group_col)
+
+        reference, naive_time = _timed(naive)
+        (scales, normalized), streaming_time = _timed(streaming)
+        same = np.allclose(reference, normalized, equal_nan=True)
+        table.add_row([len(reviews), group_col, len(scales), f"{naive_time:.2f}", f"{streaming_time:.2f}",
+                       f"x{naive_time/streaming_time:.1f}", f"{scales.memory_usage(deep=True).sum()/2**10:.0f}", same])
+    print(table)
+
+
+def bench_sentiment_timeline(days=30):
+    # "First `days` days vs later reviews" of the comedies: re-scanning the reviews for the query vs `SentimentTimeline.early_vs_late`
+    import numpy as np
+    import pandas as pd
+    from src import EDI
+    from src.utils.data_utils import SentimentTimeline
+
+    reviews, comedy_ids = EDI.mrtrev_sa_df, EDI.mrt_cmu_expertrevd_comedy_ids
+
+    def rescan():
+        dates = pd.to_datetime(reviews['creationDate'], errors='coerce', format='ISO8601')
+        comedies = reviews.assign(date=dates)[reviews['id'].isin(comedy_ids) & dates.notna()]
+        early = (comedies['date'] - comedies.groupby('id')['date'].transform('min')).dt.days < days
+        return comedies[early].groupby('id')['sa'].mean(), comedies[~early].groupby('id')['sa'].mean()
+
+    (early, late), rescan_time = _timed(rescan)
+    timeline, build_time = _timed(SentimentTimeline.from_reviews, reviews)
+    windows, query_time = _timed(timeline.early_vs_late, comedy_ids, days)
+    same = (np.allclose(windows['sa_early'], early.reindex(windows.index), equal_nan=True)
+            and np.allclose(windows['sa_late'], late.reindex(windows.index), equal_nan=True))
+
+    table = PrettyTable()
+    table.field_names = ["Reviews", "Daily bins", "Weekly bins", "Build (s)", "Rescan per query (s)", "Query (s)", "Speedup", "Same means"]
+    table.add_row([len(reviews), len(timeline.day), len(timeline.resample("W").day), f"{build_time:.2f}", f"{rescan_time:.2f}",
+                   f"{query_time:.4f}", f"x{rescan_time/query_time:.0f}", same])
+    print(table)
+
+
+def bench_oscar_join():
+    # The former join of the CMU movies with the Oscar nominations on the raw titles vs `merge_ccmu_rosc` (normalized titles + year tolerance):
+    # time, rows produced, and match rates of the nominations
+    from src import CMU_MOVIES_DS, OSCAR_AWARDS_DS
+    from src.utils.constants import NOTEBOOK_RUNCONFIG as cfg
+    from src.utils.data_utils import prepro_cmu_movies, rename_oscars_cols, _merge_ccmu_rosc, ccmu_rosc_match_report, cmu_title_index
+
+    cmu, oscars = prepro_cmu_movies(CMU_MOVIES_DS.df), rename_oscars_cols(OSCAR_AWARDS_DS.df)
+    raw, raw_time = _timed(lambda: cmu.merge(oscars, on=['title']))
+    _, index_time = _timed(cmu_title_index.__wrapped__, cmu)
+    joined, join_time = _timed(_merge_ccmu_rosc.__wrapped__, cmu, oscars, cfg.TITLE_YEAR_TOLERANCE) # Without the memoization (builds the index again)
+    report = ccmu_rosc_match_report(cmu, oscars)
+
+    table = PrettyTable()
+    table.field_names = ["Join", "Time (s)", "Rows", "Nominations matched", "Match rate"]
+    table.add_row(["Raw titles", f"{raw_time:.3f}", len(raw), report['raw_title_matched'], f"{report['raw_title_match_rate']:.1%}"])
+    table.add_row(["Normalized titles + years", f"{join_time:.3f} (index: {index_time:.3f})", len(joined), report['matched'],
+                   f"{report['match_rate']:.1%}"])
+    print(table)
+    print(report.to_string())
+
+
+def bench_award_summary():
+    # The award comparison per country, from the nominations joined to the CMU movies (one row per nomination) vs from the per-film
+    # summary (`summarize_oscars`) joined to them (one row per nominated movie). Without the memoization
+    from src import CMU_MOVIES_DS, OSCAR_AWARDS_DS
+    from src.utils.constants import NOTEBOOK_RUNCONFIG as cfg
+    from src.utils.data_utils import (prepro_cmu_movies, rename_oscars_cols, _merge_ccmu_rosc, summarize_oscars, _merge_ccmu_award_summary,
+                                      prepare_award_comparison_data)
+
+    cmu, oscars = prepro_cmu_movies(CMU_MOVIES_DS.df), OSCAR_AWARDS_DS.df
+    nominations, nominations_time = _timed(_merge_ccmu_rosc.__wrapped__, cmu, rename_oscars_cols.__wrapped__(oscars), cfg.TITLE_YEAR_TOLERANCE)
+    summary, summary_time = _timed(summarize_oscars.__wrapped__, oscars)
+    movies, join_time = _timed(_merge_ccmu_award_summary.__wrapped__, cmu, oscars, cfg.TITLE_YEAR_TOLERANCE)
+    _, comparison_time = _timed(prepare_award_comparison_data.__wrapped__, movies)
+    _, breakdown_time = _timed(summary.category_counts, won=True)
+
+    table = PrettyTable()
+    table.field_names = ["Step", "Time (s)", "Rows"]
+    table.add_row(["Nominations joined to the movies (former)", f"{nominations_time:.3f}", len(nominations)])
+    table.add_row(["Per-film summary (once)", f"{summary_time:.3f}", f"{len(summary.films)} films, {len(summary.categories)} category families"])
+    table.add_row(["Summary joined to the movies", f"{join_time:.3f}", len(movies)])
+    table.add_row(["Comparison per country", f"{comparison_time:.3f}", ""])
+    table.add_row(["Wins per category (from the masks)", f"{breakdown_time:.4f}", len(summary.categories)])
+    print(table)
+
+
+def bench_oscar_actors():
+    # The acting nominees of the Oscars joined to the CMU characters on the raw names (one row per character of a namesake) vs linked to
+    # the CMU actors (`link_oscar_actors`, at most one actor per nomination), and the per-actor summary built on it
+    from src import CMU_MOVIES_DS, CMU_CHARACTER_DS, OSCAR_AWARDS_DS
+    from src.utils.constants import NOTEBOOK_RUNCONFIG as cfg
+    from src.utils.data_utils import prepro_cmu_movies, _link_oscar_actors, _oscar_actor_summary, cmu_actor_name_index
+
+    cmu, characters, oscars = prepro_cmu_movies(CMU_MOVIES_DS.df), CMU_CHARACTER_DS.df, OSCAR_AWARDS_DS.df
+    links, link_time = _timed(_link_oscar_actors.__wrapped__, cmu, characters, oscars, cfg.TITLE_YEAR_TOLERANCE) # Builds the name index (memoized afterwards)
+    _, index_time = _timed(cmu_actor_name_index.__wrapped__, characters)
+    raw, raw_time = _timed(lambda: characters[['actor_name', 'freebase_actor_id']].merge(links[['name']].reset_index(), left_on='actor_name', right_on='name'))
+    summary, summary_time = _timed(_oscar_actor_summary.__wrapped__, cmu, characters, oscars, cfg.TITLE_YEAR_TOLERANCE)
+
+    table = PrettyTable()
+    table.field_names = ["Join", "Time (s)", "Rows", "Nominations linked"]
+    table.add_row(["Raw names (characters)", f"{raw_time:.3f}", len(raw), raw['index'].nunique()])
+    table.add_row(["Normalized names + nominated film", f"{link_time:.3f} (index: {index_time:.3f})", len(links), links['freebase_actor_id'].notna().sum()])
+    table.add_row(["Per-actor summary", f"{summary_time:.3f}", len(summary), (summary['nominations'] > 0).sum()])
+    print(table)
+    print(links['actor_link'].value_counts(dropna=False).to_string())
+
+
+def bench_movie_links():
+    # The stages of the linking of the CMU movies with the RT movies (see src/utils/entity_linking.py): candidate pairs left by the blocking
+    # (vs all the pairs), and the time of each stage
+    from src import CMU_MOVIES_DS, MASSIVE_RT_MOVIE_DS
+    from src.utils.data_utils import cmu_link_records, mrt_link_records
+    from src.utils.entity_linking import candidate_pairs, score_pairs, assign_one_to_one
+    from src.utils.constants import NOTEBOOK_RUNCONFIG as cfg
+
+    (cmu, mrt), records_time = _timed(lambda: (cmu_link_records(CMU_MOVIES_DS.df), mrt_link_records(MASSIVE_RT_MOVIE_DS.df)))
+    (left_rows, right_rows), blocking_time = _timed(candidate_pairs, cmu, mrt)
+    scored, scoring_time = _timed(score_pairs, cmu, mrt, left_rows, right_rows)
+    scored = scored[(scored["title"] >= cfg.LINK_MIN_TITLE_SIMILARITY) & (scored["score"] >= cfg.LINK_MIN_SCORE)]
+    kept, assignment_time = _timed(assign_one_to_one, scored["left"].to_numpy(), scored["right"].to_numpy(), scored["score"].to_numpy())
+
+    table = PrettyTable()
+    table.field_names = ["Stage", "Time (s)", "Pairs"]
+    table.add_row(["Records (normalization)", f"{records_time:.2f}", f"{len(cmu)} x {len(mrt)} = {len(cmu) * len(mrt):.2e}"])
+    table.add_row(["Blocking", f"{blocking_time:.2f}", len(left_rows)])
+    table.add_row(["Scoring", f"{scoring_time:.2f}", len(scored)])
+    table.add_row(["One-to-one assignment", f"{assignment_time:.2f}", len(kept)])
+    print(table)
+
+
+IMPORT_TIME_BUDGET = 2.0 # seconds, for `from src import *` in a fresh interpreter
+# Modules which should only be imported once a function needing them is called (see `_LAZY_EXPORTS` in `src/__init__.py`)
+LAZY_MODULES = ["spacy", "sklearn", "plotly", "seaborn", "swifter", "ipywidgets", "scipy", "matplotlib"]
+
+def bench_import_time(n_runs=3):
+    # Guards against import-time regressions: `from src import *` has to stay within budget, without importing any of the heavy modules.
+    # Exits with a non-zero status if it does not (see `__main__`)
+    code = ("import json,sys,time; t=time.perf_counter(); from src import *; t=time.perf_counter()-t;"
+            f"print(json.dumps([t,[m for m in {LAZY_MODULES!r} if m in sys.modules]]))")
+    timings, eager_modules = [], set()
+    for _ in range(n_runs):
+        out = subprocess.run([sys.executable,"-c",code],capture_output=True,text=True,check=True).stdout
+        elapsed, imported = json.loads(out.strip().splitlines()[-1])
+        timings.append(elapsed)
+        eager_modules.update(imported)
+
+    best = min(timings)
+    print(f"`from src import *`: best of {n_runs} = {best:.2f}s (budget: {IMPORT_TIME_BUDGET:.2f}s)")
+    if eager_modules:
+        print(f"Heavy modules imported eagerly: {', '.join(sorted(eager_modules))}")
+    return best <= IMPORT_TIME_BUDGET and not eager_modules
+
+
+BENCHMARKS = {
+    "import_time": bench_import_time,
+    "dataset_cache": bench_dataset_cache,
+    "dataset_footprint": bench_dataset_footprint,
+    "freebase_parser": bench_freebase_parser,
+    "mrt_preprocess": bench_mrt_preprocess,
+    "score_normalizer": bench_score_normalizer,
+    "resampling": bench_resampling,
+    "density_scatter": bench_density_scatter,
+    "box_sketch": bench_box_sketch,
+    "critic_scales": bench_critic_scales,
+    "sentiment_timeline": bench_sentiment_timeline,
+    "oscar_join": bench_oscar_join,
+    "award_summary": bench_award_summary,
+    "movie_links": bench_movie_links,
+    "oscar_actors": bench_oscar_actors,
+}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run one (or all) of the project's benchmarks")
+    parser.add_argument("benchmarks", nargs="*", help=f"Benchmarks to run, among {', '.join(BENCHMARKS)} (all of them by default)")
+    args = parser.parse_args()
+    unknown = set(args.benchmarks) - BENCHMARKS.keys()
+    if unknown:
+        parser.error(f"Unknown benchmark(s): {', '.join(sorted(unknown))}")
+    failed = []
+    for name in args.benchmarks or BENCHMARKS.keys():
+        print(f"==== {name}")
+        if BENCHMARKS[name]() is False: # Benchmarks acting as guards return whether they passed
+            failed.append(name)
+    if failed:
+        sys.exit(f"Failed: {', '.join(failed)}")
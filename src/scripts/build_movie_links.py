@@ -0,0 +1,44 @@
+# Builds `data/processed/movie_links.parquet`: one row per film, with its keys in the CMU movies (`wikipedia_id`), the massive RT dataset (`rt_id`),
+# movie_info.csv (`rt_url`) and the Oscars (`oscar_film`, `oscar_year_film`), and the score of each link (see `build_movie_links`).
+# Analyses joining these datasets should go through this table rather than through their own joins on the titles.
+# Run from the root of the repo :
+#     python -m src.scripts.build_movie_links [--tolerance 1] [--min-score 0.7]
+import argparse
+import os
+from pathlib import Path
+from time import perf_counter
+from src import CMU_MOVIES_DS, MASSIVE_RT_MOVIE_DS, RT_EXTRA_MOVIE_INFO_DS, OSCAR_AWARDS_DS
+from src.data.project_dataset import _RSSSampler
+from src.utils.data_utils import PROCESSED_DATA_DIR, MOVIE_LINKS_FILE, build_movie_links
+
+OUTPUT_PATH = Path(PROCESSED_DATA_DIR + MOVIE_LINKS_FILE)
+KEY_COLUMNS = {"CMU": ["wikipedia_id"], "RT": ["rt_id"], "movie_info": ["rt_url"], "Oscars": ["oscar_film", "oscar_year_film"]}
+
+def build(tolerance: int|None, min_score: float|None):
+    sampler = _RSSSampler(interval=0.2)
+    sampler.start()
+    start = perf_counter()
+    datasets = CMU_MOVIES_DS.df, MASSIVE_RT_MOVIE_DS.df, RT_EXTRA_MOVIE_INFO_DS.df, OSCAR_AWARDS_DS.df
+    loaded = perf_counter()
+    links = build_movie_links(*datasets, tolerance=tolerance, min_score=min_score)
+    linked = perf_counter()
+    sampler.stop()
+
+    tmp_path = OUTPUT_PATH.with_suffix(".tmp")
+    links.to_parquet(tmp_path)
+    os.replace(tmp_path, OUTPUT_PATH)
+
+    in_cmu = links["wikipedia_id"].notna()
+    for name, keys in KEY_COLUMNS.items():
+        present = links[keys[0]].notna()
+        print(f"{name}: {present.sum()} films, {(present & in_cmu).sum()} of them in CMU")
+    print(f"{len(links)} films in total. Loaded in {loaded - start:.1f}s, linked in {linked - loaded:.1f}s, "
+          f"peak RSS: {sampler.peak/2**20:.0f}MB. Written to {OUTPUT_PATH}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Link the films of the CMU, RT, movie_info and Oscars datasets, into data/processed/movie_links.parquet")
+    parser.add_argument("--tolerance", type=int, default=None, help="Years the release years of a film may differ by (default: cfg.TITLE_YEAR_TOLERANCE)")
+    parser.add_argument("--min-score", type=float, default=None, help="Minimal score of a link (default: cfg.LINK_MIN_SCORE)")
+    args = parser.parse_args()
+    build(args.tolerance, args.min_score)
@@ -0,0 +1,187 @@
+# Builds `data/processed/reviews_with_compound.csv`: the reviews of the massive RT dataset which have a text, with the VADER compound score
+# of that text (`sa` column). The reviews are streamed chunk by chunk (the corpus is never held in memory) and scored by a pool of processes.
+# Each scored chunk is checkpointed as a Parquet part (under `reviews_with_compound.parts/`), so that an interrupted run resumes where it stopped.
+# The scores are also kept in a `reviewId -> (text hash, compound)` store (`reviews_vader_scores.parquet`): when a newer dump of the reviews
+# is scored, only the new or edited reviews go through VADER, the others reuse their stored score.
+# While the parts are merged, the grading scale of each critic and publication is accumulated (see `mrt_score_scales`) into `mrt_score_scales.parquet`
+# (read back by `ExtraDatasetInfo.mrt_score_scales`, with which `mrt_preprocess_cells(..., all_formats=True, normalize_by=...)` normalizes the scores).
+# Run from the root of the repo :
+#     python -m src.scripts.build_reviews_with_compound [--workers 8] [--chunksize 50000] [--restart] [--rescore-all]
+import argparse
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from time import perf_counter
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+from src import MASSIVE_RT_REVIEW_DS
+from src.data.project_dataset import _RSSSampler
+from src.utils.data_utils import MRT_SCALE_GROUPS, MRT_SCALES_FILE, mrt_standardized_scores
+from src.utils.stats_utils import group_moments, merge_moments, moments_summary
+
+OUTPUT_PATH = Path("data/processed/reviews_with_compound.csv")
+PARTS_DIR = OUTPUT_PATH.with_suffix(".parts")
+SCORE_STORE_PATH = OUTPUT_PATH.with_name("reviews_vader_scores.parquet")
+SCALES_PATH = OUTPUT_PATH.with_name(MRT_SCALES_FILE)
+MANIFEST = "manifest.json"
+ID_COL = "reviewId"
+TEXT_COL = "reviewText"
+HASH_COL = "text_hash"
+SCORE_COL = "sa"
+
+# ============ ============ Workers ============ ============
+
+_analyzer = None
+
+def _init_worker():
+    # Each worker builds its analyzer once (loading the VADER lexicon), rather than once per batch
+    global _analyzer
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    _analyzer = SentimentIntensityAnalyzer()
+
+def _score_batch(texts: list[str]) -> list[float]:
+    return [_analyzer.polarity_scores(text)["compound"] for text in texts]
+
+# ============ ============ Checkpoints ============ ============
+
+def _source_fingerprint() -> dict:
+    stat = Path(MASSIVE_RT_REVIEW_DS.path).stat()
+    return {"source": MASSIVE_RT_REVIEW_DS.path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+def _part_path(start: int, end: int) -> Path:
+    # A part holds the scored reviews of the raw rows [start, end)
+    return PARTS_DIR / f"part-{start:09d}-{end:09d}.parquet"
+
+def _done_until() -> int:
+    # The parts are written in order: the rows before the end of their contiguous prefix are already scored
+    done = 0
+    for path in sorted(PARTS_DIR.glob("part-*.parquet")):
+        start, end = map(int, path.stem.split("-")[1:])
+        if start != done:
+            break
+        done = end
+    return done
+
+def _prepare_parts_dir(restart: bool) -> int:
+    # Returns the number of (raw) rows already scored by a previous run
+    fingerprint = _source_fingerprint()
+    manifest_path = PARTS_DIR / MANIFEST
+    if manifest_path.is_file() and not restart:
+        with open(manifest_path) as f:
+            if json.load(f) == fingerprint:
+                return _done_until()
+        print(f"{MASSIVE_RT_REVIEW_DS.path} changed since the checkpoints in {PARTS_DIR} were written, starting over (reusing the stored scores)")
+    shutil.rmtree(PARTS_DIR, ignore_errors=True)
+    PARTS_DIR.mkdir(parents=True)
+    with open(manifest_path, "w") as f:
+        json.dump(fingerprint, f)
+    return 0
+
+def _write_part(rows: range, scored: pd.DataFrame, futures: list) -> tuple[int,int]:
+    # Waits for the scores of the reviews of a chunk which were not reused, and checkpoints it (with the hashes of the texts).
+    # Returns the number of reused and recomputed scores
+    recomputed = scored[SCORE_COL].isna()
+    scored.loc[recomputed, SCORE_COL] = [score for future in futures for score in future.result()]
+    path = _part_path(rows.start, rows.stop)
+    tmp_path = path.with_suffix(".tmp")
+    scored.drop(columns=TEXT_COL).to_parquet(tmp_path)
+    os.replace(tmp_path, path)
+    return int((~recomputed).sum()), int(recomputed.sum())
+
+def _merge_parts():
+    # Streams the parts (one at a time) into the final CSV, and rewrites the score store and the grading scales from them
+    tmp_path, tmp_store_path, tmp_scales_path = (path.with_suffix(".tmp") for path in (OUTPUT_PATH, SCORE_STORE_PATH, SCALES_PATH))
+    store, moments = [], {group_col: [] for group_col in MRT_SCALE_GROUPS}
+    for i, path in enumerate(sorted(PARTS_DIR.glob("part-*.parquet"))):
+        part = pd.read_parquet(path)
+        part.drop(columns=HASH_COL).to_csv(tmp_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        store.append(part[[ID_COL, HASH_COL, SCORE_COL]])
+        scores = mrt_standardized_scores(part["originalScore"], all_formats=True)
+        for group_col in MRT_SCALE_GROUPS:
+            moments[group_col].append(group_moments(scores, part[group_col]))
+    os.replace(tmp_path, OUTPUT_PATH)
+    pd.concat(store, ignore_index=True).to_parquet(tmp_store_path)
+    os.replace(tmp_store_path, SCORE_STORE_PATH)
+    # One table for both groupings, indexed by (group column, critic/publication)
+    scales = pd.concat({group_col: moments_summary(merge_moments(*group_moments_)).sort_index()
+                        for group_col, group_moments_ in moments.items()}, names=["group", "name"])
+    scales.to_parquet(tmp_scales_path)
+    os.replace(tmp_scales_path, SCALES_PATH)
+
+# ============ ============ Score store ============ ============
+
+def _load_score_store() -> pd.DataFrame:
+    # The scores of the previous build, indexed by reviewId (only ~20 bytes per review: the texts are not kept)
+    if not SCORE_STORE_PATH.is_file():
+        return pd.DataFrame({HASH_COL: pd.Series(dtype=np.int64), SCORE_COL: pd.Series(dtype=np.float64)}, index=pd.Index([], name=ID_COL))
+    store = pd.read_parquet(SCORE_STORE_PATH)
+    return store.drop_duplicates(ID_COL, keep="last").set_index(ID_COL)
+
+def _text_hashes(texts: pd.Series) -> np.ndarray:
+    return pd.util.hash_pandas_object(texts, index=False).to_numpy().view(np.int64)
+
+def _reuse_scores(chunk: pd.DataFrame, store: pd.DataFrame) -> pd.DataFrame:
+    # The reviews of the chunk which have a text, with their text hash and, when the store has a score for the same reviewId and text, that score
+    # (NaN for the reviews to (re)compute)
+    scored = chunk[chunk[TEXT_COL].notna()].copy()
+    scored[TEXT_COL] = scored[TEXT_COL].astype(str)
+    scored[HASH_COL] = _text_hashes(scored[TEXT_COL])
+    known = store.reindex(scored[ID_COL])
+    same_text = known[HASH_COL].to_numpy() == scored[HASH_COL].to_numpy()
+    scored[SCORE_COL] = np.where(same_text, known[SCORE_COL].to_numpy(), np.nan)
+    return scored
+
+# ============ ============ Main ============ ============
+
+def build(workers: int, chunksize: int, batch_size: int, restart: bool, keep_parts: bool, rescore_all: bool):
+    done_until = _prepare_parts_dir(restart)
+    if done_until:
+        print(f"Resuming after the first {done_until} reviews (checkpointed in {PARTS_DIR})")
+    columns = list(dict.fromkeys([*MASSIVE_RT_REVIEW_DS.get_default_columns(), ID_COL, TEXT_COL]))
+    store = _load_score_store().iloc[:0] if rescore_all else _load_score_store()
+
+    sampler = _RSSSampler(interval=0.2, include_children=True)
+    sampler.start()
+    start, n_reused, n_recomputed = perf_counter(), 0, 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool, tqdm(unit=" reviews", desc="VADER") as bar:
+        # The workers score chunk i while the main process writes chunk i-1 and reads chunk i+1
+        pending = None
+        for chunk in MASSIVE_RT_REVIEW_DS.iter_chunks(chunksize=chunksize, columns=columns):
+            chunk = chunk[chunk.index >= done_until]
+            if chunk.empty:
+                continue
+            scored = _reuse_scores(chunk, store)
+            texts = scored.loc[scored[SCORE_COL].isna(), TEXT_COL].tolist()
+            futures = [pool.submit(_score_batch, texts[i:i+batch_size]) for i in range(0, len(texts), batch_size)]
+            if pending is not None:
+                reused, recomputed = _write_part(*pending)
+                n_reused, n_recomputed = n_reused + reused, n_recomputed + recomputed
+                bar.update(len(pending[0]))
+            pending = (range(chunk.index[0], chunk.index[-1] + 1), scored, futures)
+        if pending is not None:
+            reused, recomputed = _write_part(*pending)
+            n_reused, n_recomputed = n_reused + reused, n_recomputed + recomputed
+            bar.update(len(pending[0]))
+    elapsed = perf_counter() - start
+
+    _merge_parts()
+    sampler.stop()
+    if not keep_parts:
+        shutil.rmtree(PARTS_DIR)
+    print(f"{n_reused} scores reused, {n_recomputed} recomputed in {elapsed:.1f}s ({n_recomputed/max(elapsed,1e-9):.0f} reviews/s, {workers} workers), "
+          f"peak RSS (all processes): {sampler.peak/2**20:.0f}MB. Written to {OUTPUT_PATH}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Score the RT reviews with VADER, into data/processed/reviews_with_compound.csv")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of scoring processes (default: all the cores)")
+    parser.add_argument("--chunksize", type=int, default=50_000, help="Reviews read (and checkpointed) at once")
+    parser.add_argument("--batch-size", type=int, default=1_000, help="Reviews per task sent to the workers")
+    parser.add_argument("--restart", action="store_true", help="Ignore (and remove) the checkpoints of a previous run")
+    parser.add_argument("--keep-parts", action="store_true", help="Keep the Parquet parts once the CSV is written")
+    parser.add_argument("--rescore-all", action="store_true", help=f"Do not reuse the scores of {SCORE_STORE_PATH}")
+    args = parser.parse_args()
+    build(args.workers, args.chunksize, args.batch_size, args.restart, args.keep_parts, args.rescore_all)
@@ -0,0 +1,47 @@
+# Inspects/purges the results persisted on disk by `memoize_frames(persist=True)` (see `src/utils/result_store.py`)
+# Run from the root of the repo, e.g.:
+#     python -m src.scripts.result_store list
+#     python -m src.scripts.result_store purge --function process_genre_by_country
+#     python -m src.scripts.result_store evict --max-mb 500
+import argparse
+import sys
+from ..utils.result_store import default_result_store
+from ..utils.constants import NOTEBOOK_RUNCONFIG as cfg
+
+
+def list_entries(store, function=None):
+    entries = store.entries()
+    if function is not None:
+        entries = entries[entries["function"].fillna("").str.contains(function, regex=False)]
+    if entries.empty:
+        print(f"No results stored under {store.root}")
+        return
+    per_function = (entries.groupby("function")
+                    .agg(entries=("key", "size"), size_mb=("nbytes", lambda x: x.sum() / 2**20), last_used=("last_used", "max"))
+                    .sort_values("last_used", ascending=False))
+    print(per_function.to_string(float_format="{:.1f}".format))
+    print(f"\n{len(entries)} entries, {entries['nbytes'].sum() / 2**20:.1f}MB "
+          f"(budget: {store.max_bytes / 2**20:.0f}MB) under {store.root}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Inspect or purge the pipeline results persisted on disk")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    list_parser = subparsers.add_parser("list", help="Summarize the stored results per function")
+    list_parser.add_argument("--function", help="Only the functions whose (qualified) name contains this")
+    purge_parser = subparsers.add_parser("purge", help="Remove the stored results (of some functions only, with --function)")
+    purge_parser.add_argument("--function", help="Only the functions whose (qualified) name contains this")
+    evict_parser = subparsers.add_parser("evict", help="Remove the least recently used results until the store fits in a budget")
+    evict_parser.add_argument("--max-mb", type=float, help="The budget (cfg.RESULT_STORE_MAX_BYTES by default)")
+    args = parser.parse_args()
+
+    store = default_result_store()
+    if store is None:
+        sys.exit("The disk cache is disabled (cfg.CACHE_DIR is None)")
+    if args.command == "list":
+        list_entries(store, args.function)
+    elif args.command == "purge":
+        print(f"Removed {store.purge(args.function)} entries")
+    else:
+        max_bytes = cfg.RESULT_STORE_MAX_BYTES if args.max_mb is None else int(args.max_mb * 2**20)
+        print(f"Removed {store.evict(max_bytes)} entries")
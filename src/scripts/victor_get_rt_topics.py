@@ -1,5 +1,7 @@
 from keybert import KeyBERT
+import os
 import pickle as pkl
+from pathlib import Path
 from tqdm import tqdm
 import pandas as pd
 from src.utils.data_utils import *
@@ -8,6 +10,10 @@ from src.utils.general_utils import *
 pd.options.mode.copy_on_write = True
 
 
+PARSED_PARTS_DIR = Path("rt_scapy_parsed.parts") # Written by victor_get_rtnlpized.py, one part per chunk of CHUNKSIZE raw reviews
+KW_PARTS_DIR = Path("victor_rt_kw.parts") # The keywords of the reviews, one part per chunk as well
+CHUNKSIZE = 100_000 # Has to be the one of victor_get_rtnlpized.py
+
 # Dataset setups
 RAW_DATA_FOLDER = "data/raw/"
 
@@ -122,16 +128,21 @@ OSCAR_AWARDS_DS = ProjectDataset(RAW_DATA_FOLDER+"the_oscar_award.csv",
 ALL_DATASETS = [CMU_MOVIES_DS,CMU_CHARACTER_DS,CMU_PLOTS_DS,MASSIVE_RT_MOVIE_DS,MASSIVE_RT_REVIEW_DS,RT_EXTRA_MOVIE_INFO_DS,OSCAR_AWARDS_DS]
 
 if __name__ == '__main__':
-
-    for dataset in tqdm(ALL_DATASETS,total=len(ALL_DATASETS),desc="Preloading datasets..."):
-        _ = dataset.df
-
-    with open("rt_scapy_parsed.pkl","rb") as f:
-        rt_scapy_parsed = pkl.load(f)
-    rt_np_words = [[noun for noun,pos in doc_tpl if pos == "VERB" or pos == "NOUN" or pos == "ADJ"] for doc_tpl in rt_scapy_parsed]
-    all_rt_revs = MASSIVE_RT_REVIEW_DS.df[~MASSIVE_RT_REVIEW_DS.df.reviewText.isna()].reviewText.values
+    # The review texts are streamed with the chunks the parsed reviews were written with (see victor_get_rtnlpized.py), so that each chunk
+    # of texts goes through KeyBERT with the seed words of its own part, and its keywords are written to their own part
     model = KeyBERT(model="all-MiniLM-L12-v2")
-
-    kw = model.extract_keywords(all_rt_revs,seed_keywords=rt_np_words,top_n=15,use_tqdm=True,model_encode_kwargs={"batch_size":512,"device":"cuda"})
-    with open("victor_rt_kw.pkl","wb") as f:
-        pkl.dump(kw,f,protocol=pkl.HIGHEST_PROTOCOL)
+    KW_PARTS_DIR.mkdir(exist_ok=True)
+    parsed_parts = sorted(PARSED_PARTS_DIR.glob("part-*.pkl"))
+    chunks = MASSIVE_RT_REVIEW_DS.iter_chunks(chunksize=CHUNKSIZE, columns=["reviewText"])
+    for i, (chunk, parsed_part) in enumerate(tqdm(zip(chunks, parsed_parts, strict=True), total=len(parsed_parts), desc="Extracting keywords (chunks)")):
+        with open(parsed_part,"rb") as f:
+            rt_np_words = [[noun for noun,pos in doc_tpl if pos == "VERB" or pos == "NOUN" or pos == "ADJ"] for doc_tpl in pkl.load(f)]
+        texts = chunk.reviewText.dropna().tolist()
+        assert len(texts) == len(rt_np_words), f"{parsed_part} does not match the reviews, run victor_get_rtnlpized.py again"
+        kw = model.extract_keywords(texts,seed_keywords=rt_np_words,top_n=15,model_encode_kwargs={"batch_size":512,"device":"cuda"}) if texts else []
+        if len(texts) == 1: # KeyBERT returns the keywords of a single document unnested
+            kw = [kw]
+        part = KW_PARTS_DIR / f"part-{i:05d}.pkl"
+        with open(part.with_suffix(".tmp"),"wb") as f:
+            pkl.dump(kw,f,protocol=pkl.HIGHEST_PROTOCOL)
+        os.replace(part.with_suffix(".tmp"), part)
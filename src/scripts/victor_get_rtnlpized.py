@@ -1,5 +1,7 @@
+import os
 import pandas as pd
 import re
+from pathlib import Path
 from src.utils.data_utils import *
 from src.utils.general_utils import *
 from tqdm import tqdm
@@ -17,6 +19,8 @@ TEXT_SEPARATOR = "_" * 40
 COLOR_PALETTE = ["#332288","#88ccee","#e69f00","#44aa99","#f0e442","#d55e00","#882255","#009e73"]
 
 RES_PATH = "res/"
+PARSED_PARTS_DIR = Path("rt_scapy_parsed.parts") # One pickle of the (token, POS) of the review texts per chunk of CHUNKSIZE raw rows
+CHUNKSIZE = 100_000 # Also used by victor_get_rt_topics.py to read the reviews along the parts
 # Dataset setups
 RAW_DATA_FOLDER = "data/raw/"
 
@@ -130,12 +134,17 @@ OSCAR_AWARDS_DS = ProjectDataset(RAW_DATA_FOLDER+"the_oscar_award.csv",
 ALL_DATASETS = [CMU_MOVIES_DS,CMU_CHARACTER_DS,CMU_PLOTS_DS,MASSIVE_RT_MOVIE_DS,MASSIVE_RT_REVIEW_DS,RT_EXTRA_MOVIE_INFO_DS,OSCAR_AWARDS_DS]
 
 if __name__ == '__main__':
-    for dataset in tqdm(ALL_DATASETS,total=len(ALL_DATASETS),desc="Preloading datasets..."):
-        _ = dataset.df
     nlp = spacy.load('en_core_web_sm')
     nlp.add_pipe("doc_cleaner", config={"attrs": {"tensor": None}})
-    all_rt_revs = MASSIVE_RT_REVIEW_DS.df[~MASSIVE_RT_REVIEW_DS.df.reviewText.isna()].reviewText.values
-    N_rt = len(all_rt_revs)
-    all_os = [[(tok.text,tok.pos_) for tok in d] for d in tqdm(nlp.pipe(all_rt_revs,batch_size=256,disable=["ner","lemmatizer","parser"]),total=N_rt,desc=f"Batch pipelined")]
-    with open('rt_scapy_parsed.pkl','wb') as f:
-        pkl.dump(all_os,f,protocol=pkl.HIGHEST_PROTOCOL)
+    # Stream the review texts chunk by chunk rather than materializing the whole 1.4M rows reviews dataframe, and write the tokens of each
+    # chunk to their own part (aligned with the chunks of `iter_chunks(CHUNKSIZE, ["reviewText"])`), so that the memory is bounded by a chunk
+    PARSED_PARTS_DIR.mkdir(exist_ok=True)
+    for part in PARSED_PARTS_DIR.glob("part-*.pkl"):
+        part.unlink()
+    chunks = MASSIVE_RT_REVIEW_DS.iter_chunks(chunksize=CHUNKSIZE, columns=["reviewText"])
+    for i, chunk in enumerate(tqdm(chunks, desc="Batch pipelined (chunks)")):
+        docs = nlp.pipe(chunk.reviewText.dropna(), batch_size=256, disable=["ner","lemmatizer","parser"])
+        part = PARSED_PARTS_DIR / f"part-{i:05d}.pkl"
+        with open(part.with_suffix(".tmp"),'wb') as f:
+            pkl.dump([[(tok.text,tok.pos_) for tok in d] for d in docs], f, protocol=pkl.HIGHEST_PROTOCOL)
+        os.replace(part.with_suffix(".tmp"), part)
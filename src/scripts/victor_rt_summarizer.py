@@ -2,7 +2,7 @@ from tqdm import tqdm
 import numpy as np
 import gensim.downloader as api
 import pickle as pkl
-from itertools import chain
+from pathlib import Path
 
 class TopicSummarizer:
     def __init__(self, embedding_model: str = 'glove-wiki-gigaword-100',lessen_words: set[str]|None = None,reduction_factor: float = 0.1):
@@ -118,23 +118,21 @@ class TopicSummarizer:
     
 
 if __name__ == '__main__':
-    with open("victor_rt_kw.pkl","rb") as f:
-        kw = pkl.load(f)
-    with open("rt_scapy_parsed.pkl","rb") as f:
-        rt_scapy_parsed = pkl.load(f)
+    kw = []
+    for part in sorted(Path("victor_rt_kw.parts").glob("part-*.pkl")): # Written by victor_get_rt_topics.py
+        with open(part,"rb") as f:
+            kw.extend(pkl.load(f))
+    # The parsed reviews are read one part at a time (see victor_get_rtnlpized.py): the nouns/verbs/adjectives of all the reviews,
+    # then the other words
+    def parsed_docs():
+        for part in sorted(Path("rt_scapy_parsed.parts").glob("part-*.pkl")):
+            with open(part,"rb") as f:
+                yield from pkl.load(f)
 
-    np_words = [[noun for noun,pos in doc_tpl if pos == "VERB" or pos == "NOUN" or pos == "ADJ"] for doc_tpl in rt_scapy_parsed]
-
-    srtnp = set(chain.from_iterable(np_words))
-    bad_words = [[noun for noun,pos in doc_tpl if noun not in srtnp and pos != "PUNCT"] for doc_tpl in rt_scapy_parsed]
-    sbw = set(chain.from_iterable(bad_words))
+    srtnp = {noun for doc_tpl in parsed_docs() for noun,pos in doc_tpl if pos == "VERB" or pos == "NOUN" or pos == "ADJ"}
+    sbw = {noun for doc_tpl in parsed_docs() for noun,pos in doc_tpl if noun not in srtnp and pos != "PUNCT"}
     lessen_summarizer = TopicSummarizer(lessen_words=sbw,reduction_factor=0.1)
-    if srtnp:
-        del srtnp
-    if bad_words:
-        del bad_words
-    if np_words:
-        del np_words
+    del srtnp
 
     rt_lessen_topicized = lessen_summarizer.summarize_topics(kw,k=5,weighted=True,use_tqdm=True)
     with open("rt_summarized.pkl","wb") as f:
@@ -0,0 +1,234 @@
+# Helpers to cache intermediate results of our (pandas) pipelines, keyed on a cheap fingerprint of their input dataframes
+from collections import OrderedDict, namedtuple
+from dataclasses import fields, is_dataclass, replace
+from functools import cache, partial, wraps
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Any
+import hashlib
+import inspect
+import sys
+import numpy as np
+import pandas as pd
+from .constants import NOTEBOOK_RUNCONFIG as cfg
+from .result_store import default_result_store
+
+FINGERPRINT_SAMPLE_SIZE = 4096 # Number of rows hashed by `frame_fingerprint` (evenly spaced, always including the first and last rows)
+
+def _hash_rows(df: pd.DataFrame|pd.Series) -> np.ndarray:
+    try:
+        return pd.util.hash_pandas_object(df, index=True).to_numpy()
+    except TypeError: # Unhashable cells (e.g. the lists of `prepro_cmu_movies`): hash their string representation instead
+        return pd.util.hash_pandas_object(df.astype(str), index=True).to_numpy()
+
+def frame_fingerprint(df: pd.DataFrame|pd.Series, sample_size: int = FINGERPRINT_SAMPLE_SIZE) -> str:
+    """
+    Cheap fingerprint of a dataframe (or series), usable as a cache key.
+    It combines the shape, the column names and dtypes, and the hash of (at most) `sample_size` evenly spaced rows,
+    so it costs O(sample_size) rather than O(len(df)) -- at the price of missing in-place edits of rows which are not sampled.
+
+    Args:
+        df (pd.DataFrame|pd.Series): The data to fingerprint.
+        sample_size (int): Maximum number of rows to hash (all of them if None).
+
+    Returns:
+        str: A hex digest identifying the data.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((type(df).__name__, df.shape)).encode())
+    if isinstance(df, pd.DataFrame):
+        h.update(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode())
+    else:
+        h.update(repr((df.name, str(df.dtype))).encode())
+
+    n = len(df)
+    if sample_size is not None and n > sample_size:
+        df = df.iloc[np.unique(np.linspace(0, n-1, sample_size).astype(np.int64))]
+    h.update(_hash_rows(df).tobytes())
+    return h.hexdigest()
+
+
+# ============ ============ ============ ============ ============ ============
+# Memoization of the functions taking dataframes
+# ============ ============ ============ ============ ============ ============
+
+MemoInfo = namedtuple("MemoInfo", ["hits", "misses", "entries", "nbytes"])
+
+def _arg_key(value) -> Any:
+    # Hashable stand-in for an argument: dataframes/series/arrays by their fingerprint, containers recursively, the rest by repr
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return ("frame", frame_fingerprint(value))
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            return ("array", value.shape, frame_fingerprint(pd.Series(value.ravel())))
+        return ("array", value.dtype.str, value.shape, hashlib.blake2b(np.ascontiguousarray(value).tobytes(), digest_size=16).hexdigest())
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(_arg_key(v) for v in value))
+    if isinstance(value, dict):
+        return ("dict", tuple(sorted((repr(k), _arg_key(v)) for k, v in value.items())))
+    if isinstance(value, (set, frozenset)):
+        return ("set", tuple(sorted(repr(v) for v in value)))
+    return (type(value).__name__, repr(value))
+
+def _nbytes(value) -> int:
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, pd.Index):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if is_dataclass(value) and not isinstance(value, type):
+        # e.g. `TitleIndex` or `AwardSummary`: the arrays/frames of their fields, and the ones they derive in `__post_init__`
+        return sys.getsizeof(value) + sum(_nbytes(v) for v in vars(value).values())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(_nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_nbytes(v) for v in value.values())
+    return sys.getsizeof(value)
+
+def _copy_result(value) -> Any:
+    # Memoized results are shared: callers get copies, so that modifying them (e.g. adding a column) does not alter the cache
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+        return value.copy()
+    if is_dataclass(value) and not isinstance(value, type):
+        # e.g. `TitleIndex` or `AwardSummary`: rebuilt from copies of their fields (`__post_init__` derives the rest again)
+        return replace(value, **{field.name: _copy_result(getattr(value, field.name)) for field in fields(value) if field.init})
+    if isinstance(value, (list, tuple)):
+        return type(value)(_copy_result(v) for v in value)
+    if isinstance(value, dict):
+        return {k: _copy_result(v) for k, v in value.items()}
+    if isinstance(value, set):
+        return set(value)
+    return value
+
+
+class _MemoStore:
+    # LRU store shared by all the memoized functions, bounded by the (estimated) size of the results it holds
+    def __init__(self):
+        self._entries: OrderedDict[tuple,tuple[Any,int]] = OrderedDict()
+        self._nbytes = 0
+        self._stats: dict[str,list[int]] = {}
+        self._lock = Lock()
+
+    def register(self, name: str):
+        with self._lock:
+            self._stats.setdefault(name, [0, 0])
+
+    def get(self, key: tuple) -> tuple[bool,Any]:
+        with self._lock:
+            stats = self._stats[key[0]]
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                stats[0] += 1
+                return True, self._entries[key][0]
+            stats[1] += 1
+            return False, None
+
+    def put(self, key: tuple, value: Any):
+        size = _nbytes(value)
+        with self._lock:
+            if key in self._entries or size > cfg.MEMO_MAX_BYTES:
+                return
+            self._entries[key] = (value, size)
+            self._nbytes += size
+            while self._nbytes > cfg.MEMO_MAX_BYTES:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._nbytes -= evicted_size
+
+    def info(self, name: str) -> MemoInfo:
+        with self._lock:
+            sizes = [size for key, (_, size) in self._entries.items() if key[0] == name]
+            hits, misses = self._stats.get(name, [0, 0])
+            return MemoInfo(hits, misses, len(sizes), sum(sizes))
+
+    def clear(self, name: str|None = None):
+        with self._lock:
+            for key in [key for key in self._entries if name is None or key[0] == name]:
+                self._nbytes -= self._entries.pop(key)[1]
+            for stat_name, stats in self._stats.items():
+                if name is None or stat_name == name:
+                    stats[:] = [0, 0]
+
+    def names(self) -> list[str]:
+        with self._lock:
+            return list(self._stats)
+
+_MEMO_STORE = _MemoStore()
+
+
+@cache
+def _package_source_hash(module_name: str) -> str:
+    # Hash of the sources of the whole top-level package of a module (e.g. all of `src`): a persisted result depends on the helpers it
+    # calls in other modules too, so editing any of them invalidates it
+    package = module_name.split(".")[0]
+    h = hashlib.blake2b(digest_size=16)
+    try:
+        root = Path(sys.modules[package].__file__).parent
+        for path in sorted(root.rglob("*.py")):
+            h.update(path.relative_to(root).as_posix().encode())
+            h.update(path.read_bytes())
+    except (AttributeError, OSError, TypeError, KeyError):
+        h.update(module_name.encode())
+    return h.hexdigest()
+
+def memoize_frames(func: Callable|None = None, *, persist: bool = False) -> Callable:
+    """
+    Memoizes a function taking dataframes (which `functools.cache` cannot do, as they are not hashable):
+    the arguments are keyed by `frame_fingerprint` (so in-place edits of rows which are not sampled go unnoticed, see there).
+    Results live in an LRU store shared by all the memoized functions, bounded by `cfg.MEMO_MAX_BYTES`,
+    and every call returns a copy of them. Like with `functools.cache`, the wrapper has `cache_info()` and `cache_clear()`.
+    Can be used as `@memoize_frames` or `@memoize_frames(persist=True)`.
+
+    Args:
+        func (Callable): The function to memoize. It has to be pure (not modify its inputs, nor depend on a global state).
+        persist (bool): Whether to also keep the results on disk (see `ResultStore`), so that they survive kernel restarts.
+            They are keyed by the function, the hash of the sources of its package, and the fingerprints of the arguments.
+
+    Returns:
+        Callable: The memoized function.
+    """
+    if func is None:
+        return partial(memoize_frames, persist=persist)
+
+    name = f"{func.__module__}.{func.__qualname__}"
+    signature = inspect.signature(func)
+    _MEMO_STORE.register(name)
+
+    def disk_key(key: tuple) -> str:
+        h = hashlib.blake2b(digest_size=20)
+        h.update(repr((key, _package_source_hash(func.__module__))).encode())
+        return h.hexdigest()
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if cfg.MEMO_MAX_BYTES <= 0 and not persist:
+            return func(*args, **kwargs)
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = (name,) + tuple((arg_name, _arg_key(value)) for arg_name, value in bound.arguments.items())
+        found, result = _MEMO_STORE.get(key)
+        if found:
+            return _copy_result(result)
+
+        store = default_result_store() if persist else None
+        if store is not None:
+            found, result = store.get(disk_key(key))
+        if not found:
+            result = func(*args, **kwargs)
+            if store is not None:
+                store.put(disk_key(key), result, name)
+        _MEMO_STORE.put(key, result)
+        return _copy_result(result)
+
+    wrapper.cache_info = lambda: _MEMO_STORE.info(name)
+    wrapper.cache_clear = lambda: _MEMO_STORE.clear(name)
+    return wrapper
+
+def memo_info() -> pd.DataFrame:
+    # Hits, misses, number of entries and size of the cached results of every memoized function
+    return pd.DataFrame({name: _MEMO_STORE.info(name)._asdict() for name in _MEMO_STORE.names()}).T
+
+def clear_memo():
+    _MEMO_STORE.clear()
@@ -6,5 +6,20 @@ COLOR_PALETTE = ["#88CCEE","#E69F00","#CC79A7","#F0E442","#009E73","#D55E00","#8
 @dataclass
 class RunConfig:
     USE_MATPLOTLIB: bool
+    CACHE_DIR: str|None = "data/cache/" # Where intermediate results are cached on disk (relative to the root, like the datasets). None disables it
+    MEMO_MAX_BYTES: int = 512 * 2**20 # Memory budget shared by the functions decorated with `memoize_frames` (0 disables the memoization)
+    RESULT_STORE_MAX_BYTES: int = 2 * 2**30 # Disk budget of the results persisted by `memoize_frames(persist=True)`, under CACHE_DIR
+    RESAMPLING_N_RESAMPLES: int = 10_000 # Replicates of the permutation/bootstrap tests (see src/utils/stats_utils.py)
+    RESAMPLING_JOBS: int|None = 1 # Processes running these replicates (None: all the cores). Opt-in: only worth it for large groups
+    DENSITY_SCATTER_THRESHOLD: int = 5_000 # Above this many points, the large scatter plots are drawn as a density (see src/plots/density.py)
+    DENSITY_BINS: int = 100 # Cells of the density grid along each axis
+    SKETCH_K: int = 1024 # Accuracy of the quantile sketches (rank error ~1/SKETCH_K, see `QuantileSketch`)
+    SKETCH_MAX_OUTLIERS: int = 200 # Outliers drawn per box when the boxes come from sketches
+    SCALE_MIN_SCORES: int = 5 # Critics/publications with fewer scores are not normalized by their own grading scale (see `mrt_scale_normalized_scores`)
+    TITLE_YEAR_TOLERANCE: int = 1 # Release years of the same movie may differ by this much across datasets (see `TitleIndex.match`)
+    LINK_BLOCK_TOKENS: int = 2 # Rarest title words of each record whose blocks it joins (see src/utils/entity_linking.py)
+    LINK_RUNTIME_TOLERANCE: float = 15. # Runtimes (minutes) this far apart no longer count as similar
+    LINK_MIN_TITLE_SIMILARITY: float = 0.5 # Pairs with less similar titles are never linked, whatever their other features
+    LINK_MIN_SCORE: float = 0.7 # Minimal score of a link between two records
 
 NOTEBOOK_RUNCONFIG = RunConfig(True)
\ No newline at end of file
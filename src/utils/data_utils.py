@@ -1,14 +1,22 @@
-import swifter
 from dataclasses import dataclass
-from functools import cached_property
 import pandas as pd
 from pathlib import Path
-import ast
 from ..data.project_dataset import ProjectDataset
-from .general_utils import all_valid,normalize_sa,zscore
+from .general_utils import all_valid,normalize_sa
+from .cache_utils import memoize_frames
+from .freebase_utils import list_column_links, parse_freebase_column
+from .stats_utils import group_moments, merge_moments, moments_summary
+from .title_utils import NameIndex, TitleIndex, TitleMatch, raw_title_join_size
+from .entity_linking import link_records, resolve_entities
+from .constants import NOTEBOOK_RUNCONFIG as cfg
 from pathlib import Path
 from datetime import datetime
+from enum import IntEnum
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
+import os
 import numpy as np
+import re
 
 # ============ ============ ============ ============ ============ ============
 # Functions used to preprocess Massive Rotten Tomatoes reviews dataset
@@ -27,56 +35,554 @@ def mrt_standardize_score(note):
     else:
         return None
     
-def mrt_preprocess_df(df, col1, col2, merge_col, expert, comedy_ids:pd.Series, comedy: bool, use_zscore= False):
-    # Preprocesses the MRT df to get the standardized score only (z-score, or simply bounded between 0-1),
-    df = df[df['isTopCritic'] == expert].copy()
-    if comedy:
-        df = df[df[merge_col].isin(comedy_ids)]
+class ScoreStatus(IntEnum):
+    # How each `originalScore` was understood by `mrt_normalize_scores`
+    MISSING = 0
+    FRACTION = 1 # "3/4", "3.5 / 5", "7 out of 10"
+    LETTER = 2 # "B+", "a-" (F..A+ evenly spaced over [0,1])
+    PERCENT = 3 # "85%"
+    STARS = 4 # "3.5 stars" (assumed out of 5)
+    OUT_OF_RANGE = 5 # Parsed, but outside of [0,1] (e.g. "5/4", "120%")
+    UNPARSED = 6 # Anything else (e.g. "3.5" without a scale, "2/0")
+
+LETTER_GRADES = {grade: i/12 for i, grade in enumerate(["F", "D-", "D", "D+", "C-", "C", "C+", "B-", "B", "B+", "A-", "A", "A+"])}
+_NUMBER = r"(\d+(?:\.\d+)?|\.\d+)"
+
+def mrt_normalize_scores(scores: pd.Series) -> pd.DataFrame:
+    """
+    Vectorized, multi-format version of `mrt_standardize_score`: fractions (as before), letter grades, percentages and star ratings
+    are all mapped to [0,1]. The parsing is done with string accessors on the distinct values only, then broadcast to the rows.
+
+    Args:
+        scores (pd.Series): The raw scores (e.g. the `originalScore` column of the MRT reviews).
+
+    Returns:
+        DataFrame: Aligned with `scores`, the `score` (float32, NaN unless the status is FRACTION/LETTER/PERCENT/STARS)
+            and the `status` (int8, see `ScoreStatus`) of each review.
+    """
+    codes, uniques = pd.factorize(scores)
+    text = pd.Series(np.asarray(uniques, dtype=object)).astype(str).str.strip()
+
+    fraction = text.str.extract(rf"^[+]?{_NUMBER}\s*(?:/|\s(?:out\s+)?of\s)\s*{_NUMBER}$", flags=re.IGNORECASE).astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction_score = np.where(fraction[1] > 0, fraction[0] / fraction[1], np.nan)
+    percent_score = text.str.extract(rf"^{_NUMBER}\s*%$")[0].astype(np.float64) / 100
+    stars_score = text.str.extract(rf"^{_NUMBER}\s*stars?$", flags=re.IGNORECASE)[0].astype(np.float64) / 5
+    letter_score = text.str.upper().str.replace(r"\s+", "", regex=True).map(LETTER_GRADES).astype(np.float64)
+
+    parsed = [fraction[0].notna() & (fraction[1] > 0), letter_score.notna(), percent_score.notna(), stars_score.notna()]
+    score = np.select(parsed, [fraction_score, letter_score, percent_score, stars_score], np.nan)
+    status = np.select(parsed, [ScoreStatus.FRACTION, ScoreStatus.LETTER, ScoreStatus.PERCENT, ScoreStatus.STARS], ScoreStatus.UNPARSED)
+    out_of_range = ~np.isnan(score) & ((score < 0) | (score > 1))
+    status[out_of_range] = ScoreStatus.OUT_OF_RANGE
+    score[out_of_range] = np.nan
+    status[(text == "").to_numpy()] = ScoreStatus.MISSING
+
+    # Missing values (code -1) map to the last entry
+    score = np.append(score, np.nan).astype(np.float32)
+    status = np.append(status, ScoreStatus.MISSING).astype(np.int8)
+    return pd.DataFrame({"score": score[codes], "status": status[codes]}, index=scores.index)
+
+def _apply_per_unique(series: pd.Series, func) -> np.ndarray:
+    # `series.apply(func)` (as floats) calling `func` once per distinct value: the scores take a few thousand values over ~1.4M reviews
+    codes, uniques = pd.factorize(series)
+    results = np.array([func(value) for value in uniques] + [func(np.nan)], dtype=np.float64) # NaN (code -1) maps to the last one
+    return results[codes]
+
+def mrt_preprocess_cells(df, col1, col2, merge_col, comedy_ids:pd.Series, use_zscore= False, all_formats= False, normalize_by=None) -> pd.DataFrame:
+    """
+    Per-movie mean standardized score (`col1`) and mean sentiment (`col2`) of the MRT reviews, for the four (expert, comedy) cells at once:
+    the scores are standardized once, and a single groupby computes all the cells (see `mrt_cell_view` to get the ones of a cell).
+
+    Args:
+        df (DataFrame): The reviews (e.g. `EDI.mrtrev_sa_df`), with an `isTopCritic` column.
+        col1 (str): The score column (e.g. 'originalScore'), standardized with `mrt_standardize_score`.
+        col2 (str): The sentiment column (e.g. 'sa'), normalized with `normalize_sa` (or z-scored within each cell if `use_zscore`).
+        merge_col (str): The movie id column.
+        comedy_ids (pd.Series): The ids of the comedies.
+        use_zscore (bool): See `col2`.
+        all_formats (bool): Whether to standardize the scores with `mrt_normalize_scores` (fractions, letter grades, percentages
+            and stars) rather than `mrt_standardize_score` (fractions only, as in our results).
+        normalize_by (str|None): If given ('criticName' or 'publicatioName'), the standardized scores are also z-scored within
+            each critic/publication (see `mrt_scale_normalized_scores`), to remove the differences of grading scale.
+
+    Returns:
+        DataFrame: The means of `col1` and `col2`, indexed by (isTopCritic, is_comedy, merge_col).
+    """
+    # `cfg.SCALE_MIN_SCORES` is resolved before the memoized call, so that it is part of its key
+    min_scores = None if normalize_by is None else cfg.SCALE_MIN_SCORES
+    scales = None if normalize_by is None else _persisted_score_scales(df, normalize_by, col1, all_formats)
+    return _mrt_preprocess_cells(df, col1, col2, merge_col, comedy_ids, use_zscore, all_formats, normalize_by, min_scores, scales)
+
+def _persisted_score_scales(df, group_col, col1, all_formats) -> pd.DataFrame|None:
+    # The persisted scales of the reviews of `EDI` (see `ExtraDatasetInfo.mrt_score_scales`) when they are the ones of `df`,
+    # None otherwise (they are then computed from `df`)
+    from .. import EDI
+    if all_formats and col1 == 'originalScore' and df is EDI.__dict__.get('mrtrev_sa_df'):
+        return EDI.mrt_score_scales.loc[group_col]
+    return None
+
+@memoize_frames
+def _mrt_preprocess_cells(df, col1, col2, merge_col, comedy_ids, use_zscore, all_formats, normalize_by, min_scores, scales=None) -> pd.DataFrame:
+    df = df[df['isTopCritic'].isin([True, False])]
+    cells = pd.DataFrame({
+        'isTopCritic': df['isTopCritic'].astype(bool),
+        'is_comedy': df[merge_col].isin(comedy_ids),
+        merge_col: df[merge_col],
+        col1: (mrt_standardized_scores(df[col1], all_formats) if normalize_by is None else
+               mrt_scale_normalized_scores(df, mrt_score_scales(df, normalize_by, col1, all_formats) if scales is None else scales,
+                                           normalize_by, col1, all_formats, min_scores)),
+    })
+    if use_zscore:
+        sentiment = df[col2].groupby([cells['isTopCritic'], cells['is_comedy']])
+        cells[col2] = (df[col2] - sentiment.transform('mean')) / sentiment.transform('std')
     else:
-        df = df[~df[merge_col].isin(comedy_ids)]
+        cells[col2] = normalize_sa(df[col2])
+    return cells.groupby(['isTopCritic', 'is_comedy', merge_col])[[col1, col2]].mean()
+
+def mrt_cell_view(cells: pd.DataFrame, col1, col2, merge_col, expert: bool, comedy: bool):
+    # The (df1, df2) tuple of one cell of `mrt_preprocess_cells`: the per-movie mean of `col1`, and the one of `col2` (without missing values)
+    try:
+        cell = cells.xs((expert, comedy), level=['isTopCritic', 'is_comedy'])
+    except KeyError: # No review in this cell
+        cell = cells.iloc[:0].droplevel(['isTopCritic', 'is_comedy'])
+    return cell[col1].reset_index().dropna(), cell[col2].reset_index().dropna()
+
+def mrt_preprocess_df(df, col1, col2, merge_col, expert, comedy_ids:pd.Series, comedy: bool, use_zscore= False, all_formats= False,
+                      normalize_by=None):
+    # Preprocesses the MRT df to get the standardized score only (z-score, or simply bounded between 0-1),
+    # for the reviews of one (expert, comedy) cell. The four cells are computed at once (and memoized) by `mrt_preprocess_cells`
+    cells = mrt_preprocess_cells(df, col1, col2, merge_col, comedy_ids, use_zscore, all_formats, normalize_by)
+    return mrt_cell_view(cells, col1, col2, merge_col, expert, comedy)
 
-    df[col1] = df[col1].apply(mrt_standardize_score)
-    df[col2] = zscore(df[col2]) if use_zscore else df[col2].apply(normalize_sa)
-        
-    df1 = df.groupby(merge_col)[col1].mean().reset_index()
-    df2 = df.groupby(merge_col)[col2].mean().reset_index()
-    df1 = df1.dropna()
-    df2 = df2.dropna()
 
-    return df1, df2 
+# ============ ============ ============ ============ ============ ============
+# Per-critic/publication grading scales of the MRT reviews
+# ============ ============ ============ ============ ============ ============
+
+MRT_SCALE_GROUPS = ("criticName", "publicatioName")
+
+def mrt_standardized_scores(scores: pd.Series, all_formats=False) -> np.ndarray:
+    # The scores in [0,1] (NaN when not understood), with `mrt_normalize_scores` or `mrt_standardize_score` (see `mrt_preprocess_cells`)
+    if all_formats:
+        return mrt_normalize_scores(scores)["score"].to_numpy(np.float64)
+    return _apply_per_unique(scores, mrt_standardize_score)
+
+def mrt_score_scales(chunks, group_col='criticName', col1='originalScore', all_formats=False) -> pd.DataFrame:
+    """
+    Grading scale of each critic (or publication): number of scores, mean and standard deviation of its standardized scores.
+    Computed in a single streaming pass, with mergeable (Welford) per-group moments: each chunk is reduced to the moments of its groups,
+    which are then merged, so the reviews never have to be held at once (e.g. `MASSIVE_RT_REVIEW_DS.iter_chunks(...)`).
+
+    Args:
+        chunks (Iterable[DataFrame]|DataFrame): The reviews, by chunks (a single dataframe is one chunk).
+        group_col (str): 'criticName' or 'publicatioName'.
+        col1 (str): The score column.
+        all_formats (bool): How the scores are standardized (see `mrt_preprocess_cells`).
+
+    Returns:
+        DataFrame: `n`, `mean` and `std` of each critic (or publication), indexed by `group_col` (sorted).
+    """
+    moments = [group_moments(mrt_standardized_scores(chunk[col1], all_formats), chunk[group_col])
+               for chunk in ([chunks] if isinstance(chunks, pd.DataFrame) else chunks)]
+    return moments_summary(merge_moments(*moments)).sort_index()
+
+def mrt_scale_normalized_scores(reviews: pd.DataFrame, scales: pd.DataFrame, group_col='criticName', col1='originalScore',
+                                all_formats=False, min_scores: int|None = None) -> np.ndarray:
+    """
+    The standardized scores of the reviews, z-scored with the grading scale of their critic (or publication).
+
+    Args:
+        reviews (DataFrame): The reviews.
+        scales (DataFrame): The scales of the critics (or publications), see `mrt_score_scales`.
+        group_col (str): 'criticName' or 'publicatioName'.
+        col1 (str): The score column.
+        all_formats (bool): How the scores are standardized (see `mrt_preprocess_cells`).
+        min_scores (int|None): Scores of the critics with fewer scores (or a null deviation) are NaN (`cfg.SCALE_MIN_SCORES` when None).
+
+    Returns:
+        np.ndarray: The normalized score of each review.
+    """
+    min_scores = cfg.SCALE_MIN_SCORES if min_scores is None else min_scores
+    scales = scales[(scales["n"] >= min_scores) & (scales["std"] > 0)]
+    # The scale of each review, looked up through the codes of its critic
+    codes = pd.Index(scales.index).get_indexer(reviews[group_col].to_numpy())
+    found = codes >= 0
+    mean, std = np.full(len(reviews), np.nan), np.full(len(reviews), np.nan)
+    mean[found], std[found] = scales["mean"].to_numpy()[codes[found]], scales["std"].to_numpy()[codes[found]]
+    return (mrt_standardized_scores(reviews[col1], all_formats) - mean) / std
 
 
 
 
+# ============ ============ ============ ============ ============ ============
+# Per-movie aggregates of the MRT reviews (materialized, see `ExtraDatasetInfo.mrt_movie_aggregates`)
+# ============ ============ ============ ============ ============ ============
+
+MRT_AGGREGATE_COLUMNS = ["id", "reviewId", "creationDate", "isTopCritic", "originalScore", "reviewState", "sa"] # Those present are hashed
+_CRITIC_GROUPS = {True: "top", False: "other"}
+
+def _movie_review_hashes(reviews: pd.DataFrame, movie_codes: np.ndarray, n_movies: int) -> np.ndarray:
+    # Order-independent hash of the reviews of each movie (the wrapping sum of the hashes of its rows), used to find the movies whose reviews changed
+    cols = [col for col in MRT_AGGREGATE_COLUMNS if col in reviews.columns]
+    row_hashes = pd.util.hash_pandas_object(reviews[cols], index=False).to_numpy()
+    order = np.argsort(movie_codes, kind="stable")
+    starts = np.searchsorted(movie_codes[order], np.arange(n_movies))
+    return np.add.reduceat(row_hashes[order], starts).view(np.int64) if n_movies else np.zeros(0, dtype=np.int64)
+
+def mrt_movie_aggregates(reviews: pd.DataFrame, col1='originalScore', col2='sa', merge_col='id') -> pd.DataFrame:
+    """
+    Compact per-movie statistics of the MRT reviews, for the top critics (`top_` columns) and the other ones (`other_` columns):
+    number of reviews, number/mean/variance of the standardized scores (see `mrt_standardize_score`) and of the sentiments (raw compound).
+    Also holds the fresh/rotten counts, the first/last `creationDate`, and a hash of the reviews (see `refresh_mrt_movie_aggregates`).
+
+    Args:
+        reviews (DataFrame): The reviews (e.g. `EDI.mrtrev_sa_df`).
+        col1 (str): The score column.
+        col2 (str): The sentiment column.
+        merge_col (str): The movie id column.
+
+    Returns:
+        DataFrame: One row per movie, indexed by `merge_col` (sorted).
+    """
+    # The ids are factorized once, all the groupbys are then done on their (integer) codes
+    reviews = reviews[reviews[merge_col].notna()]
+    codes, ids = pd.factorize(reviews[merge_col], sort=True)
+    stats = pd.DataFrame({
+        'movie': codes,
+        'isTopCritic': reviews['isTopCritic'].to_numpy(),
+        'score': _apply_per_unique(reviews[col1], mrt_standardize_score),
+        'sentiment': reviews[col2].to_numpy(np.float64),
+    })
+    per_critic = stats[stats['isTopCritic'].isin([True, False])].groupby(['movie', 'isTopCritic']).agg(
+        n_reviews=('score', 'size'),
+        n_scores=('score', 'count'), score_mean=('score', 'mean'), score_var=('score', 'var'),
+        n_sentiments=('sentiment', 'count'), sentiment_mean=('sentiment', 'mean'), sentiment_var=('sentiment', 'var'),
+    ).unstack('isTopCritic')
+    stat_names = ['n_reviews', 'n_scores', 'score_mean', 'score_var', 'n_sentiments', 'sentiment_mean', 'sentiment_var']
+    per_critic = per_critic.reindex(index=np.arange(len(ids)), columns=pd.MultiIndex.from_product([stat_names, list(_CRITIC_GROUPS)]))
+    per_critic.columns = [f"{_CRITIC_GROUPS[expert]}_{stat}" for stat, expert in per_critic.columns]
+    count_cols = [col for col in per_critic.columns if "_n_" in col]
+    per_critic[count_cols] = per_critic[count_cols].fillna(0).astype(np.int32)
+
+    state = reviews['reviewState'].astype(str).to_numpy()
+    dates = pd.Series(pd.to_datetime(reviews['creationDate'], errors='coerce', format='ISO8601').to_numpy()).groupby(codes)
+    table = per_critic.assign(
+        n_fresh=np.bincount(codes, weights=state == 'fresh', minlength=len(ids)).astype(np.int32),
+        n_rotten=np.bincount(codes, weights=state == 'rotten', minlength=len(ids)).astype(np.int32),
+        first_review=dates.min(),
+        last_review=dates.max(),
+        reviews_hash=_movie_review_hashes(reviews, codes, len(ids)),
+    )
+    table.index = pd.Index(np.asarray(ids, dtype=object), name=merge_col)
+    return table
+
+def refresh_mrt_movie_aggregates(table: pd.DataFrame, reviews: pd.DataFrame, col1='originalScore', col2='sa', merge_col='id') -> tuple[pd.DataFrame, int]:
+    """
+    Updates a table built by `mrt_movie_aggregates` for a new version of the reviews: only the movies whose reviews changed
+    (or which are new) are re-aggregated, and the movies without reviews anymore are dropped.
+
+    Returns:
+        tuple[DataFrame, int]: The updated table (same as `mrt_movie_aggregates(reviews)`), and the number of movies re-aggregated.
+    """
+    reviews = reviews[reviews[merge_col].notna()]
+    codes, ids = pd.factorize(reviews[merge_col], sort=True)
+    hashes = pd.Series(_movie_review_hashes(reviews, codes, len(ids)), index=pd.Index(np.asarray(ids, dtype=object), name=merge_col))
+    changed = hashes.index[hashes.ne(table['reviews_hash'].reindex(hashes.index))]
+    kept = table[table.index.isin(hashes.index) & ~table.index.isin(changed)]
+    if len(changed) == 0:
+        return kept, 0
+    updated = mrt_movie_aggregates(reviews[reviews[merge_col].isin(changed)], col1, col2, merge_col)
+    return pd.concat([kept, updated[kept.columns]]).sort_index(), len(changed)
+
+def mrt_cells_from_aggregates(table: pd.DataFrame, comedy_ids: pd.Series, col1='originalScore', col2='sa', merge_col='id') -> pd.DataFrame:
+    # Same as `mrt_preprocess_cells` (with the default arguments), from the per-movie aggregates rather than from the 1.3M reviews:
+    # being a comedy is a property of the movie, so each cell is a selection of the per-(movie, critic group) means
+    cells = []
+    for expert, critic in _CRITIC_GROUPS.items():
+        has_reviews = table[f"{critic}_n_reviews"] > 0
+        cell = pd.DataFrame({
+            'isTopCritic': expert,
+            'is_comedy': table.index.isin(comedy_ids),
+            merge_col: table.index,
+            col1: table[f"{critic}_score_mean"].to_numpy(),
+            col2: (table[f"{critic}_sentiment_mean"].to_numpy() + 1) / 2, # `normalize_sa` of the mean
+        })[has_reviews.to_numpy()]
+        cells.append(cell)
+    return pd.concat(cells).set_index(['isTopCritic', 'is_comedy', merge_col]).sort_index()
+
+
+# ============ ============ ============ ============ ============ ============
+# Time series of the MRT reviews (materialized, see `ExtraDatasetInfo.mrt_sentiment_timeline`)
+# ============ ============ ============ ============ ============ ============
+
+_DAY_BITS = 32 # The bins are keyed by (movie code << _DAY_BITS) + day, so that a single sorted array locates any (movie, day)
+_DAY_OFFSET = 2**31 # Days are stored shifted, to keep the keys of dates before 1970 positive
+
+@dataclass
+class SentimentTimeline:
+    """
+    Per-movie daily (or weekly) bins of the MRT reviews: number of reviews, number of sentiments and sum of the sentiments (raw compound),
+    sorted by (movie, day), with prefix sums over the bins. Any window of days of any set of movies is then answered with two binary
+    searches per movie (see `window`), rather than by re-scanning the reviews.
+
+    Attributes:
+        ids (np.ndarray): The movie ids (sorted), `movie` holds their codes.
+        movie (np.ndarray): The movie code of each bin.
+        day (np.ndarray): The day of each bin (days since 1970-01-01, the Monday starting the week for weekly bins).
+        n (np.ndarray): The number of reviews of each bin.
+        n_sa (np.ndarray): The number of those with a sentiment.
+        sa_sum (np.ndarray): The sum of their sentiments.
+        freq (str): "D" or "W".
+    """
+    ids: np.ndarray
+    movie: np.ndarray
+    day: np.ndarray
+    n: np.ndarray
+    n_sa: np.ndarray
+    sa_sum: np.ndarray
+    freq: str = "D"
+
+    def __post_init__(self):
+        self._keys = (self.movie.astype(np.int64) << _DAY_BITS) + (self.day.astype(np.int64) + _DAY_OFFSET)
+        self._cum = {col: np.concatenate([[0], np.cumsum(getattr(self, col))]) for col in ("n", "n_sa", "sa_sum")}
+        self._starts = np.searchsorted(self.movie, np.arange(len(self.ids) + 1))
+
+    @classmethod
+    def from_reviews(cls, reviews: pd.DataFrame, col2='sa', merge_col='id') -> "SentimentTimeline":
+        # Vectorized resampling of the reviews into daily bins (reviews without a date, or a movie, are left out)
+        dates = pd.to_datetime(reviews['creationDate'], errors='coerce', format='ISO8601')
+        keep = dates.notna().to_numpy() & reviews[merge_col].notna().to_numpy()
+        reviews, dates = reviews[keep], dates[keep]
+        codes, ids = pd.factorize(reviews[merge_col], sort=True)
+        days = dates.to_numpy().astype('datetime64[D]').astype(np.int64)
+        bins, bin_of_review = np.unique((codes.astype(np.int64) << _DAY_BITS) + (days + _DAY_OFFSET), return_inverse=True)
+        sentiment = reviews[col2].to_numpy(np.float64)
+        has_sa = ~np.isnan(sentiment)
+        return cls(ids=np.asarray(ids, dtype=object),
+                   movie=(bins >> _DAY_BITS).astype(np.int32),
+                   day=((bins & (2**_DAY_BITS - 1)) - _DAY_OFFSET).astype(np.int32),
+                   n=np.bincount(bin_of_review, minlength=len(bins)).astype(np.int32),
+                   n_sa=np.bincount(bin_of_review, weights=has_sa, minlength=len(bins)).astype(np.int32),
+                   sa_sum=np.bincount(bin_of_review, weights=np.where(has_sa, sentiment, 0), minlength=len(bins)))
+
+    # ============ ============ Persistence ============ ============
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({'id': pd.Categorical.from_codes(self.movie, categories=self.ids), 'day': self.day,
+                             'n': self.n, 'n_sa': self.n_sa, 'sa_sum': self.sa_sum})
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, freq: str = "D") -> "SentimentTimeline":
+        ids = df['id'].astype('category')
+        return cls(np.asarray(ids.cat.categories, dtype=object), ids.cat.codes.to_numpy(np.int32), df['day'].to_numpy(np.int32),
+                   df['n'].to_numpy(np.int32), df['n_sa'].to_numpy(np.int32), df['sa_sum'].to_numpy(np.float64), freq)
+
+    def resample(self, freq: str) -> "SentimentTimeline":
+        # The weekly ("W") bins of the daily ones (weeks starting on Monday; 1970-01-01 was a Thursday)
+        if freq == self.freq:
+            return self
+        if (self.freq, freq) != ("D", "W"):
+            raise ValueError(f"Can only resample daily bins to weekly ones, not {self.freq} to {freq}")
+        week = self.day - (self.day + 3) % 7
+        keys, bin_of_day = np.unique((self.movie.astype(np.int64) << _DAY_BITS) + (week.astype(np.int64) + _DAY_OFFSET), return_inverse=True)
+        return SentimentTimeline(self.ids, (keys >> _DAY_BITS).astype(np.int32), ((keys & (2**_DAY_BITS - 1)) - _DAY_OFFSET).astype(np.int32),
+                                 np.bincount(bin_of_day, weights=self.n).astype(np.int32),
+                                 np.bincount(bin_of_day, weights=self.n_sa).astype(np.int32),
+                                 np.bincount(bin_of_day, weights=self.sa_sum), freq)
+
+    # ============ ============ Queries ============ ============
+
+    def _codes(self, ids) -> np.ndarray:
+        # The codes of the given movie ids (all the movies when None), the unknown ones being left out
+        if ids is None:
+            return np.arange(len(self.ids))
+        codes = pd.Index(self.ids).get_indexer(np.asarray(ids, dtype=object))
+        return np.unique(codes[codes >= 0])
+
+    def first_day(self, ids=None) -> np.ndarray:
+        # The day of the first review of each movie (of `ids`)
+        return self.day[self._starts[self._codes(ids)]]
+
+    def window(self, ids=None, start=0, end=None, relative=True) -> pd.DataFrame:
+        """
+        Aggregates the reviews of each movie within a window of days, e.g. `window(comedy_ids, 0, 30)` for the first 30 days
+        after the first review of each comedy, and `window(comedy_ids, 30)` for the later reviews.
+
+        Args:
+            ids (array-like|None): The movies (all of them when None).
+            start (int|str|pd.Timestamp|None): The first day of the window: a number of days since the first review of each movie if `relative`,
+                a date otherwise (None: since the first review).
+            end (int|str|pd.Timestamp|None): The day after the window, in the same way (None: until the last review).
+            relative (bool): See `start` and `end`.
+
+        Returns:
+            DataFrame: The number of reviews, number of sentiments, sum and mean of the sentiments of each movie in the window, indexed by id.
+        """
+        codes = self._codes(ids)
+        movie_keys = codes.astype(np.int64) << _DAY_BITS
+        first = self.day[self._starts[codes]].astype(np.int64)
+        def bound(day, default):
+            if day is None:
+                return np.full(len(codes), default, dtype=np.int64)
+            day = (first + int(day)) if relative else np.full(len(codes), (pd.Timestamp(day) - pd.Timestamp(0)).days, dtype=np.int64)
+            return np.clip(day + _DAY_OFFSET, 0, 2**_DAY_BITS - 1)
+        lo = np.searchsorted(self._keys, movie_keys + bound(start, 0), side="left")
+        hi = np.searchsorted(self._keys, movie_keys + bound(end, 2**_DAY_BITS - 1), side="left")
+        result = pd.DataFrame({col: self._cum[col][hi] - self._cum[col][lo] for col in ("n", "n_sa", "sa_sum")},
+                              index=pd.Index(self.ids[codes], name='id'))
+        result['sa_mean'] = result['sa_sum'] / result['n_sa'].where(result['n_sa'] > 0)
+        return result
+
+    def early_vs_late(self, ids=None, days: int = 30) -> pd.DataFrame:
+        # The mean sentiment of the reviews of the first `days` days of each movie, and of the later ones
+        early, late = self.window(ids, 0, days), self.window(ids, days)
+        return pd.DataFrame({'n_early': early['n'], 'sa_early': early['sa_mean'], 'n_late': late['n'], 'sa_late': late['sa_mean']})
+
+    def series(self, movie_id) -> pd.DataFrame:
+        # The bins of one movie, indexed by date
+        code = self._codes([movie_id])
+        if len(code) == 0:
+            raise KeyError(movie_id)
+        bins = slice(self._starts[code[0]], self._starts[code[0] + 1])
+        return pd.DataFrame({'n': self.n[bins], 'n_sa': self.n_sa[bins], 'sa_sum': self.sa_sum[bins]},
+                            index=pd.DatetimeIndex(self.day[bins].astype('datetime64[D]'), name='date'))
+
+    def rolling(self, movie_id, days: int) -> pd.Series:
+        # The mean sentiment of the reviews of the last `days` days (weeks for weekly bins), at each bin of one movie
+        bins = self.series(movie_id)
+        if self.freq == "W":
+            days *= 7
+        n_sa = bins['n_sa'].rolling(f"{days}D").sum()
+        return (bins['sa_sum'].rolling(f"{days}D").sum() / n_sa.where(n_sa > 0)).rename('sa_mean')
+
+
 # ============ ============ ============ ============ ============ ============
 # Functions used to preprocess movie awards dataset (oscars)
 # ============ ============ ============ ============ ============ ============
+@memoize_frames
 def rename_oscars_cols(oscars_df): #renamed_oscars
     return oscars_df.rename(columns={'film':'title', 'year_film':'release_date'})
 
+# The categories were renamed/split over the years: they are grouped into families (without their parenthesized variant, e.g.
+# "CINEMATOGRAPHY (Color)"), and the renamed ones are merged, so that a film's categories fit in a 64 bits mask
+OSCAR_CATEGORY_ALIASES = {
+    "ACTOR": "ACTOR IN A LEADING ROLE",
+    "ACTRESS": "ACTRESS IN A LEADING ROLE",
+    "OUTSTANDING PICTURE": "BEST PICTURE",
+    "OUTSTANDING PRODUCTION": "BEST PICTURE",
+    "OUTSTANDING MOTION PICTURE": "BEST PICTURE",
+    "BEST MOTION PICTURE": "BEST PICTURE",
+    "ART DIRECTION": "PRODUCTION DESIGN",
+    "FOREIGN LANGUAGE FILM": "INTERNATIONAL FEATURE FILM",
+    "DOCUMENTARY (Feature)": "DOCUMENTARY FEATURE FILM",
+    "DOCUMENTARY (Short Subject)": "DOCUMENTARY SHORT FILM",
+    "SHORT SUBJECT": "SHORT FILM",
+    "MAKEUP": "MAKEUP AND HAIRSTYLING",
+}
+AWARD_COLUMNS = ["nominations", "wins", "categories", "won_categories", "first_ceremony"]
+
+def oscar_category_families(categories: pd.Series) -> pd.Series:
+    # The family of each (raw) category, see `OSCAR_CATEGORY_ALIASES`
+    categories = categories.astype(str).str.strip()
+    families = categories.replace(OSCAR_CATEGORY_ALIASES).str.replace(r"\s*\(.*\)$", '', regex=True)
+    return families.replace(OSCAR_CATEGORY_ALIASES)
+
+def _reduce_awards(codes: np.ndarray, n: int, nominations, wins, categories, won_categories, first_ceremony) -> pd.DataFrame:
+    # Per group (`codes` in [0, n), each of them present): the sums of the counts, the unions of the category masks, and the earliest ceremony
+    order = np.argsort(codes, kind='stable')
+    starts = np.searchsorted(codes[order], np.arange(n))
+    reduce = lambda ufunc, values, dtype: ufunc.reduceat(np.asarray(values, dtype=dtype)[order], starts) if n else np.zeros(0, dtype=dtype)
+    return pd.DataFrame({
+        "nominations": np.bincount(codes, weights=nominations, minlength=n).astype(np.int16),
+        "wins": np.bincount(codes, weights=wins, minlength=n).astype(np.int16),
+        "categories": reduce(np.bitwise_or, categories, np.int64),
+        "won_categories": reduce(np.bitwise_or, won_categories, np.int64),
+        "first_ceremony": reduce(np.minimum, first_ceremony, np.int16),
+    })
+
+@dataclass
+class AwardSummary:
+    """
+    The Oscars, reduced to one row per nominated film (see `summarize_oscars`).
+
+    Attributes:
+        films (pd.DataFrame): Keyed by (`film`, `year_film`) as in the Oscars dataset (and in `movie_links`): the number of `nominations`
+            and of `wins` of the film, the masks of the categories it was nominated in (`categories`) and won (`won_categories`),
+            and the year of its `first_ceremony`.
+        categories (pd.Index): The category family of each bit of the masks (bit i stands for `categories[i]`).
+    """
+    films: pd.DataFrame
+    categories: pd.Index
+
+    def mask(self, *categories) -> int:
+        # The mask of some category families
+        return int(np.bitwise_or.reduce([1 << self.categories.get_loc(category) for category in categories], initial=0))
+
+    def in_categories(self, *categories, won=False) -> np.ndarray:
+        # Boolean mask of the films nominated in (or, with `won`, having won) any of the category families
+        return (self.films["won_categories" if won else "categories"].to_numpy() & self.mask(*categories)) != 0
 
-def prepare_award_comparison_data(movies_awards_df):
+    def category_counts(self, won=False) -> pd.Series:
+        # Number of films nominated in (or having won) each category family, without going back to the nominations
+        masks = self.films["won_categories" if won else "categories"].to_numpy()
+        counts = ((masks[:, None] >> np.arange(len(self.categories))) & 1).sum(axis=0)
+        return pd.Series(counts, index=self.categories, name="wins" if won else "nominations")
+
+@memoize_frames(persist=True)
+def summarize_oscars(oscars_df) -> AwardSummary: # oscar_summary
+    """
+    Reduces the Oscar nominations (e.g. `OSCAR_AWARDS_DS.df`) to one row per nominated film: its numbers of nominations and wins,
+    the masks of its category families (see `oscar_category_families`) and its first ceremony. The (few thousand) films are then joined
+    to the movies directly (see `merge_ccmu_award_summary`), rather than the nominations.
+
+    Args:
+        oscars_df (DataFrame): The raw Oscar nominations.
+
+    Returns:
+        AwardSummary: The films, sorted by (`year_film`, `film`), and the category family of each bit of the masks.
+    """
+    nominated = oscars_df[oscars_df['film'].notna()]
+    codes, films = pd.MultiIndex.from_arrays([nominated['year_film'], nominated['film'].astype(str)]).factorize(sort=True)
+    bit_codes, categories = pd.factorize(oscar_category_families(nominated['category']), sort=True)
+    if len(categories) > 63:
+        raise ValueError(f"{len(categories)} Oscar category families do not fit in a 64 bits mask, group them in OSCAR_CATEGORY_ALIASES")
+    bits = np.left_shift(1, bit_codes.astype(np.int64))
+    won = nominated['winner'].to_numpy(bool)
+    summary = _reduce_awards(codes, len(films), np.ones(len(codes)), won, bits, np.where(won, bits, 0), nominated['year_ceremony'].to_numpy())
+    summary.insert(0, 'film', pd.array(films.get_level_values(1), dtype="string[pyarrow]"))
+    summary.insert(1, 'year_film', films.get_level_values(0).astype(np.int16))
+    return AwardSummary(summary, pd.Index(categories, name="category"))
+
+
+@memoize_frames
+def prepare_award_comparison_data(movie_award_summary):
     """
     Prepares the data for comparing total award-winning movies and award-winning comedies by country.
-    
+
+    The wins are counted per movie, through its (movie, country) links, each movie being weighted by its number of wins (as the winning
+    nominations were counted before). Since each film is matched to a single CMU movie (see `merge_ccmu_award_summary`), a win is no longer
+    counted once per CMU movie with the title of the film, and the films whose title is spelled differently in CMU are counted:
+    the totals differ from the ones of the former join of the nominations on the raw titles.
+
     Args:
-        movies_awards_df (DataFrame): DataFrame containing award data with 'winner', 'genres', and 'countries'.
-    
+        movie_award_summary (DataFrame): The nominated movies with their 'wins', 'genres', and 'countries' (see `merge_ccmu_award_summary`).
+
     Returns:
-        DataFrame: A DataFrame with 'countries', total winning movies, and winning comedies.
+        DataFrame: A DataFrame with 'countries', the wins of their movies ('Winning_Movies_Total'), of their comedies ('Winning_Comedies'),
+            and the share of the latter ('Comedy_Percentage').
     """
-    winning_movies = movies_awards_df[movies_awards_df['winner'] == True]
-    winning_movies = winning_movies.explode('countries')
-    
-    total_award_winning = winning_movies.groupby('countries').size().reset_index(name='Winning_Movies_Total')
-    
-    winning_comedies = winning_movies[winning_movies['genres'].apply(lambda genres: 'Comedy' in genres)]
-    comedy_award_winning = winning_comedies.groupby('countries').size().reset_index(name='Winning_Comedies')
-    
-    country_comparison = total_award_winning.merge(comedy_award_winning, on='countries', how='outer').fillna(0)
-    
-    country_comparison['Winning_Movies_Total'] = country_comparison['Winning_Movies_Total'].astype(int)
-    country_comparison['Winning_Comedies'] = country_comparison['Winning_Comedies'].astype(int)
+    winning_movies = movie_award_summary[movie_award_summary['wins'] > 0]
+    # Counted on the (movie, country) link table rather than on the exploded dataframe (see `LinkTable`), each movie weighted by its wins
+    countries = list_column_links(winning_movies['countries'], 'country')
+    wins = winning_movies['wins'].to_numpy()
+    is_comedy = winning_movies['genres'].map(lambda genres: 'Comedy' in genres).to_numpy()
+
+    country_comparison = pd.DataFrame({
+        'countries': countries.label_array(),
+        'Winning_Movies_Total': countries.aggregate(wins).astype(int),
+        'Winning_Comedies': countries.aggregate(wins * is_comedy).astype(int),
+    })
     
     country_comparison['Comedy_Percentage'] = (country_comparison['Winning_Comedies'] / country_comparison['Winning_Movies_Total']) * 100
     country_comparison['Comedy_Percentage'] = country_comparison['Comedy_Percentage'].fillna(0)
@@ -92,11 +598,15 @@ def prepare_award_comparison_data(movies_awards_df):
 # Functions used to preprocess CMU
 # ============ ============ ============ ============ ============ ============
 
+@memoize_frames(persist=True)
 def prepro_cmu_movies(cmu_movies_df: pd.DataFrame) -> pd.DataFrame: # cmu_cleaned_movies
+    # The cleaning below is used by most of our plots: it is memoized (and persisted, see `memoize_frames`), so it is only done
+    # once per version of the data and of our code
     new_df = cmu_movies_df.copy()
-    new_df["languages"] = new_df["languages"].apply(lambda lang_dict_as_str: list(ast.literal_eval(lang_dict_as_str).values()))
-    new_df["countries"] = new_df["countries"].apply(lambda lang_dict_as_str: list(ast.literal_eval(lang_dict_as_str).values()))
-    new_df["genres"] = new_df["genres"].apply(lambda lang_dict_as_str: list(ast.literal_eval(lang_dict_as_str).values()))
+    # The Freebase dicts are parsed in bulk (see `parse_freebase_column`) rather than with one `ast.literal_eval` per row
+    new_df["languages"] = parse_freebase_column(new_df["languages"]).to_lists()
+    new_df["countries"] = parse_freebase_column(new_df["countries"]).to_lists()
+    new_df["genres"] = parse_freebase_column(new_df["genres"]).to_lists()
     # def parse_release_date(release_date_str):
     #     # The release date is :
     #     #       either empty
@@ -111,6 +621,7 @@ def prepro_cmu_movies(cmu_movies_df: pd.DataFrame) -> pd.DataFrame: # cmu_cleane
     new_df.loc[:,"release_date"] = pd.to_datetime(new_df.release_date,format="mixed").apply(lambda x:x.year)
     return new_df
 
+@memoize_frames
 def prepare_revenue_comparison_data(cmu_cleaned_movies):
     """
     Prepares the data for comparing total box office revenue and comedy box office revenue by country.
@@ -122,20 +633,16 @@ def prepare_revenue_comparison_data(cmu_cleaned_movies):
         DataFrame: A DataFrame with 'countries', total revenue, and comedy revenue.
     """
     movies_with_revenue = cmu_cleaned_movies[cmu_cleaned_movies['box_office_revenue'].notna()]
-    movies_with_revenue = movies_with_revenue.explode('countries')
+    # Summed on the (movie, country) link table rather than on the exploded dataframe (see `LinkTable`)
+    countries = list_column_links(movies_with_revenue['countries'], 'country')
+    revenue = movies_with_revenue['box_office_revenue'].to_numpy(dtype=np.float64)
+    is_comedy = movies_with_revenue['genres'].map(lambda genres: 'Comedy' in genres).to_numpy()
 
-    total_revenue = (movies_with_revenue.groupby('countries')['box_office_revenue']
-                    .sum()
-                    .reset_index(name='Total_Revenue'))
-
-    comedy_movies = movies_with_revenue[
-        movies_with_revenue['genres'].apply(lambda genres: 'Comedy' in genres)
-    ]
-    comedy_revenue = (comedy_movies.groupby('countries')['box_office_revenue']
-                     .sum()
-                     .reset_index(name='Comedy_Revenue'))
-
-    country_comparison = total_revenue.merge(comedy_revenue, on='countries', how='outer').fillna(0)
+    country_comparison = pd.DataFrame({
+        'countries': countries.label_array(),
+        'Total_Revenue': countries.aggregate(revenue),
+        'Comedy_Revenue': countries.aggregate(revenue * is_comedy),
+    })
 
     country_comparison['Comedy_Percentage'] = (
         country_comparison['Comedy_Revenue'] / country_comparison['Total_Revenue'] * 100
@@ -149,16 +656,26 @@ def prepare_revenue_comparison_data(cmu_cleaned_movies):
     
     return country_comparison
 
+@memoize_frames
 def get_comedies_mask(cmu_cleaned_movies): # cmu_comedies
     # Returns the (boolean) comedy mask for the given df
     # The `df` has to be of similar format as `prepro_cmu_movies(CMU_MOVIES_DS.df)`
     return cmu_cleaned_movies["genres"].apply(lambda genre_list: "Comedy" in genre_list or "comedy" in genre_list)
 
+@memoize_frames
 def explode_and_filter_comedy_genres(cmu_comedies): # comedy_genres
-    movies_exploded_genres = cmu_comedies.explode('genres')
-    comedy_genres = movies_exploded_genres[movies_exploded_genres['genres'].str.contains('Comedy', na=False)]
+    # One (release_date, genres) row per comedy genre of each movie (indexed like the movies), built from the
+    # (movie, genre) link table: only the columns needed by `count_comedy_genres_by_release_and_genre` are materialized
+    genres = list_column_links(cmu_comedies['genres'], 'genre')
+    links = genres.links[genres.entries_matching(lambda genre: 'Comedy' in genre)]
+    movie_idx = links['movie_idx'].to_numpy()
+    comedy_genres = pd.DataFrame({
+        'release_date': cmu_comedies['release_date'].to_numpy()[movie_idx],
+        'genres': genres.label_array()[links[genres.id_col].to_numpy()],
+    }, index=cmu_comedies.index[movie_idx])
     return comedy_genres
 
+@memoize_frames
 def count_comedy_genres_by_release_and_genre(comedy_genres):
     comedy_genres_count = comedy_genres.groupby(['release_date', 'genres']).size().reset_index(name='count')
     return comedy_genres_count
@@ -167,20 +684,24 @@ def assign_decade_to_genres(comedy_genres_count):
     comedy_genres_count['decade'] = (comedy_genres_count['release_date'] // 10) * 10
     return comedy_genres_count
 
+@memoize_frames
 def count_genres_by_decade(comedy_genres_count):
     decade_genre_counts = comedy_genres_count.groupby(['decade', 'genres'])['count'].sum().reset_index()
     return decade_genre_counts
 
+@memoize_frames
 def pivot_genre_data_by_decade(decade_genre_counts):
     decade_genre_pivot = decade_genre_counts.pivot(index='decade', columns='genres', values='count').fillna(0)
     if 'Comedy' in decade_genre_pivot.columns:
         decade_genre_pivot = decade_genre_pivot.drop(columns='Comedy')
     return decade_genre_pivot
 
+@memoize_frames(persist=True)
 def calculate_genre_proportions(decade_genre_pivot): # decade_proportion
     decade_proportion = decade_genre_pivot.div(decade_genre_pivot.sum(axis=1), axis=0)
     return decade_proportion
 
+@memoize_frames
 def filter_comedy_movies(cmu_cleaned_movies): # cmu_comedy_movies -- sliiightly different from cmu_comedies because of the NA filtering
     """
     Filters the comedy movies from the dataset and removes 'Comedy' genre from the genres column.
@@ -197,6 +718,7 @@ def filter_comedy_movies(cmu_cleaned_movies): # cmu_comedy_movies -- sliiightly
     
     return cmu_comedy_movies
 
+@memoize_frames(persist=True)
 def process_genre_by_country(cmu_comedy_movies, genres_per_country=10):
     """
     Processes the comedy movies data to calculate the count of each genre by country,
@@ -206,20 +728,28 @@ def process_genre_by_country(cmu_comedy_movies, genres_per_country=10):
         cmu_comedy_movies (DataFrame): The filtered dataset of comedy movies.
         genres_per_country (int): Number of top genres to keep per country (default: 10)
     """
-    revenue_by_country = (cmu_comedy_movies.explode('countries')
-                         .groupby('countries')['box_office_revenue']
-                         .sum()
-                         .sort_values(ascending=False))
+    # Both aggregations are done on the (movie, country) and (movie, genre) link tables (see `LinkTable`),
+    # the (country, genre) pairs being an integer join of the two on `movie_idx`
+    countries = list_column_links(cmu_comedy_movies['countries'], 'country')
+    genres = list_column_links(cmu_comedy_movies['genres'], 'genre').relabel(
+        lambda genre: genre.strip().title(), drop=lambda genre: genre == ""
+    )
+    revenue = cmu_comedy_movies['box_office_revenue'].fillna(0).to_numpy(dtype=np.float64)
+    revenue_by_country = (pd.Series(countries.aggregate(revenue), name='box_office_revenue',
+                                    index=pd.Index(countries.label_array(), name='countries'))
+                          .sort_values(ascending=False))
 
     top_countries = revenue_by_country.head(8).index.tolist()
 
-    genre_by_country = (cmu_comedy_movies.explode('genres')
-                       .explode('countries')
-                       .query('genres != ""')
-                       .assign(genres=lambda x: x['genres'].str.strip().str.title())
-                       .groupby(['countries', 'genres'])
-                       .size()
-                       .reset_index(name='Count'))
+    pairs = countries.links.merge(genres.links, on='movie_idx')
+    pair_codes = pairs[countries.id_col].to_numpy(np.int64) * len(genres.labels) + pairs[genres.id_col].to_numpy()
+    pair_counts = np.bincount(pair_codes, minlength=len(countries.labels) * len(genres.labels))
+    present = np.flatnonzero(pair_counts)
+    genre_by_country = pd.DataFrame({
+        'countries': countries.label_array()[present // len(genres.labels)],
+        'genres': genres.label_array()[present % len(genres.labels)],
+        'Count': pair_counts[present],
+    })
 
     genre_by_country_filtered = pd.DataFrame()
     all_top_genres = set()
@@ -233,6 +763,7 @@ def process_genre_by_country(cmu_comedy_movies, genres_per_country=10):
     return genre_by_country_filtered, top_countries, sorted(list(all_top_genres)), revenue_by_country
 
 
+@memoize_frames(persist=True)
 def clean_movie_data(df): # release_month_movies
     """
     Clean movie dataset by extracting:
@@ -258,27 +789,10 @@ def clean_movie_data(df): # release_month_movies
         except:
             return None
 
-    def extract_country(countries_str):
-        try:
-            if pd.isna(countries_str):
-                return None
-            countries_dict = ast.literal_eval(countries_str)
-            return list(countries_dict.values())[0]
-        except:
-            return None
-
-    def extract_genres(genres_str):
-        try:
-            if pd.isna(genres_str):
-                return []
-            genres_dict = ast.literal_eval(genres_str)
-            return list(genres_dict.values())
-        except:
-            return []
-
     cleaned_df['release_month'] = cleaned_df['release_date'].apply(get_month)
-    cleaned_df['country'] = cleaned_df['countries'].apply(extract_country)
-    cleaned_df['genres_list'] = cleaned_df['genres'].apply(extract_genres)
+    # Missing dicts are parsed as empty ones, i.e. no country (None) and no genres ([])
+    cleaned_df['country'] = parse_freebase_column(cleaned_df['countries']).first_labels()
+    cleaned_df['genres_list'] = parse_freebase_column(cleaned_df['genres']).to_lists()
     cleaned_df['box_office_revenue'] = pd.to_numeric(cleaned_df['box_office_revenue'], errors='coerce')
     cleaned_df = cleaned_df.dropna(subset=['release_month', 'box_office_revenue'])
 
@@ -292,6 +806,7 @@ def clean_movie_data(df): # release_month_movies
     
     return result_df
 
+@memoize_frames
 def calculate_monthly_stats(releases_monthly, comedy_only=False):
     """
     Calculate average monthly box office revenue for movies
@@ -317,6 +832,7 @@ def calculate_monthly_stats(releases_monthly, comedy_only=False):
     
     return monthly_avg
 
+@memoize_frames
 def get_movies_per_year(cmu_cleaned_movies,cmu_comedies): # movies_per_year
     total_movies_per_year = cmu_cleaned_movies.groupby('release_date').size().reset_index(name='movie_count')
     comedy_count_by_year = cmu_comedies.groupby('release_date').size().reset_index(name='comedy_count')
@@ -328,6 +844,7 @@ def get_movies_per_year(cmu_cleaned_movies,cmu_comedies): # movies_per_year
     return movies_per_year[movies_per_year['release_date'] >= 1900]
 
 
+@memoize_frames
 def calculate_revenues_per_year(movies_df, comedies_df):
     """
     Calculates the total and comedy revenues per year, and the proportion of comedy revenues.
@@ -351,6 +868,7 @@ def calculate_revenues_per_year(movies_df, comedies_df):
 # Functions used to preprocess MRT Movies DS
 # ============ ============ ============ ============ ============ ============
 
+@memoize_frames
 def data_corr_analysis(mrt_movies):
     df_rotten_com = mrt_movies[mrt_movies['genre'].str.contains('comedy', case=False, na=False)]
     filtered_rot = df_rotten_com.dropna(subset=['tomatoMeter', 'audienceScore']).copy()
@@ -373,10 +891,231 @@ def data_corr_analysis(mrt_movies):
 # Mergers
 # ============ ============ ============ ============ ============ ============
 
-def merge_ccmu_rosc(cleaned_cmu,renamed_oscars): # movie_awards
-    movies_awards = cleaned_cmu.merge(renamed_oscars, on=['title']).drop(columns=['release_date_x'])
-    return movies_awards.rename(columns={'release_date_y':'release_date'})
+@memoize_frames
+def cmu_title_index(cleaned_cmu) -> TitleIndex:
+    # The (normalized title, release year) index of the CMU movies, built once per version of them and shared by the joins with the Oscars
+    return TitleIndex.build(cleaned_cmu['title'], cleaned_cmu['release_date'])
+
+def _year_tolerance(year_tolerance) -> int:
+    # The tolerance of the joins on the titles, resolved before their memoized calls so that `cfg.TITLE_YEAR_TOLERANCE` is part of their key
+    return cfg.TITLE_YEAR_TOLERANCE if year_tolerance is None else year_tolerance
 
+def ccmu_rosc_match(cleaned_cmu, renamed_oscars, year_tolerance=None) -> TitleMatch:
+    # The CMU movie of each Oscar nomination (see `TitleIndex.match`)
+    return cmu_title_index(cleaned_cmu).match(renamed_oscars['title'], renamed_oscars['release_date'], year_tolerance)
+
+def merge_ccmu_rosc(cleaned_cmu,renamed_oscars,year_tolerance=None): # movie_awards
+    """
+    Joins the Oscar nominations with the CMU movies. Each nomination is joined with at most one CMU movie: the one with the same
+    normalized title (see `normalize_titles`) and the closest release year within `year_tolerance` (see `TitleIndex.match`).
+
+    This is not the former inner join on the raw titles: a nomination no longer yields one row per CMU movie with its title
+    (remakes and namesakes), and the spelling variants ("Godfather, The", accents, punctuation) are now joined while the movies
+    released outside of the tolerance are not. The counts computed downstream (e.g. nominations per movie) change accordingly.
+    As before, the `release_date` of the rows is the year of the nominated film, not the one of the CMU movie.
+
+    Args:
+        cleaned_cmu (DataFrame): The cleaned CMU movies (see `prepro_cmu_movies`).
+        renamed_oscars (DataFrame): The Oscar nominations, with `title` and `release_date` (see `rename_oscars_cols`).
+        year_tolerance (int|None): The year tolerance (`cfg.TITLE_YEAR_TOLERANCE` when None).
+
+    Returns:
+        DataFrame: One row per matched nomination, in their order: the columns of the movie, then the ones of the nomination.
+    """
+    return _merge_ccmu_rosc(cleaned_cmu, renamed_oscars, _year_tolerance(year_tolerance))
+
+@memoize_frames
+def _merge_ccmu_rosc(cleaned_cmu, renamed_oscars, year_tolerance):
+    match = ccmu_rosc_match(cleaned_cmu, renamed_oscars, year_tolerance)
+    movies = cleaned_cmu.drop(columns=['release_date']).iloc[match.index_rows].reset_index(drop=True)
+    awards = renamed_oscars.drop(columns=['title']).iloc[match.query_rows].reset_index(drop=True)
+    return pd.concat([movies, awards], axis=1)
+
+def merge_ccmu_award_summary(cleaned_cmu, oscars_df, year_tolerance=None): # movie_award_summary
+    # The nominated CMU movies, one row each, with their award summary (see `summarize_oscars`). The films are matched to the movies like the
+    # nominations in `merge_ccmu_rosc` (same index and tolerance), and the (rare) films matched to the same movie are summed
+    return _merge_ccmu_award_summary(cleaned_cmu, oscars_df, _year_tolerance(year_tolerance))
+
+@memoize_frames
+def _merge_ccmu_award_summary(cleaned_cmu, oscars_df, year_tolerance):
+    films = summarize_oscars(oscars_df).films
+    match = cmu_title_index(cleaned_cmu).match(films['film'], films['year_film'], year_tolerance)
+    codes, movie_rows = pd.factorize(match.index_rows, sort=True)
+    matched = films.iloc[match.query_rows]
+    awards = _reduce_awards(codes, len(movie_rows), *(matched[col].to_numpy() for col in AWARD_COLUMNS))
+    return pd.concat([cleaned_cmu.iloc[movie_rows].reset_index(drop=True), awards], axis=1)
+
+OSCAR_ACTING_CATEGORIES = ["ACTOR IN A LEADING ROLE", "ACTRESS IN A LEADING ROLE", "ACTOR IN A SUPPORTING ROLE", "ACTRESS IN A SUPPORTING ROLE"]
+
+def _cmu_cast(characters_df) -> pd.DataFrame:
+    # The (movie, actor) pairs of the CMU characters, with the name of the actor (the actors without a name or a Freebase id are dropped)
+    cast = characters_df[['wikipedia_id', 'actor_name', 'freebase_actor_id']].dropna(subset=['actor_name', 'freebase_actor_id'])
+    return cast.drop_duplicates(['wikipedia_id', 'freebase_actor_id']).reset_index(drop=True)
+
+@memoize_frames
+def cmu_actor_name_index(characters_df) -> NameIndex:
+    # The normalized names of the CMU cast (see `_cmu_cast`), indexed once and shared by the joins with the Oscar nominees
+    return NameIndex.build(_cmu_cast(characters_df)['actor_name'])
+
+def link_oscar_actors(cleaned_cmu, characters_df, oscars_df, year_tolerance=None): # oscar_actor_links
+    """
+    Links the acting nominations of the Oscars to the CMU actors, on their normalized names (see `NameIndex`), in a single vectorized pass.
+    Namesakes are told apart by the nominated film: a nominee is first linked to the actor with their name in the cast of the CMU movie
+    of the film (matched like in `merge_ccmu_rosc`), and otherwise to the only CMU actor with their name, if there is a single one.
+
+    Args:
+        cleaned_cmu (DataFrame): The cleaned CMU movies (see `prepro_cmu_movies`).
+        characters_df (DataFrame): The CMU characters (e.g. `CMU_CHARACTER_DS.df`).
+        oscars_df (DataFrame): The raw Oscar nominations.
+        year_tolerance (int|None): The year tolerance of the film matching (`cfg.TITLE_YEAR_TOLERANCE` when None).
+
+    Returns:
+        DataFrame: The acting nominations, with the `freebase_actor_id` of their nominee (NA if not linked) and the way they were linked
+            (`actor_link`: "film", "name", or NA).
+    """
+    return _link_oscar_actors(cleaned_cmu, characters_df, oscars_df, _year_tolerance(year_tolerance))
+
+@memoize_frames(persist=True)
+def _link_oscar_actors(cleaned_cmu, characters_df, oscars_df, year_tolerance):
+    acting = oscars_df[oscar_category_families(oscars_df['category']).isin(OSCAR_ACTING_CATEGORIES).to_numpy()].reset_index(drop=True)
+    cast, index = _cmu_cast(characters_df), cmu_actor_name_index(characters_df)
+    names = index.lookup(acting['name'])
+    actor_codes, actor_ids = pd.factorize(cast['freebase_actor_id'])
+
+    # The actor with the name of the nominee in the cast of the nominated film: (name code, wikipedia_id) keys of the cast
+    movies = np.full(len(acting), -1, dtype=np.int64)
+    match = cmu_title_index(cleaned_cmu).match(acting['film'], acting['year_film'], year_tolerance)
+    movies[match.query_rows] = cleaned_cmu['wikipedia_id'].to_numpy()[match.index_rows]
+    in_cast = pd.Series(actor_codes, index=(index.codes.astype(np.int64) << 32) + cast['wikipedia_id'].to_numpy(np.int64))
+    in_cast = in_cast[~in_cast.index.duplicated(keep=False)] # Namesakes in the same movie cannot be told apart
+    found = in_cast.index.get_indexer(np.where((names >= 0) & (movies >= 0), (names.astype(np.int64) << 32) + movies, -1))
+    by_film = np.where(found >= 0, in_cast.to_numpy()[np.maximum(found, 0)], -1)
+
+    # Otherwise, the only actor with this name
+    name_actors = np.unique(np.stack([index.codes, actor_codes]), axis=1)
+    name_actors = name_actors[:, name_actors[0] >= 0]
+    n_actors = np.bincount(name_actors[0], minlength=len(index.names))
+    only_actor = np.full(len(index.names), -1, dtype=np.int64)
+    only_actor[name_actors[0]] = np.where(n_actors[name_actors[0]] == 1, name_actors[1], -1)
+    by_name = np.where(names >= 0, only_actor[np.maximum(names, 0)], -1)
+
+    linked = np.where(by_film >= 0, by_film, by_name)
+    acting['freebase_actor_id'] = pd.array(np.where(linked >= 0, np.asarray(actor_ids, dtype=object)[np.maximum(linked, 0)], None), dtype="string[pyarrow]")
+    acting['actor_link'] = pd.Categorical(np.where(by_film >= 0, "film", np.where(by_name >= 0, "name", None)), categories=["film", "name"])
+    return acting
+
+def oscar_actor_summary(cleaned_cmu, characters_df, oscars_df, year_tolerance=None): # oscar_actors
+    """
+    One row per CMU actor: their number of CMU movies, the share of them which are comedies, and their acting nominations and wins at the
+    Oscars (see `link_oscar_actors`). Joined to the CMU characters on `freebase_actor_id`, it gives e.g. the box office of the comedies
+    with or without an Oscar nominated actor, without going back to the names.
+
+    Args:
+        cleaned_cmu (DataFrame): The cleaned CMU movies (see `prepro_cmu_movies`).
+        characters_df (DataFrame): The CMU characters (e.g. `CMU_CHARACTER_DS.df`).
+        oscars_df (DataFrame): The raw Oscar nominations.
+        year_tolerance (int|None): See `link_oscar_actors`.
+
+    Returns:
+        DataFrame: `freebase_actor_id`, `actor_name`, `movies`, `comedies`, `comedy_share`, `nominations`, `wins`, and the year of the
+            ceremony of their `first_nomination` (NA if never nominated).
+    """
+    return _oscar_actor_summary(cleaned_cmu, characters_df, oscars_df, _year_tolerance(year_tolerance))
+
+@memoize_frames(persist=True)
+def _oscar_actor_summary(cleaned_cmu, characters_df, oscars_df, year_tolerance):
+    cast = _cmu_cast(characters_df)
+    actor_codes, actor_ids = pd.factorize(cast['freebase_actor_id'])
+    n_actors = len(actor_ids)
+    movie_rows = pd.Index(cleaned_cmu['wikipedia_id']).get_indexer(cast['wikipedia_id'])
+    in_cmu = movie_rows >= 0
+    is_comedy = get_comedies_mask(cleaned_cmu).to_numpy(bool)[np.maximum(movie_rows, 0)] & in_cmu
+    movies = np.bincount(actor_codes, weights=in_cmu, minlength=n_actors)
+    comedies = np.bincount(actor_codes, weights=is_comedy, minlength=n_actors)
+
+    links = _link_oscar_actors(cleaned_cmu, characters_df, oscars_df, year_tolerance)
+    links = links[links['freebase_actor_id'].notna()]
+    nominees = actor_ids.get_indexer(links['freebase_actor_id'])
+    first_nomination = np.full(n_actors, np.iinfo(np.int16).max, dtype=np.int16)
+    np.minimum.at(first_nomination, nominees, links['year_ceremony'].to_numpy(np.int16))
+    nominations = np.bincount(nominees, minlength=n_actors)
+
+    first_names = cast.drop_duplicates('freebase_actor_id').set_index('freebase_actor_id')['actor_name']
+    return pd.DataFrame({
+        'freebase_actor_id': actor_ids,
+        'actor_name': pd.array(first_names.reindex(actor_ids).to_numpy(), dtype="string[pyarrow]"),
+        'movies': movies.astype(np.int32),
+        'comedies': comedies.astype(np.int32),
+        'comedy_share': np.divide(comedies, movies, out=np.full(n_actors, np.nan), where=movies > 0),
+        'nominations': nominations.astype(np.int16),
+        'wins': np.bincount(nominees, weights=links['winner'].to_numpy(bool), minlength=n_actors).astype(np.int16),
+        'first_nomination': pd.array(np.where(nominations > 0, first_nomination, None), dtype="Int16"),
+    })
+
+def ccmu_rosc_match_report(cleaned_cmu, renamed_oscars, year_tolerance=None) -> pd.Series:
+    # Match rates of the nominations with `merge_ccmu_rosc`, next to the ones of the former join on the raw titles (whose size is computed
+    # from the title counts, without materializing it)
+    report = ccmu_rosc_match(cleaned_cmu, renamed_oscars, year_tolerance).report()
+    raw_rows, raw_matched = raw_title_join_size(cleaned_cmu['title'], renamed_oscars['title'])
+    return pd.concat([report, pd.Series({"raw_title_matched": raw_matched, "raw_title_match_rate": raw_matched / max(len(renamed_oscars), 1),
+                                         "raw_title_join_rows": raw_rows}, dtype=object)])
+
+
+# ============ ============ ============ ============ ============ ============
+# Entity linking (CMU <-> RT <-> movie_info <-> Oscars, see src/utils/entity_linking.py)
+# ============ ============ ============ ============ ============ ============
+
+def _leading_years(dates: pd.Series) -> pd.Series:
+    # The year of dates formatted as YYYY or YYYY-MM-DD (NaN otherwise)
+    return pd.to_numeric(dates.astype("string").str[:4], errors='coerce')
+
+def cmu_link_records(cmu_movies_df):
+    # The CMU movies (raw, e.g. `CMU_MOVIES_DS.df`), keyed by `wikipedia_id`
+    return link_records(cmu_movies_df[['wikipedia_id']], cmu_movies_df['title'], _leading_years(cmu_movies_df['release_date']),
+                        cmu_movies_df['runtime'])
+
+def mrt_link_records(mrt_movies_df):
+    # The movies of the massive RT dataset, keyed by `rt_id` (their `id`). Dated by their theatrical release, else by their streaming one
+    years = _leading_years(mrt_movies_df['releaseDateTheaters']).fillna(_leading_years(mrt_movies_df['releaseDateStreaming']))
+    return link_records(mrt_movies_df[['id']].rename(columns={'id': 'rt_id'}), mrt_movies_df['title'], years,
+                        mrt_movies_df['runtimeMinutes'], mrt_movies_df['director'])
+
+def rt_info_link_records(movie_info_df):
+    # The movies of movie_info.csv, keyed by `rt_url` (their `url`). Their release date is either "Released <date as text>" or a year
+    years = movie_info_df['release_date'].astype("string").str.extract(r"(\d{4})", expand=False)
+    return link_records(movie_info_df[['url']].rename(columns={'url': 'rt_url'}), movie_info_df['title'], years)
+
+def oscar_link_records(oscars_df):
+    # The nominated films (distinct (`film`, `year_film`), keyed by `oscar_film` and `oscar_year_film`), with the nominees of the
+    # directing categories as their directors
+    nominated = oscars_df[oscars_df['film'].notna()]
+    directing = nominated[nominated['category'].astype(str).str.startswith('DIRECTING')]
+    directors = directing.groupby(['film', 'year_film'], observed=True)['name'].agg(lambda names: ', '.join(dict.fromkeys(names.dropna())))
+    films = nominated[['film', 'year_film']].drop_duplicates().reset_index(drop=True)
+    films = films.join(directors, on=['film', 'year_film'])
+    return link_records(films[['film', 'year_film']].rename(columns={'film': 'oscar_film', 'year_film': 'oscar_year_film'}),
+                        films['film'], films['year_film'], directors=films['name'])
+
+def build_movie_links(cmu_movies_df, mrt_movies_df, movie_info_df, oscars_df, tolerance=None, min_score=None) -> pd.DataFrame:
+    """
+    Links the films of our four movie datasets (see `resolve_entities`), in this order: the CMU movies seed the films, then the RT movies
+    (which bring their directors), the movies of movie_info.csv and the Oscar nominated films are linked to them.
+
+    Args:
+        cmu_movies_df, mrt_movies_df, movie_info_df, oscars_df (pd.DataFrame): The raw datasets.
+        tolerance (int|None): The year tolerance (`cfg.TITLE_YEAR_TOLERANCE` when None).
+        min_score (float|None): The minimal score of a link (`cfg.LINK_MIN_SCORE` when None).
+
+    Returns:
+        pd.DataFrame: One row per film: `wikipedia_id`, `rt_id`, `rt_url`, `oscar_film` and `oscar_year_film` (NA where the film is not
+            in the dataset), the scores of the links (`rt_score`, `rt_info_score`, `oscars_score`), and the title, year, runtime and director.
+    """
+    return resolve_entities({
+        "cmu": cmu_link_records(cmu_movies_df),
+        "rt": mrt_link_records(mrt_movies_df),
+        "rt_info": rt_info_link_records(movie_info_df),
+        "oscars": oscar_link_records(oscars_df),
+    }, tolerance, min_score)
 
 
 # ============ ============ ============ ============ ============ ============
@@ -384,40 +1123,131 @@ def merge_ccmu_rosc(cleaned_cmu,renamed_oscars): # movie_awards
 # ============ ============ ============ ============ ============ ============
 
 PROCESSED_DATA_DIR = "data/processed/"
+MRT_AGGREGATES_FILE = "mrt_movie_aggregates.parquet"
+MRT_TIMELINE_FILE = "mrt_sentiment_timeline.parquet"
+MRT_SCALES_FILE = "mrt_score_scales.parquet"
+MOVIE_LINKS_FILE = "movie_links.parquet"
+
+class _lazy_artifact:
+    # Same as `functools.cached_property`, but locking per instance and attribute (`cached_property` uses a single lock for all instances
+    # before Python 3.12), so that `ExtraDatasetInfo.warm` can load several artifacts concurrently
+    def __init__(self, loader):
+        self.loader = loader
+        self.__doc__ = loader.__doc__
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        if self.name not in instance.__dict__:
+            with instance._artifact_locks[self.name]:
+                if self.name not in instance.__dict__: # Another thread may have loaded it while we were waiting
+                    instance.__dict__[self.name] = self.loader(instance)
+        return instance.__dict__[self.name]
+
+def _read_processed_csv(file_name: str) -> pd.DataFrame:
+    fpath = Path(PROCESSED_DATA_DIR+file_name)
+    assert fpath.exists() and fpath.is_file(), f"{fpath.absolute().as_posix()} does not exist, see ./data/processed/README.md to recreate it"
+    return pd.read_csv(fpath.absolute().as_posix())
 
 class ExtraDatasetInfo:
     # This class will hold any additional information we infer from our base datasets
     # Some of this took time (and resources) to compute, which is why we have cached it in the `data/processed` directory.
+    # Each of these artifacts is only read on first access (so that creating this object is free), use `warm` to load all of them at once.
     # If you wish to re-compute everything from scratch, set `preload` to false (NOT RECOMMENDED!) 
     def __init__(self, mrt_movies_ds: ProjectDataset,preload=True):
         all_valid(mrt_movies_ds)
 
-        if preload:
-            # The comedy ids in the massive rottent tomatoes dataset \inter CMU, where experts have given their opinions  
-            mrtexp_fpath = Path(PROCESSED_DATA_DIR+"ratings_expert.csv") 
-            assert mrtexp_fpath.exists() and mrtexp_fpath.is_file()
-            self.mrt_cmu_expertrevd_comedy_ids = pd.read_csv(mrtexp_fpath.absolute().as_posix())["id"]
-        
-            # The massive RT dataset, extended with a sentiment analysis score for the entries with a review (~1.3M out of the 1.4M reviews):
-            mrtsa_fpath = Path(PROCESSED_DATA_DIR+"reviews_with_compound.csv") 
-            assert mrtsa_fpath.exists() and mrtsa_fpath.is_file()
-            self.mrtrev_sa_df = pd.read_csv(mrtsa_fpath.absolute().as_posix())
-
-            # CMU Plot topic analysis results
-            cmu_plots_topics_path = Path(PROCESSED_DATA_DIR+"cmu_topic_similarities.csv")
-            assert cmu_plots_topics_path.exists() and cmu_plots_topics_path.is_file()
-            self.cmu_plots_topics = pd.read_csv(cmu_plots_topics_path.absolute().as_posix())
-            self.topics = [
-                "society",     
-                "war",          
-                "gender",       
-                "justice",      
-                "technology",   
-                "money",     
-                "love",
-                "revolution",
-            ] # The topics the plot keywords were compared against in the cMT column
-        else:
+        if not preload:
             raise ValueError("See ./data/preprocessed/README.md for an indication on how to recreate the preloaded data")
-
-
+        self._artifact_locks = {name:Lock() for name in self.artifact_names()}
+        self.topics = [
+            "society",     
+            "war",          
+            "gender",       
+            "justice",      
+            "technology",   
+            "money",     
+            "love",
+            "revolution",
+        ] # The topics the plot keywords were compared against in the cMT column
+
+    @classmethod
+    def artifact_names(cls) -> list[str]:
+        return [name for name,attr in vars(cls).items() if isinstance(attr,_lazy_artifact)]
+
+    @_lazy_artifact
+    def mrt_cmu_expertrevd_comedy_ids(self) -> pd.Series:
+        # The comedy ids in the massive rottent tomatoes dataset \inter CMU, where experts have given their opinions  
+        return _read_processed_csv("ratings_expert.csv")["id"]
+
+    @_lazy_artifact
+    def mrtrev_sa_df(self) -> pd.DataFrame:
+        # The massive RT dataset, extended with a sentiment analysis score for the entries with a review (~1.3M out of the 1.4M reviews):
+        return _read_processed_csv("reviews_with_compound.csv")
+
+    @_lazy_artifact
+    def mrt_movie_aggregates(self) -> pd.DataFrame:
+        # Per-movie statistics of `mrtrev_sa_df` (see `mrt_movie_aggregates`), persisted next to it: built on first use,
+        # and refreshed (only for the movies whose reviews changed) whenever `reviews_with_compound.csv` is newer than the table
+        source, fpath = Path(PROCESSED_DATA_DIR+"reviews_with_compound.csv"), Path(PROCESSED_DATA_DIR+MRT_AGGREGATES_FILE)
+        if fpath.is_file() and (not source.is_file() or fpath.stat().st_mtime >= source.stat().st_mtime):
+            return pd.read_parquet(fpath)
+        if fpath.is_file():
+            table, n_refreshed = refresh_mrt_movie_aggregates(pd.read_parquet(fpath), self.mrtrev_sa_df)
+            print(f"{MRT_AGGREGATES_FILE}: refreshed {n_refreshed} out of {len(table)} movies")
+        else:
+            table = mrt_movie_aggregates(self.mrtrev_sa_df)
+        tmp_fpath = fpath.with_suffix(".tmp")
+        table.to_parquet(tmp_fpath)
+        os.replace(tmp_fpath, fpath)
+        return table
+
+    @_lazy_artifact
+    def mrt_score_scales(self) -> pd.DataFrame:
+        # Grading scales of the critics and publications of `mrtrev_sa_df` (see `mrt_score_scales`, with all the score formats), indexed by
+        # (group column, critic/publication). Written by `build_reviews_with_compound` along with the reviews, and rebuilt from them here
+        # whenever `reviews_with_compound.csv` is newer than the table
+        source, fpath = Path(PROCESSED_DATA_DIR+"reviews_with_compound.csv"), Path(PROCESSED_DATA_DIR+MRT_SCALES_FILE)
+        if fpath.is_file() and (not source.is_file() or fpath.stat().st_mtime >= source.stat().st_mtime):
+            return pd.read_parquet(fpath)
+        scales = pd.concat({group_col: mrt_score_scales(self.mrtrev_sa_df, group_col, all_formats=True) for group_col in MRT_SCALE_GROUPS},
+                           names=["group", "name"])
+        tmp_fpath = fpath.with_suffix(".tmp")
+        scales.to_parquet(tmp_fpath)
+        os.replace(tmp_fpath, fpath)
+        return scales
+
+    @_lazy_artifact
+    def mrt_sentiment_timeline(self) -> SentimentTimeline:
+        # Daily bins of the reviews of `mrtrev_sa_df` (see `SentimentTimeline`), persisted next to it: rebuilt whenever
+        # `reviews_with_compound.csv` is newer than the table
+        source, fpath = Path(PROCESSED_DATA_DIR+"reviews_with_compound.csv"), Path(PROCESSED_DATA_DIR+MRT_TIMELINE_FILE)
+        if fpath.is_file() and (not source.is_file() or fpath.stat().st_mtime >= source.stat().st_mtime):
+            return SentimentTimeline.from_frame(pd.read_parquet(fpath))
+        timeline = SentimentTimeline.from_reviews(self.mrtrev_sa_df)
+        tmp_fpath = fpath.with_suffix(".tmp")
+        timeline.to_frame().to_parquet(tmp_fpath)
+        os.replace(tmp_fpath, fpath)
+        return timeline
+
+    @_lazy_artifact
+    def movie_links(self) -> pd.DataFrame:
+        # One row per film, with its keys in each of our movie datasets (see `build_movie_links`), built by src/scripts/build_movie_links.py
+        fpath = Path(PROCESSED_DATA_DIR+MOVIE_LINKS_FILE)
+        assert fpath.is_file(), f"{fpath.absolute().as_posix()} does not exist, see ./data/processed/README.md to recreate it"
+        return pd.read_parquet(fpath)
+
+    @_lazy_artifact
+    def cmu_plots_topics(self) -> pd.DataFrame:
+        # CMU Plot topic analysis results
+        return _read_processed_csv("cmu_topic_similarities.csv")
+
+    def warm(self, max_workers: int|None = None):
+        # Loads all the (not yet loaded) artifacts concurrently
+        with ThreadPoolExecutor(max_workers=max_workers or len(self._artifact_locks)) as executor:
+            for future in [executor.submit(getattr,self,name) for name in self.artifact_names()]:
+                future.result()
+        return self
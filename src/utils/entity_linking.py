@@ -0,0 +1,275 @@
+# Entity resolution across our movie datasets (CMU, the massive RT dataset, RT's movie_info.csv and the Oscars), which all name the same films
+# slightly differently and share no identifier. Candidate pairs are generated by blocking (a rare title token in common, and release years within
+# a tolerance, see `candidate_pairs`), scored in bulk (title similarity, plus release year, runtime and director wherever both records have them,
+# see `score_pairs`), and resolved one-to-one (see `assign_one_to_one`). `resolve_entities` chains these over several datasets, into one row per film.
+import numpy as np
+import pandas as pd
+from .constants import NOTEBOOK_RUNCONFIG as cfg
+from .title_utils import normalize_titles
+
+RECORD_FEATURES = ["title", "year", "runtime", "director", "title_key", "director_key"] # The other columns of the records are their keys
+_NORMALIZED = ["title_key", "director_key"] # Normalized once per record (see `link_records`), as the films are linked repeatedly
+LINK_WEIGHTS = {"title": 0.6, "year": 0.15, "runtime": 0.1, "director": 0.15} # Weights of the features in the score of a pair
+_YEAR_BITS = 16 # The blocks are keyed by (token code << _YEAR_BITS) + year
+_UNDATED = 0 # The year of the undated records in the block keys
+_PAIRS_PER_CHUNK = 1_000_000 # Pairs whose similarities are computed at once (bounds the size of the sparse products)
+
+def link_records(keys: pd.DataFrame, titles, years=None, runtimes=None, directors=None) -> pd.DataFrame:
+    """
+    The records of a dataset, in the form expected by `link` and `resolve_entities`.
+
+    Args:
+        keys (pd.DataFrame): The identifier(s) of the records (e.g. `wikipedia_id`), carried over to the linked table.
+        titles (array-like): Their titles.
+        years, runtimes (array-like|None): Their release years and runtimes (minutes), NaN (or None for all of them) when unknown.
+        directors (array-like|None): Their director(s), comma separated.
+
+    Returns:
+        pd.DataFrame: The keys (with nullable dtypes) and the `RECORD_FEATURES` columns (including the normalized titles and directors),
+            with a RangeIndex.
+    """
+    n = len(keys)
+    def numeric(values):
+        return np.full(n, np.nan) if values is None else pd.to_numeric(pd.Series(np.asarray(values, dtype=object)), errors='coerce').to_numpy(np.float64)
+    records = keys.reset_index(drop=True).convert_dtypes()
+    records["title"] = pd.Series(np.asarray(titles, dtype=object)).astype("string")
+    records["year"] = numeric(years)
+    records["runtime"] = numeric(runtimes)
+    records["director"] = pd.Series(np.full(n, None, dtype=object) if directors is None else np.asarray(directors, dtype=object)).astype("string")
+    records["title_key"] = normalize_titles(records["title"].astype(object))
+    records["director_key"] = _director_names(records["director"].astype(object))
+    return records
+
+# ============ ============ Tokens ============ ============
+
+def _trigrams(title: str) -> list[str]:
+    padded = f" {title} "
+    return [padded[i:i+3] for i in range(len(padded) - 2)]
+
+def _director_names(directors: pd.Series) -> pd.Series:
+    # Normalized names of the directors (a record may have several), as "|"-separated strings
+    names = (directors.fillna('').astype(str).str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii').str.lower()
+             .str.replace(r"\s*(?:,|&|;|/|\band\b)\s*", '|', regex=True).str.replace(r"[^\w|\s]", '', regex=True)
+             .str.replace(r"\s+", ' ', regex=True).str.strip(' |'))
+    return names.where(names != '')
+
+def _token_matrix(texts: pd.Series, analyzer):
+    # Binary (text x token) CSR matrix of the distinct texts, and the row of each text in it (-1 for the missing ones)
+    from scipy.sparse import csr_matrix
+    rows, uniques = pd.factorize(texts)
+    tokens = pd.Series(uniques, dtype=object).map(analyzer).explode().dropna()
+    token_codes, vocabulary = pd.factorize(tokens)
+    matrix = csr_matrix((np.ones(len(token_codes), dtype=np.float32), (tokens.index.to_numpy(), token_codes)),
+                        shape=(len(uniques), max(len(vocabulary), 1)))
+    matrix.sum_duplicates()
+    matrix.data[:] = 1 # Sets, not multisets
+    return matrix, rows
+
+def _jaccard(matrix, left, right) -> np.ndarray:
+    # Jaccard similarities of the token sets of the rows (left[i], right[i]) of `matrix`, NaN where a row is missing (-1).
+    # Computed once per distinct pair of rows, and chunk by chunk
+    similarity = np.full(len(left), np.nan)
+    known = (left >= 0) & (right >= 0)
+    pairs, inverse = np.unique(left[known].astype(np.int64) * matrix.shape[0] + right[known], return_inverse=True)
+    pair_left, pair_right = pairs // matrix.shape[0], pairs % matrix.shape[0]
+    sizes = np.diff(matrix.indptr)
+    values = np.empty(len(pairs))
+    for start in range(0, len(pairs), _PAIRS_PER_CHUNK):
+        l, r = pair_left[start:start+_PAIRS_PER_CHUNK], pair_right[start:start+_PAIRS_PER_CHUNK]
+        shared = np.asarray(matrix[l].multiply(matrix[r]).sum(axis=1)).ravel()
+        values[start:start+_PAIRS_PER_CHUNK] = shared / np.maximum(sizes[l] + sizes[r] - shared, 1)
+    similarity[known] = values[inverse]
+    return similarity
+
+# ============ ============ Blocking ============ ============
+
+def _expand_ranges(lo: np.ndarray, hi: np.ndarray) -> tuple[np.ndarray,np.ndarray]:
+    # For each range [lo[i], hi[i]): (i, position) of all its positions
+    lengths = hi - lo
+    owner = np.repeat(np.arange(len(lo)), lengths)
+    positions = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths) + np.repeat(lo, lengths)
+    return owner, positions
+
+def _signatures(words: pd.Series, n_tokens: int) -> tuple[np.ndarray,np.ndarray]:
+    # The `n_tokens` rarest words of each title (fewer if it has fewer words): (record, word code) pairs.
+    # Common words ("the", "man", "love", ...) only make it into the signature of the titles made of common words
+    exploded = words.explode().dropna()
+    exploded = exploded[exploded != '']
+    records = exploded.index.to_numpy()
+    codes, _ = pd.factorize(exploded)
+    frequency = np.bincount(codes)[codes]
+    order = np.lexsort((codes, frequency, records))
+    records, codes = records[order], codes[order]
+    first = np.r_[True, records[1:] != records[:-1]]
+    group_start = np.maximum.accumulate(np.where(first, np.arange(len(records)), 0))
+    keep = np.arange(len(records)) - group_start < n_tokens
+    pairs = np.unique(np.stack([records[keep], codes[keep]]), axis=1) # A word appearing twice in a title is a single token
+    return pairs[0], pairs[1]
+
+def candidate_pairs(left: pd.DataFrame, right: pd.DataFrame, tolerance: int|None = None, n_tokens: int|None = None) -> tuple[np.ndarray,np.ndarray]:
+    """
+    The pairs of records worth scoring. Two dated records are compared when they have a signature token in common (one of the `n_tokens`
+    rarest words of their titles, with the document frequencies counted over both sides) and release years within `tolerance`.
+    Without a year to narrow the blocks, an undated record is only compared to the records (of any year) with the same normalized title.
+    The blocks are sorted integer keys located with `np.searchsorted`, so only the pairs inside them are ever enumerated.
+
+    Args:
+        left, right (pd.DataFrame): The records (see `link_records`).
+        tolerance (int|None): The year tolerance (`cfg.TITLE_YEAR_TOLERANCE` when None).
+        n_tokens (int|None): The size of the signatures (`cfg.LINK_BLOCK_TOKENS` when None).
+
+    Returns:
+        tuple[np.ndarray,np.ndarray]: The (left row, right row) of each distinct candidate pair, sorted.
+    """
+    tolerance = cfg.TITLE_YEAR_TOLERANCE if tolerance is None else tolerance
+    n_tokens = cfg.LINK_BLOCK_TOKENS if n_tokens is None else n_tokens
+    titles = pd.concat([left["title_key"], right["title_key"]], ignore_index=True)
+    years = np.concatenate([left["year"].to_numpy(), right["year"].to_numpy()])
+    years = np.where(np.isnan(years), _UNDATED, np.clip(np.nan_to_num(years), 1, 2**_YEAR_BITS - 1)).astype(np.int64)
+
+    # Tokens: the signature words of the dated records, then the whole titles (as tokens of their own) of all the records
+    word_records, words = _signatures(titles.str.split(' '), n_tokens)
+    dated_words = years[word_records] != _UNDATED
+    word_records, words = word_records[dated_words], words[dated_words]
+    title_codes, _ = pd.factorize(titles)
+    title_records = np.flatnonzero(title_codes >= 0)
+    records = np.concatenate([word_records, title_records])
+    tokens = np.concatenate([words, words.max(initial=-1) + 1 + title_codes[title_records]]).astype(np.int64)
+    is_word = np.arange(len(records)) < len(word_records)
+    keys = (tokens << _YEAR_BITS) + years[records]
+    is_left = records < len(left)
+
+    order = np.argsort(keys[~is_left], kind='stable')
+    right_keys, right_records = keys[~is_left][order], records[~is_left][order] - len(left)
+
+    # The range of years each left token is compared to: the tolerance for the signature words,
+    # all the years for the titles of the undated records, and only the undated records for the titles of the dated ones
+    query_tokens, query_years, query_is_word = tokens[is_left] << _YEAR_BITS, years[records[is_left]], is_word[is_left]
+    undated = query_years == _UNDATED
+    low = np.where(query_is_word, np.maximum(query_years - tolerance, 1), _UNDATED)
+    high = np.where(query_is_word, query_years + tolerance, np.where(undated, 2**_YEAR_BITS - 1, _UNDATED))
+    lo = np.searchsorted(right_keys, query_tokens + low, side='left')
+    hi = np.searchsorted(right_keys, query_tokens + high, side='right')
+    owner, positions = _expand_ranges(lo, hi)
+    pairs = np.unique(records[is_left][owner].astype(np.int64) * len(right) + right_records[positions])
+    return pairs // len(right), pairs % len(right)
+
+# ============ ============ Scoring ============ ============
+
+def score_pairs(left: pd.DataFrame, right: pd.DataFrame, left_rows: np.ndarray, right_rows: np.ndarray, tolerance: int|None = None) -> pd.DataFrame:
+    """
+    Similarity features of the pairs (left_rows[i], right_rows[i]), all in [0, 1] (NaN when a side misses the field):
+    `title` (Jaccard similarity of the character trigrams of the normalized titles), `year` (1 for the same year, decreasing
+    to 0 past `tolerance`), `runtime` (decreasing to 0 at `cfg.LINK_RUNTIME_TOLERANCE` minutes apart) and `director`
+    (Jaccard similarity of the sets of directors). `score` is their mean weighted by `LINK_WEIGHTS`, over the known features.
+
+    Returns:
+        pd.DataFrame: The `left` and `right` rows, the features and the score of each pair.
+    """
+    tolerance = cfg.TITLE_YEAR_TOLERANCE if tolerance is None else tolerance
+    n_left = len(left)
+    titles = pd.concat([left["title_key"], right["title_key"]], ignore_index=True)
+    matrix, rows = _token_matrix(titles, _trigrams)
+    features = {"title": _jaccard(matrix, rows[left_rows], rows[n_left + right_rows])}
+
+    years = left["year"].to_numpy()[left_rows], right["year"].to_numpy()[right_rows]
+    features["year"] = np.clip(1 - np.abs(years[0] - years[1]) / (tolerance + 1), 0, 1)
+    runtimes = [np.where(side > 0, side, np.nan) for side in (left["runtime"].to_numpy()[left_rows], right["runtime"].to_numpy()[right_rows])]
+    features["runtime"] = np.clip(1 - np.abs(runtimes[0] - runtimes[1]) / cfg.LINK_RUNTIME_TOLERANCE, 0, 1)
+
+    directors = pd.concat([left["director_key"], right["director_key"]], ignore_index=True)
+    matrix, rows = _token_matrix(directors, lambda names: names.split('|'))
+    features["director"] = _jaccard(matrix, rows[left_rows], rows[n_left + right_rows])
+
+    scored = pd.DataFrame({"left": left_rows, "right": right_rows, **features})
+    weights = np.array([LINK_WEIGHTS[name] for name in features])
+    values = scored[list(features)].to_numpy()
+    known_weights = (~np.isnan(values)) * weights
+    scored["score"] = np.nansum(values * weights, axis=1) / known_weights.sum(axis=1)
+    return scored
+
+def assign_one_to_one(left_rows: np.ndarray, right_rows: np.ndarray, scores: np.ndarray) -> np.ndarray:
+    """
+    Greedy one-to-one assignment of scored pairs: in rounds, every pair which is the best remaining pair of both its records is kept,
+    and the other pairs of these records are discarded (the best remaining pair always qualifies, so the rounds end).
+    Ties are broken by the left, then right row.
+
+    Returns:
+        np.ndarray: The positions of the kept pairs.
+    """
+    order = np.lexsort((right_rows, left_rows, -scores))
+    left_rows, right_rows = left_rows[order], right_rows[order]
+    kept = np.zeros(len(order), dtype=bool)
+    best_of_left = np.zeros(left_rows.max() + 1 if len(order) else 0, dtype=np.int64)
+    best_of_right = np.zeros(right_rows.max() + 1 if len(order) else 0, dtype=np.int64)
+    positions = np.arange(len(order))
+    while len(positions):
+        # The positions are in decreasing order of score: writing them backwards leaves the best pair of each record
+        # (assigning to repeated indices keeps the last value)
+        backwards = positions[::-1]
+        best_of_left[left_rows[backwards]] = backwards
+        best_of_right[right_rows[backwards]] = backwards
+        mutual = positions[(best_of_left[left_rows[positions]] == positions) & (best_of_right[right_rows[positions]] == positions)]
+        kept[mutual] = True
+        best_of_left[left_rows[mutual]] = best_of_right[right_rows[mutual]] = -1 # Taken
+        positions = positions[(best_of_left[left_rows[positions]] >= 0) & (best_of_right[right_rows[positions]] >= 0)]
+    return np.sort(order[kept])
+
+def link(left: pd.DataFrame, right: pd.DataFrame, tolerance: int|None = None, min_score: float|None = None) -> pd.DataFrame:
+    """
+    Links the records of `right` to (at most) one record of `left` each, and conversely: blocking (`candidate_pairs`), scoring (`score_pairs`),
+    then keeping the pairs with a title similarity of at least `cfg.LINK_MIN_TITLE_SIMILARITY` and a score of at least `min_score`,
+    resolved one-to-one (`assign_one_to_one`).
+
+    Args:
+        left, right (pd.DataFrame): The records (see `link_records`).
+        tolerance (int|None): The year tolerance (`cfg.TITLE_YEAR_TOLERANCE` when None).
+        min_score (float|None): The minimal score of a link (`cfg.LINK_MIN_SCORE` when None).
+
+    Returns:
+        pd.DataFrame: The `left` and `right` rows of the links, with their features and score (see `score_pairs`), sorted by right row.
+    """
+    min_score = cfg.LINK_MIN_SCORE if min_score is None else min_score
+    scored = score_pairs(left, right, *candidate_pairs(left, right, tolerance), tolerance)
+    scored = scored[(scored["title"] >= cfg.LINK_MIN_TITLE_SIMILARITY) & (scored["score"] >= min_score)]
+    links = scored.iloc[assign_one_to_one(scored["left"].to_numpy(), scored["right"].to_numpy(), scored["score"].to_numpy())]
+    return links.sort_values("right").reset_index(drop=True)
+
+# ============ ============ Resolution ============ ============
+
+def resolve_entities(sources: dict[str, pd.DataFrame], tolerance: int|None = None, min_score: float|None = None) -> pd.DataFrame:
+    """
+    Resolves the records of several datasets into films. The first dataset seeds the films, and each next one is linked to the
+    films found so far (see `link`): its linked records add their keys (and the year/runtime/director the films were missing, so that
+    e.g. the directors of the RT movies help linking the Oscar nominees), and the others become new films.
+    A key of a dataset therefore appears on one film at most.
+
+    Args:
+        sources (dict[str, pd.DataFrame]): The records of each dataset (see `link_records`), in linking order.
+        tolerance, min_score: See `link`.
+
+    Returns:
+        pd.DataFrame: One row per film: the keys of all the datasets (NA where the film is not in it), the features of the film,
+            and the score of its link to each dataset but the first (`<dataset>_score`, NaN where not linked).
+    """
+    entities = None
+    for name, records in sources.items():
+        keys = [col for col in records.columns if col not in RECORD_FEATURES]
+        if entities is None:
+            entities = records[keys + RECORD_FEATURES].copy()
+            continue
+        links = link(entities[RECORD_FEATURES], records[RECORD_FEATURES], tolerance, min_score)
+        matched, linked = links["left"].to_numpy(), links["right"].to_numpy()
+        for col in keys:
+            entities[col] = pd.Series(pd.NA, index=entities.index, dtype=records[col].dtype)
+            entities.iloc[matched, entities.columns.get_loc(col)] = records[col].to_numpy()[linked]
+        entities[f"{name}_score"] = np.nan
+        entities.iloc[matched, entities.columns.get_loc(f"{name}_score")] = links["score"].to_numpy()
+        for col in ("year", "runtime", "director", "director_key"): # Fill the fields the films miss from their new record
+            missing = entities[col].iloc[matched].isna().to_numpy()
+            entities.iloc[matched[missing], entities.columns.get_loc(col)] = records[col].to_numpy()[linked[missing]]
+
+        unlinked = np.setdiff1d(np.arange(len(records)), linked)
+        entities = pd.concat([entities, records.iloc[unlinked]], ignore_index=True)
+    features = [col for col in RECORD_FEATURES if col not in _NORMALIZED]
+    return entities[[col for col in entities.columns if col not in RECORD_FEATURES] + features]
@@ -0,0 +1,158 @@
+# Bulk parsing of the Freebase dict columns of the CMU movies dataset (`languages`, `countries` and `genres`),
+# which are stored as strings such as '{"/m/02h40lc": "English Language", "/m/064_8sq": "French Language"}'
+from dataclasses import dataclass
+from itertools import chain
+import json
+import re
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Matches any JSON string: in a well-formed dict, they alternate between Freebase ids and labels
+_JSON_STRING_RE = re.compile(r'"([^"]*)"')
+# Slower, but robust to escaped quotes: matches either a row separator, or one `"<freebase id>": "<label>"` pair
+_FREEBASE_PAIR_RE = re.compile(r'(\n)|"((?:[^"\\\n]|\\.)*)"\s*:\s*"((?:[^"\\\n]|\\.)*)"')
+
+@dataclass
+class FreebaseColumn:
+    # Integer-coded, long-format version of a Freebase dict column:
+    #     - `rows[i]`, `codes[i]` says that row `rows[i]` of the original column contains the entry `codes[i]`
+    #       (pairs are sorted by row, and keep the order they had in each dict)
+    #     - `ids[code]` and `labels[code]` are the Freebase identifier and the label of each entry
+    #     - `n_rows` is the length of the original column
+    rows: np.ndarray
+    codes: np.ndarray
+    ids: np.ndarray
+    labels: np.ndarray
+    n_rows: int
+
+    def dictionary(self) -> pd.DataFrame:
+        return pd.DataFrame({"freebase_id": self.ids, "label": self.labels})
+
+    def counts(self) -> np.ndarray:
+        # Number of entries of each row
+        return np.bincount(self.rows, minlength=self.n_rows)
+
+    def to_lists(self) -> list[list[str]]:
+        # The labels of each row, as `list(ast.literal_eval(cell).values())` would give them
+        row_labels = self.labels[self.codes]
+        bounds = np.cumsum(self.counts())[:-1]
+        return [chunk.tolist() for chunk in np.split(row_labels, bounds)]
+
+    def first_labels(self) -> np.ndarray:
+        # The first label of each row (None for the rows with an empty dict)
+        first = np.full(self.n_rows, None, dtype=object)
+        is_first = np.r_[True, self.rows[1:] != self.rows[:-1]] if len(self.rows) else np.zeros(0, dtype=bool)
+        first[self.rows[is_first]] = self.labels[self.codes[is_first]]
+        return first
+
+
+def _unescape(strings: np.ndarray) -> np.ndarray:
+    # Only the (rare) strings with escape sequences (e.g. "é") need to go through the JSON decoder
+    strings = strings.copy()
+    for i in np.flatnonzero(np.char.find(strings.astype(str), "\\") >= 0):
+        strings[i] = json.loads(f'"{strings[i]}"')
+    return strings
+
+
+def parse_freebase_column(column: pd.Series) -> FreebaseColumn:
+    """
+    Parses a whole Freebase dict column at once, instead of one `ast.literal_eval` per row:
+    the column is joined into a single string which a (compiled) regex scans in one pass, then rows/codes are computed with numpy.
+    Missing values are treated as empty dicts.
+
+    Args:
+        column (pd.Series): The column of dict strings (e.g. `CMU_MOVIES_DS.df["genres"]`).
+
+    Returns:
+        FreebaseColumn: The integer-coded pairs and the dictionary of entries (codes are sorted by Freebase id).
+    """
+    values = column.fillna("{}").astype(str)
+    text = "\n".join(values.tolist()) + "\n"
+    # Fast path: one regex pass extracting all the strings, and the number of pairs of each row counted by Arrow
+    counts = pc.count_substring(pa.array(values), '": "').to_numpy(zero_copy_only=False)
+    strings = np.array(_JSON_STRING_RE.findall(text), dtype=object) if '\\"' not in text else None
+    if strings is not None and len(strings) == 2*counts.sum():
+        rows = np.repeat(np.arange(len(values), dtype=np.int32), counts)
+        keys, labels = strings[0::2], strings[1::2]
+    else:
+        # Escaped quotes or unusual spacing: attribute each pair to its row by counting the row separators matched before it
+        matches = np.array(_FREEBASE_PAIR_RE.findall(text), dtype=object).reshape(-1, 3)
+        is_separator = matches[:, 0] == "\n"
+        rows = (np.cumsum(is_separator) - is_separator)[~is_separator].astype(np.int32)
+        keys, labels = matches[~is_separator, 1], matches[~is_separator, 2]
+
+    codes, ids = pd.factorize(keys, sort=True)
+    code_labels = np.empty(len(ids), dtype=object)
+    code_labels[codes[::-1]] = labels[::-1] # The first label seen for each id
+    return FreebaseColumn(
+        rows=rows,
+        codes=codes.astype(np.int16 if len(ids) < np.iinfo(np.int16).max else np.int32),
+        ids=_unescape(np.asarray(ids, dtype=object)),
+        labels=_unescape(code_labels),
+        n_rows=len(column),
+    )
+
+
+# ============ ============ ============ ============ ============ ============
+# Link tables (long-format, integer-coded, movie -> genre/country/language)
+# ============ ============ ============ ============ ============ ============
+
+@dataclass
+class LinkTable:
+    # Normalized version of a list column of a movies dataframe:
+    #     - `links` has one (movie_idx:int32, <entity>_id:int16) row per (movie, entry) pair, where `movie_idx` is the *position*
+    #       of the movie in the dataframe (so `links` can be joined/bincounted against any array aligned with it)
+    #     - `labels` is the dictionary table (<entity>_id, label). Ids are sorted by label, so that ordering by id
+    #       gives the same order as a pandas groupby on the labels
+    entity: str
+    links: pd.DataFrame
+    labels: pd.DataFrame
+    n_movies: int
+
+    @property
+    def id_col(self) -> str:
+        return f"{self.entity}_id"
+
+    @property
+    def movie_idx(self) -> np.ndarray:
+        return self.links["movie_idx"].to_numpy()
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self.links[self.id_col].to_numpy()
+
+    def label_array(self) -> np.ndarray:
+        return self.labels["label"].to_numpy(dtype=object)
+
+    def entries_matching(self, predicate) -> np.ndarray:
+        # Boolean mask (aligned with `links`) of the entries whose label satisfies `predicate` (evaluated once per label)
+        return np.array([bool(predicate(label)) for label in self.label_array()], dtype=bool)[self.ids]
+
+    def relabel(self, normalize, drop=lambda label: False) -> "LinkTable":
+        # Link table where each label is replaced by `normalize(label)` (labels that become equal are merged),
+        # and where the entries whose (original) label satisfies `drop` are removed
+        keep = ~self.entries_matching(drop)
+        new_labels = np.array([normalize(label) for label in self.label_array()], dtype=object)
+        return _make_link_table(self.entity, self.movie_idx[keep], new_labels[self.ids[keep]], self.n_movies)
+
+    def aggregate(self, weights: np.ndarray|None = None) -> np.ndarray:
+        # Per-entry count (or sum of `weights`, which are aligned with the movies), i.e. the equivalent of `explode` + `groupby`
+        w = None if weights is None else np.asarray(weights, dtype=np.float64)[self.movie_idx]
+        return np.bincount(self.ids, weights=w, minlength=len(self.labels))
+
+
+def _make_link_table(entity: str, movie_idx: np.ndarray, labels: np.ndarray, n_movies: int) -> LinkTable:
+    label_ids, unique_labels = pd.factorize(labels, sort=True)
+    id_dtype = np.int16 if len(unique_labels) < np.iinfo(np.int16).max else np.int32
+    dictionary = pd.DataFrame({f"{entity}_id": np.arange(len(unique_labels), dtype=id_dtype), "label": np.asarray(unique_labels, dtype=object)})
+    links = pd.DataFrame({"movie_idx": movie_idx.astype(np.int32), f"{entity}_id": label_ids.astype(id_dtype)})
+    return LinkTable(entity, links, dictionary, n_movies)
+
+
+def list_column_links(list_column: pd.Series, entity: str) -> LinkTable:
+    # Link table of a column of lists of labels (e.g. the `genres` of `prepro_cmu_movies`), without exploding the dataframe
+    lengths = list_column.map(len).to_numpy(np.int64)
+    labels = np.array(list(chain.from_iterable(list_column)), dtype=object)
+    return _make_link_table(entity, np.repeat(np.arange(len(list_column)), lengths), labels, len(list_column))
@@ -1,4 +1,6 @@
 import pandas as pd # for typing
+from functools import update_wrapper
+from importlib import import_module
 from .constants import NOTEBOOK_RUNCONFIG as cfg 
 
 def number_to_emoji(number: int):
@@ -6,6 +8,18 @@ def number_to_emoji(number: int):
     # Used for artistic purposes only
     return ''.join([f'{chr(ord("0") + int(digit))}\uFE0F\u20E3' for digit in str(number)])
 
+def lazy_function(module_name: str, function_name: str):
+    # Returns a proxy for `module_name.function_name`, which only imports the module when the proxy is first called
+    # Used to keep `from src import *` cheap, even though some of the exported functions need heavy dependencies
+    def proxy(*args, **kwargs):
+        if proxy.__wrapped__ is None:
+            update_wrapper(proxy, getattr(import_module(module_name), function_name))
+        return proxy.__wrapped__(*args, **kwargs)
+    proxy.__wrapped__ = None
+    proxy.__name__ = proxy.__qualname__ = function_name
+    proxy.__doc__ = f"Lazy proxy for `{module_name}.{function_name}` (imported on first call)"
+    return proxy
+
 def all_valid(*args):
     # Asserts all function arguments are valid
     assert all(arg is not None for arg in args), f"Some arguments are None!"
@@ -10,6 +10,7 @@ from collections import Counter
 from sklearn.manifold import TSNE
 from IPython.display import clear_output
 import re
+from .cache_utils import memoize_frames
 
 ### ========================================================================================================================================
 
@@ -54,6 +55,7 @@ def process_and_merge_datasets(df1, df2):
 
 
 
+@memoize_frames(persist=True)
 def analyze_actor_associations(df, aggregation="mean"):
     """
     Analyze actor associations to find the most successful ones.
@@ -99,6 +101,7 @@ def analyze_actor_associations(df, aggregation="mean"):
 
 
 
+@memoize_frames(persist=True)
 def compute_actor_pair_revenue_with_titles(df):
     """
     Calculates the average box office revenue for actor pairs who collaborated in at least two movies,
@@ -440,6 +443,7 @@ def extract_base_and_sequel(id_str):
 
 
 
+@memoize_frames(persist=True)
 def data_part_1(mrt_df):
     df_result, set_base = filter_comedy_movies_sequels(mrt_df)
     
@@ -0,0 +1,178 @@
+# On-disk store of the results of our pipeline stages (see `memoize_frames(persist=True)`), so that they survive kernel restarts.
+# Each entry is a directory named by its key, holding a `manifest.json` describing the structure of the result (tuples/lists/dicts
+# of dataframes, series and arrays), and one file per leaf: Parquet for the dataframes/series whose types roundtrip, NPZ for the numeric
+# arrays, and pickle for everything else
+from pathlib import Path
+from typing import Any
+import json
+import os
+import pickle as pkl
+import shutil
+import time
+import numpy as np
+import pandas as pd
+from .constants import NOTEBOOK_RUNCONFIG as cfg
+
+MANIFEST = "manifest.json"
+STORE_FORMAT_VERSION = 1
+
+def _parquet_safe(df: pd.DataFrame) -> bool:
+    # Parquet needs (unique) string column names, and would silently change the type of object columns which are not plain strings
+    if not all(isinstance(col, str) for col in df.columns) or not df.columns.is_unique:
+        return False
+    for values in [df[col] for col in df.columns] + [df.index.get_level_values(i) for i in range(df.index.nlevels)]:
+        if values.dtype == object and pd.api.types.infer_dtype(values, skipna=True) not in ("string", "empty"):
+            return False
+    return True
+
+def _holds_frames(value: Any) -> bool:
+    # Containers are only split into several files when they (recursively) hold dataframes/series/arrays
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+        return True
+    if isinstance(value, (list, tuple)):
+        return any(_holds_frames(v) for v in value)
+    return isinstance(value, dict) and any(_holds_frames(v) for v in value.values())
+
+def _string_storages(df: pd.DataFrame) -> dict[str,str]:
+    # The storage of the string columns is lost by Parquet (`string[pyarrow]` comes back as `string[python]`)
+    return {col: dtype.storage for col, dtype in df.dtypes.items() if isinstance(dtype, pd.StringDtype)}
+
+
+class ResultStore:
+    """
+    Directory of results keyed by strings, with a size bound: once it is exceeded, the least recently used entries are evicted.
+    Writes are atomic (an entry is written in a temporary directory, which is then renamed), so concurrent kernels are safe.
+
+    Args:
+        root (str|Path): The directory of the store.
+        max_bytes (int|None): The size bound (`cfg.RESULT_STORE_MAX_BYTES` when None).
+    """
+    def __init__(self, root: str|Path, max_bytes: int|None = None):
+        self.root = Path(root)
+        self._max_bytes = max_bytes
+
+    @property
+    def max_bytes(self) -> int:
+        return cfg.RESULT_STORE_MAX_BYTES if self._max_bytes is None else self._max_bytes
+
+    # ============ ============ Serialization ============ ============
+
+    def _dump(self, value: Any, directory: Path, counter: list[int]) -> dict:
+        leaf = directory / str(counter[0])
+        counter[0] += 1
+        if isinstance(value, pd.DataFrame) and _parquet_safe(value):
+            value.to_parquet(leaf.with_suffix(".parquet"), engine="pyarrow")
+            return {"kind": "frame", "file": leaf.with_suffix(".parquet").name, "strings": _string_storages(value)}
+        if isinstance(value, pd.Series) and (value.name is None or isinstance(value.name, str)) and _parquet_safe(value.to_frame("values")):
+            value.to_frame("values").to_parquet(leaf.with_suffix(".parquet"), engine="pyarrow")
+            return {"kind": "series", "file": leaf.with_suffix(".parquet").name, "name": value.name, "strings": _string_storages(value.to_frame("values"))}
+        if isinstance(value, np.ndarray) and value.dtype != object:
+            np.savez(leaf.with_suffix(".npz"), values=value)
+            return {"kind": "array", "file": leaf.with_suffix(".npz").name}
+        if isinstance(value, (list, tuple)) and _holds_frames(value):
+            return {"kind": type(value).__name__, "items": [self._dump(v, directory, counter) for v in value]}
+        if isinstance(value, dict) and all(isinstance(k, str) for k in value):
+            return {"kind": "dict", "items": {k: self._dump(v, directory, counter) for k, v in value.items()}}
+        with open(leaf.with_suffix(".pkl"), "wb") as f:
+            pkl.dump(value, f, protocol=pkl.HIGHEST_PROTOCOL)
+        return {"kind": "pickle", "file": leaf.with_suffix(".pkl").name}
+
+    def _load(self, node: dict, directory: Path) -> Any:
+        kind = node["kind"]
+        if kind in ("frame", "series"):
+            df = pd.read_parquet(directory / node["file"], engine="pyarrow")
+            for col, storage in node["strings"].items():
+                df[col] = df[col].astype(pd.StringDtype(storage))
+            return df if kind == "frame" else df["values"].rename(node["name"])
+        if kind == "array":
+            with np.load(directory / node["file"], allow_pickle=False) as npz:
+                return npz["values"]
+        if kind in ("list", "tuple"):
+            items = [self._load(item, directory) for item in node["items"]]
+            return items if kind == "list" else tuple(items)
+        if kind == "dict":
+            return {k: self._load(v, directory) for k, v in node["items"].items()}
+        with open(directory / node["file"], "rb") as f:
+            return pkl.load(f)
+
+    # ============ ============ Entries ============ ============
+
+    def get(self, key: str) -> tuple[bool,Any]:
+        directory = self.root / key
+        try:
+            with open(directory / MANIFEST) as f:
+                manifest = json.load(f)
+            if manifest.get("version") != STORE_FORMAT_VERSION:
+                return False, None
+            value = self._load(manifest["value"], directory)
+            os.utime(directory / MANIFEST) # The mtime of the manifest is the last use of the entry (for the LRU eviction)
+        except (OSError, ValueError, KeyError, pkl.UnpicklingError):
+            return False, None # Missing (or evicted while being read by another kernel)
+        return True, value
+
+    def put(self, key: str, value: Any, function: str):
+        directory = self.root / key
+        if directory.is_dir():
+            return
+        tmp_directory = self.root / f".tmp-{key}-{os.getpid()}"
+        tmp_directory.mkdir(parents=True, exist_ok=True)
+        try:
+            manifest = {"version": STORE_FORMAT_VERSION, "function": function, "created": time.time(),
+                        "value": self._dump(value, tmp_directory, [0])}
+            with open(tmp_directory / MANIFEST, "w") as f:
+                json.dump(manifest, f)
+            os.replace(tmp_directory, directory)
+        except OSError:
+            if not directory.is_dir():
+                raise
+        finally:
+            shutil.rmtree(tmp_directory, ignore_errors=True)
+        self.evict()
+
+    def entries(self) -> pd.DataFrame:
+        """
+        Lists the entries of the store (most recently used first).
+
+        Returns:
+            DataFrame: The key, function, size (in bytes), creation and last use time of each entry.
+        """
+        rows = []
+        for manifest_path in self.root.glob(f"*/{MANIFEST}"):
+            try:
+                with open(manifest_path) as f:
+                    manifest = json.load(f)
+                nbytes = sum(path.stat().st_size for path in manifest_path.parent.iterdir())
+                last_used = manifest_path.stat().st_mtime
+            except (OSError, ValueError):
+                continue
+            rows.append((manifest_path.parent.name, manifest.get("function"), nbytes,
+                         pd.to_datetime(manifest.get("created"), unit="s"), pd.to_datetime(last_used, unit="s")))
+        entries = pd.DataFrame(rows, columns=["key", "function", "nbytes", "created", "last_used"])
+        return entries.sort_values("last_used", ascending=False, ignore_index=True)
+
+    def remove(self, key: str):
+        shutil.rmtree(self.root / key, ignore_errors=True)
+
+    def evict(self, max_bytes: int|None = None) -> int:
+        # Removes the least recently used entries until the store fits in `max_bytes` (`self.max_bytes` by default)
+        # Returns the number of removed entries
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        over_budget = entries["nbytes"].cumsum() > max_bytes
+        for key in entries.loc[over_budget, "key"]:
+            self.remove(key)
+        return int(over_budget.sum())
+
+    def purge(self, function: str|None = None) -> int:
+        # Removes all the entries (of the functions whose name contains `function`, if given). Returns the number of removed entries
+        entries = self.entries()
+        if function is not None:
+            entries = entries[entries["function"].fillna("").str.contains(function, regex=False)]
+        for key in entries["key"]:
+            self.remove(key)
+        return len(entries)
+
+
+def default_result_store() -> ResultStore|None:
+    # The store used by `memoize_frames(persist=True)`, under `cfg.CACHE_DIR` (None when the disk cache is disabled)
+    return None if cfg.CACHE_DIR is None else ResultStore(Path(cfg.CACHE_DIR) / "results")
@@ -0,0 +1,382 @@
+# Resampling-based tests (permutation p-values and bootstrap confidence intervals) for the comparison of two groups of values,
+# e.g. the per-movie sentiment of comedies vs non-comedies, whose skewed distributions make Welch's t-test approximate.
+# The replicates are computed by blocks, as (replicates x values) matrices (allocated once per process and refilled in place),
+# rather than one by one in Python. Each block has its own random stream (spawned from the seed), so the results only depend on the seed,
+# not on the number of processes the blocks are spread over.
+# It also holds mergeable summaries, to describe millions of values chunk by chunk in a bounded memory: per-group moments (Welford/Chan),
+# and quantile sketches (e.g. for boxplots).
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import os
+import numpy as np
+import pandas as pd
+from .constants import NOTEBOOK_RUNCONFIG as cfg
+
+RESAMPLING_BLOCK_BYTES = 8 * 2**20 # Size of the (replicates x values) matrix of a block of replicates
+STATISTICS = {"mean": np.mean, "median": np.median}
+
+@dataclass
+class GroupComparison:
+    # The difference of a statistic between two groups, with Welch's t-test and the resampling-based p-value and confidence interval
+    statistic: str
+    difference: float
+    t_stat: float
+    p_ttest: float
+    p_permutation: float
+    ci_low: float
+    ci_high: float
+    confidence: float
+    n_resamples: int
+
+    def summary(self) -> str:
+        return (f"Difference of the {self.statistic}s: {self.difference:.4f} "
+                f"({self.confidence:.0%} bootstrap CI: [{self.ci_low:.4f}, {self.ci_high:.4f}])\n"
+                f"Welch's T-Statistic: {self.t_stat:.2f}, P-Value: {self.p_ttest:.4f}\n"
+                f"Permutation P-Value ({self.n_resamples} resamples): {self.p_permutation:.4f}")
+
+
+def _as_values(values) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    return values[~np.isnan(values)]
+
+def _blocks(n_resamples: int, n_values: int) -> list[int]:
+    # Sizes of the blocks of replicates (only depends on the sizes of the data, so that the random streams do not depend on `n_jobs`)
+    block_size = max(1, RESAMPLING_BLOCK_BYTES // (8 * max(n_values, 1)))
+    return [min(block_size, n_resamples - start) for start in range(0, n_resamples, block_size)]
+
+def _difference(a: np.ndarray, b: np.ndarray, statistic: str, axis=None) -> np.ndarray:
+    func = STATISTICS[statistic]
+    return func(a, axis=axis) - func(b, axis=axis)
+
+# ============ ============ Replicates (run in the workers) ============ ============
+
+def _permutation_block(pooled: np.ndarray, n_a: int, statistic: str, size: int, seed: np.random.SeedSequence,
+                       buffers: dict) -> np.ndarray:
+    # The differences between the first `n_a` and the other pooled values, for `size` random relabelings
+    rng = np.random.default_rng(seed)
+    if buffers.get("permutation", np.empty((0, 0))).shape != (size, len(pooled)):
+        buffers["permutation"] = np.empty((size, len(pooled)))
+    values = buffers["permutation"]
+    values[:] = pooled # Reset, so that a block does not depend on the blocks run before it in the same process
+    rng.permuted(values, axis=1, out=values) # Shuffling the values in place is cheaper than shuffling indices and gathering them
+    if statistic == "mean":
+        # Only the sums of the first group are needed: the ones of the second group follow from the total
+        sums_a = values[:, :n_a].sum(axis=1)
+        return sums_a / n_a - (pooled.sum() - sums_a) / (len(pooled) - n_a)
+    return _difference(values[:, :n_a], values[:, n_a:], statistic, axis=1)
+
+def _bootstrap_block(a: np.ndarray, b: np.ndarray, statistic: str, size: int, seed: np.random.SeedSequence,
+                     buffers: dict) -> np.ndarray:
+    # The differences between `size` resamplings (with replacement) of each group
+    rng = np.random.default_rng(seed)
+    resampled = []
+    for name, values in (("a", a), ("b", b)):
+        if buffers.get(name, np.empty((0, 0))).shape != (size, len(values)):
+            buffers[name] = np.empty((size, len(values)))
+        np.take(values, rng.integers(0, len(values), size=(size, len(values)), dtype=np.int32), out=buffers[name])
+        resampled.append(buffers[name])
+    return _difference(*resampled, statistic, axis=1)
+
+def _run_blocks(kind: str, data: tuple, statistic: str, sizes: list[int], seeds: list[np.random.SeedSequence]) -> np.ndarray:
+    block = _permutation_block if kind == "permutation" else _bootstrap_block
+    buffers = {}
+    return np.concatenate([block(*data, statistic, size, seed, buffers) for size, seed in zip(sizes, seeds)])
+
+def _replicates(kind: str, data: tuple, n_values: int, statistic: str, n_resamples: int, seed: int, n_jobs: int|None) -> np.ndarray:
+    # Spreads the blocks over `n_jobs` processes (all the cores when None); the output does not depend on `n_jobs`
+    sizes = _blocks(n_resamples, n_values)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    n_jobs = min(os.cpu_count() if n_jobs is None else n_jobs, len(sizes))
+    if n_jobs <= 1:
+        return _run_blocks(kind, data, statistic, sizes, seeds)
+    # Contiguous runs of blocks per job (concatenated back in order)
+    bounds = np.linspace(0, len(sizes), n_jobs + 1).astype(int)
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        futures = [pool.submit(_run_blocks, kind, data, statistic, sizes[lo:hi], seeds[lo:hi]) for lo, hi in zip(bounds[:-1], bounds[1:])]
+        return np.concatenate([future.result() for future in futures])
+
+# ============ ============ Tests ============ ============
+
+def permutation_test(a, b, statistic: str = "mean", n_resamples: int = 10_000, seed: int = 0, n_jobs: int|None = 1) -> tuple[float,float]:
+    """
+    Two-sided permutation test of the difference of a statistic between two groups.
+
+    Args:
+        a, b (array-like): The values of the two groups (NaNs are dropped).
+        statistic (str): "mean" or "median".
+        n_resamples (int): Number of random relabelings.
+        seed (int): Seed of the relabelings.
+        n_jobs (int|None): Number of processes (all the cores when None).
+
+    Returns:
+        tuple[float,float]: The observed difference, and the p-value.
+    """
+    a, b = _as_values(a), _as_values(b)
+    observed = float(_difference(a, b, statistic))
+    pooled = np.concatenate([a, b])
+    differences = _replicates("permutation", (pooled, len(a)), len(pooled), statistic, n_resamples, seed, n_jobs)
+    # The relabelings can only reach the observed difference up to rounding errors
+    at_least_as_extreme = np.abs(differences) >= abs(observed) * (1 - 1e-9)
+    return observed, float((at_least_as_extreme.sum() + 1) / (n_resamples + 1))
+
+def bootstrap_ci(a, b, statistic: str = "mean", n_resamples: int = 10_000, confidence: float = 0.95, seed: int = 0,
+                 n_jobs: int|None = 1) -> tuple[float,float]:
+    """
+    Percentile bootstrap confidence interval of the difference of a statistic between two groups (resampled independently).
+
+    Args:
+        a, b (array-like): The values of the two groups (NaNs are dropped).
+        statistic (str): "mean" or "median".
+        n_resamples (int): Number of resamplings.
+        confidence (float): The confidence level of the interval.
+        seed (int): Seed of the resamplings.
+        n_jobs (int|None): Number of processes (all the cores when None).
+
+    Returns:
+        tuple[float,float]: The bounds of the interval.
+    """
+    a, b = _as_values(a), _as_values(b)
+    differences = _replicates("bootstrap", (a, b), len(a) + len(b), statistic, n_resamples, seed, n_jobs)
+    low, high = np.quantile(differences, [(1 - confidence) / 2, (1 + confidence) / 2])
+    return float(low), float(high)
+
+def compare_groups(a, b, statistic: str = "mean", n_resamples: int|None = None, confidence: float = 0.95, seed: int = 0,
+                   n_jobs: int|None = None) -> GroupComparison:
+    """
+    Compares two groups with Welch's t-test, a permutation test and a bootstrap confidence interval.
+
+    Args:
+        a, b (array-like): The values of the two groups (NaNs are dropped).
+        statistic (str): "mean" or "median", the statistic compared by the resampling tests.
+        n_resamples (int|None): Number of replicates of each resampling test (`cfg.RESAMPLING_N_RESAMPLES` when None).
+        confidence (float): The confidence level of the interval.
+        seed (int): Seed of the resamplings.
+        n_jobs (int|None): Number of processes (`cfg.RESAMPLING_JOBS`, 1 by default, when None). More processes only pay off for large groups.
+
+    Returns:
+        GroupComparison: The results of the three tests.
+    """
+    from scipy.stats import ttest_ind # Lazily, scipy is slow to import (this module is imported by data_utils)
+    n_resamples = cfg.RESAMPLING_N_RESAMPLES if n_resamples is None else n_resamples
+    n_jobs = cfg.RESAMPLING_JOBS if n_jobs is None else n_jobs
+    a, b = _as_values(a), _as_values(b)
+    t_stat, p_ttest = ttest_ind(a, b, equal_var=False)
+    difference, p_permutation = permutation_test(a, b, statistic, n_resamples, seed, n_jobs)
+    ci_low, ci_high = bootstrap_ci(a, b, statistic, n_resamples, confidence, seed, n_jobs)
+    return GroupComparison(statistic, difference, float(t_stat), float(p_ttest), p_permutation, ci_low, ci_high, confidence, n_resamples)
+
+
+# ============ ============ Quantile sketches ============ ============
+
+@dataclass
+class BoxStats:
+    # The statistics of a boxplot (Tukey's whiskers: the extreme values within 1.5 IQR of the quartiles), as `go.Box` takes them precomputed
+    count: int
+    mean: float
+    sd: float
+    min: float
+    q1: float
+    median: float
+    q3: float
+    max: float
+    lowerfence: float
+    upperfence: float
+    outliers: np.ndarray = field(repr=False) # A sample of the values beyond the whiskers (among the retained ones, and the min and max)
+
+
+class QuantileSketch:
+    """
+    KLL quantile sketch: a stack of compactors, where level h holds sorted values standing for 2^h values each. When a level overflows,
+    it keeps every other value (starting at a random offset) and promotes them to the next level, so the memory stays
+    O(k log(n/k)) and the rank error of the quantiles about 1/k. Sketches of chunks/groups can be merged (`merge`, `+`),
+    which gives the same guarantees as a sketch of all their values. The count, mean, standard deviation, min and max are exact.
+
+    Args:
+        k (int|None): Capacity of the top level, i.e. accuracy (`cfg.SKETCH_K` when None).
+        seed (int|None): Seed of the compactions.
+    """
+    C = 2 / 3 # Ratio between the capacities of consecutive levels
+
+    def __init__(self, k: int|None = None, seed: int|None = 0):
+        self.k = cfg.SKETCH_K if k is None else k
+        self._rng = np.random.default_rng(seed)
+        self._levels: list[np.ndarray] = [np.empty(0)]
+        self.count = 0
+        self._sum = self._sum_sq = 0.0
+        self.min, self.max = np.inf, -np.inf
+
+    @classmethod
+    def from_values(cls, values, k: int|None = None, seed: int|None = 0) -> "QuantileSketch":
+        return cls(k, seed).update(values)
+
+    def _capacity(self, level: int) -> int:
+        return max(2, int(np.ceil(self.k * self.C ** (len(self._levels) - 1 - level))))
+
+    def _compress(self):
+        level = 0
+        while level < len(self._levels):
+            values = self._levels[level]
+            if len(values) > self._capacity(level):
+                values = np.sort(values)
+                if len(values) % 2: # An odd value out stays at this level
+                    kept, values = values[-1:], values[:-1]
+                else:
+                    kept = values[:0]
+                if level + 1 == len(self._levels):
+                    self._levels.append(np.empty(0))
+                self._levels[level] = kept
+                self._levels[level + 1] = np.concatenate([self._levels[level + 1], values[self._rng.integers(2)::2]])
+            level += 1
+
+    def update(self, values) -> "QuantileSketch":
+        # Adds a batch of values (NaNs are ignored)
+        values = _as_values(values)
+        if len(values) == 0:
+            return self
+        self.count += len(values)
+        self._sum += float(values.sum())
+        self._sum_sq += float(np.square(values).sum())
+        self.min, self.max = min(self.min, float(values.min())), max(self.max, float(values.max()))
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        # Adds the values summarized by `other` (in place)
+        self._levels += [np.empty(0)] * (len(other._levels) - len(self._levels))
+        for level, values in enumerate(other._levels):
+            self._levels[level] = np.concatenate([self._levels[level], values])
+        self.count += other.count
+        self._sum, self._sum_sq = self._sum + other._sum, self._sum_sq + other._sum_sq
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        self._compress()
+        return self
+
+    def __add__(self, other: "QuantileSketch") -> "QuantileSketch":
+        merged = QuantileSketch(max(self.k, other.k), seed=None)
+        return merged.merge(self).merge(other)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(values.nbytes for values in self._levels)
+
+    def _weighted(self) -> tuple[np.ndarray,np.ndarray]:
+        # The retained values (sorted) and the cumulated number of values they stand for
+        values = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(values), 2**level, dtype=np.int64) for level, values in enumerate(self._levels)])
+        order = np.argsort(values, kind="stable")
+        return values[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs) -> np.ndarray:
+        qs = np.atleast_1d(np.asarray(qs, dtype=np.float64))
+        if self.count == 0:
+            return np.full(len(qs), np.nan)
+        values, cum_weights = self._weighted()
+        idx = np.searchsorted(cum_weights, qs * cum_weights[-1], side="left")
+        result = values[np.minimum(idx, len(values) - 1)]
+        # The extreme quantiles are known exactly
+        result[qs <= 0], result[qs >= 1] = self.min, self.max
+        return result
+
+    def mean(self) -> float:
+        return self._sum / self.count if self.count else np.nan
+
+    def std(self) -> float:
+        # Sample standard deviation (like pandas)
+        if self.count < 2:
+            return np.nan
+        return float(np.sqrt(max(self._sum_sq - self.count * self.mean()**2, 0) / (self.count - 1)))
+
+    def describe(self) -> pd.Series:
+        # Like `pd.Series.describe`, with the quartiles estimated by the sketch
+        q1, median, q3 = self.quantiles([0.25, 0.5, 0.75])
+        return pd.Series({"count": float(self.count), "mean": self.mean(), "std": self.std(), "min": self.min,
+                          "25%": q1, "50%": median, "75%": q3, "max": self.max})
+
+    def box_stats(self, max_outliers: int|None = None) -> BoxStats:
+        """
+        The statistics of the boxplot of the values, for `go.Box` (see `sketch_box_traces` in src/plots/sentiment_analysis.py).
+
+        Args:
+            max_outliers (int|None): Maximum number of outliers kept (evenly spaced among the retained ones, `cfg.SKETCH_MAX_OUTLIERS` when None).
+
+        Returns:
+            BoxStats: The quartiles, whiskers and sampled outliers.
+        """
+        max_outliers = cfg.SKETCH_MAX_OUTLIERS if max_outliers is None else max_outliers
+        q1, median, q3 = self.quantiles([0.25, 0.5, 0.75])
+        low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+        # The retained values, and the exact extremes (which the whiskers reach when they are within the fences)
+        values = np.unique(np.concatenate([*self._levels, [self.min, self.max]])) if self.count else np.empty(0)
+        inside = values[(values >= low) & (values <= high)]
+        outliers = values[(values < low) | (values > high)]
+        if len(outliers) > max_outliers:
+            outliers = outliers[np.unique(np.linspace(0, len(outliers) - 1, max_outliers).round().astype(np.int64))]
+        return BoxStats(self.count, self.mean(), self.std(), self.min, q1, median, q3, self.max,
+                        lowerfence=float(inside.min()) if len(inside) else q1, upperfence=float(inside.max()) if len(inside) else q3,
+                        outliers=outliers)
+
+
+def sketch_groups(chunks, value_col: str, group_col: str, k: int|None = None) -> dict:
+    """
+    Builds one quantile sketch per group, chunk by chunk (e.g. from `ProjectDataset.iter_chunks`), without holding all the values.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]|pd.DataFrame): The data (a single dataframe is one chunk).
+        value_col (str): The column summarized.
+        group_col (str): The column of the groups.
+        k (int|None): Accuracy of the sketches (see `QuantileSketch`).
+
+    Returns:
+        dict: The sketch of each group.
+    """
+    sketches = {}
+    for chunk in [chunks] if isinstance(chunks, pd.DataFrame) else chunks:
+        for group, values in chunk.groupby(group_col, observed=True, sort=False)[value_col]:
+            sketches.setdefault(group, QuantileSketch(k, seed=len(sketches))).update(values.to_numpy())
+    return sketches
+
+
+# ============ ============ Per-group moments ============ ============
+
+MOMENT_COLUMNS = ["n", "mean", "m2"] # m2: sum of the squared deviations to the mean
+
+def group_moments(values, keys) -> pd.DataFrame:
+    """
+    Count, mean and sum of squared deviations of the values of each group (NaN values, and the values without a key, are ignored).
+    The moments of several chunks are combined with `merge_moments`, so this can be computed chunk by chunk (or in parallel).
+
+    Args:
+        values (pd.Series): The values.
+        keys (pd.Series): The group of each value (e.g. `criticName`).
+
+    Returns:
+        DataFrame: The `MOMENT_COLUMNS`, indexed by the groups.
+    """
+    values = pd.Series(np.asarray(values, dtype=np.float64), index=keys.index)
+    groups = values[values.notna()].groupby(keys, observed=True, sort=False)
+    moments = pd.DataFrame({"n": groups.count(), "mean": groups.mean()})
+    moments["m2"] = groups.var(ddof=0) * moments["n"]
+    # Plain index (the categories of categorical keys differ between chunks)
+    moments.index = pd.Index(np.asarray(moments.index), name=keys.name)
+    return moments
+
+def merge_moments(*moments: pd.DataFrame) -> pd.DataFrame:
+    # Combines per-group moments of disjoint sets of values (Chan et al.'s pairwise update of Welford's algorithm, vectorized over the groups)
+    merged = moments[0]
+    for other in moments[1:]:
+        index = merged.index.union(other.index)
+        a = merged.reindex(index, fill_value=0)
+        b = other.reindex(index, fill_value=0)
+        n = a["n"] + b["n"]
+        delta = b["mean"] - a["mean"]
+        share_b = (b["n"] / n.where(n > 0)).fillna(0)
+        merged = pd.DataFrame({"n": n,
+                               "mean": a["mean"] + delta * share_b,
+                               "m2": a["m2"] + b["m2"] + delta**2 * a["n"] * share_b}, index=index)
+    return merged
+
+def moments_summary(moments: pd.DataFrame) -> pd.DataFrame:
+    # The count, mean and (sample) standard deviation of each group
+    return pd.DataFrame({"n": moments["n"].astype(np.int64), "mean": moments["mean"],
+                         "std": np.sqrt(moments["m2"] / (moments["n"] - 1).where(moments["n"] > 1))}, index=moments.index)
@@ -0,0 +1,190 @@
+# Joining datasets on movie titles (e.g. the CMU movies with the Oscar nominations): the titles are normalized (case, punctuation,
+# articles, accents), hashed into integer codes, and matched on (code, release year) within a year tolerance, so that
+# near-miss spellings are kept, and remakes/same-named films do not multiply the rows (each query matches at most one movie).
+# People (e.g. the Oscar nominees and the CMU actors) are joined the same way on their normalized names (see `NameIndex`)
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from .constants import NOTEBOOK_RUNCONFIG as cfg
+
+_YEAR_BITS = 16 # The index is keyed by (title code << _YEAR_BITS) + year
+_LEADING_ARTICLES = r"^(?:the|a|an|le|la|les|l|el|il|der|die|das)\s+"
+_TRAILING_ARTICLES = r"\s+(?:the|a|an)$" # "Godfather, The" (the comma is removed before)
+
+def normalize_titles(titles: pd.Series) -> pd.Series:
+    """
+    Normalized titles, to compare titles across datasets: unicode folding (accents removed), lower case, "&" as "and",
+    punctuation as spaces, leading (and trailing) articles removed, whitespace collapsed.
+    The string operations are vectorized, and done on the distinct titles only.
+
+    Args:
+        titles (pd.Series): The titles.
+
+    Returns:
+        pd.Series: The normalized titles (NaN for missing ones), with the same index.
+    """
+    codes, uniques = pd.factorize(titles)
+    normalized = (pd.Series(uniques, dtype=object).astype(str)
+                  .str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+                  .str.lower()
+                  .str.replace('&', ' and ', regex=False)
+                  .str.replace(r"[^\w\s]|_", ' ', regex=True)
+                  .str.replace(r"\s+", ' ', regex=True).str.strip()
+                  .str.replace(_LEADING_ARTICLES, '', regex=True)
+                  .str.replace(_TRAILING_ARTICLES, '', regex=True))
+    normalized = normalized.where(normalized != '').to_numpy(dtype=object)
+    result = np.full(len(codes), np.nan, dtype=object)
+    result[codes >= 0] = normalized[codes[codes >= 0]]
+    return pd.Series(result, index=titles.index, name=titles.name)
+
+def normalize_names(names: pd.Series) -> pd.Series:
+    # Normalized names of people: unicode folding, lower case, and only the letters and digits (without the spaces and the punctuation,
+    # so that "Danny DeVito", "Danny De Vito" and "Danny De-Vito" agree). Vectorized, on the distinct names only
+    codes, uniques = pd.factorize(names)
+    normalized = (pd.Series(uniques, dtype=object).astype(str)
+                  .str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+                  .str.lower()
+                  .str.replace(r"[\W_]+", '', regex=True))
+    normalized = normalized.where(normalized != '').to_numpy(dtype=object)
+    result = np.full(len(codes), np.nan, dtype=object)
+    result[codes >= 0] = normalized[codes[codes >= 0]]
+    return pd.Series(result, index=names.index, name=names.name)
+
+
+@dataclass
+class TitleMatch:
+    # The result of `TitleIndex.match`: which query row matched which indexed row, and how
+    query_rows: np.ndarray # Positions of the matched query rows
+    index_rows: np.ndarray # Positions of the indexed rows they matched
+    year_gaps: np.ndarray # |query year - indexed year| of each match (-1 for the undated indexed rows)
+    n_queries: int
+    n_candidates: np.ndarray # Number of indexed rows within the tolerance, for each matched query row
+
+    def report(self) -> pd.Series:
+        # Match rates of the query rows
+        n_matched = len(self.query_rows)
+        rates = {
+            "queries": self.n_queries,
+            "matched": n_matched,
+            "match_rate": n_matched / max(self.n_queries, 1),
+            "same_year": int((self.year_gaps == 0).sum()),
+            "within_tolerance": int((self.year_gaps > 0).sum()),
+            "undated": int((self.year_gaps < 0).sum()),
+            "ambiguous": int((self.n_candidates > 1).sum()), # Resolved with the closest year
+        }
+        return pd.Series(rates, dtype=object)
+
+
+@dataclass
+class TitleIndex:
+    """
+    Hash index of the (normalized title, release year) of a table of movies, built once and queried with other tables (see `match`).
+
+    Attributes:
+        titles (pd.Index): The distinct normalized titles (a hash table: their position is their code).
+        keys (np.ndarray): The sorted (code << _YEAR_BITS) + year of the dated rows.
+        rows (np.ndarray): The row (position) of each key.
+        undated (np.ndarray): For each code, the row of its only undated movie (-1 if it has none or several).
+    """
+    titles: pd.Index
+    keys: np.ndarray
+    rows: np.ndarray
+    undated: np.ndarray
+
+    @classmethod
+    def build(cls, titles: pd.Series, years: pd.Series) -> "TitleIndex":
+        normalized = normalize_titles(titles)
+        codes, uniques = pd.factorize(normalized)
+        years = pd.to_numeric(years, errors='coerce').to_numpy(np.float64)
+        positions = np.arange(len(codes))
+
+        dated = (codes >= 0) & ~np.isnan(years)
+        keys = (codes[dated].astype(np.int64) << _YEAR_BITS) + years[dated].astype(np.int64)
+        order = np.argsort(keys, kind='stable')
+
+        undated = (codes >= 0) & np.isnan(years)
+        n_undated = np.bincount(codes[undated], minlength=len(uniques))
+        undated_rows = np.full(len(uniques), -1, dtype=np.int64)
+        unique_undated = undated & (n_undated[np.maximum(codes, 0)] == 1)
+        undated_rows[codes[unique_undated]] = positions[unique_undated]
+        return cls(pd.Index(uniques), keys[order], positions[dated][order], undated_rows)
+
+    def match(self, titles: pd.Series, years: pd.Series, tolerance: int|None = None) -> TitleMatch:
+        """
+        Matches each query (title, year) to at most one indexed movie: among the movies with the same normalized title and a release year
+        within `tolerance` years, the closest one (the first indexed one on ties). A query without any is matched to the only
+        undated movie with its title, if there is one. The candidate pairs are only enumerated within the tolerance window,
+        so duplicated titles never produce a cartesian product.
+
+        Args:
+            titles (pd.Series): The titles of the queries.
+            years (pd.Series): Their release years.
+            tolerance (int|None): The year tolerance (`cfg.TITLE_YEAR_TOLERANCE` when None).
+
+        Returns:
+            TitleMatch: The matched pairs of rows (positions), and the match rates (see `TitleMatch.report`).
+        """
+        tolerance = cfg.TITLE_YEAR_TOLERANCE if tolerance is None else tolerance
+        codes = self.titles.get_indexer(normalize_titles(titles).to_numpy(dtype=object))
+        years = pd.to_numeric(years, errors='coerce').to_numpy(np.float64)
+        known = codes >= 0
+        dated = known & ~np.isnan(years)
+
+        # The range of candidates of each dated query in the sorted keys
+        base = codes[dated].astype(np.int64) << _YEAR_BITS
+        query_years = years[dated].astype(np.int64)
+        lo = np.searchsorted(self.keys, base + np.maximum(query_years - tolerance, 0), side='left')
+        hi = np.searchsorted(self.keys, base + query_years + tolerance, side='right')
+        n_candidates = hi - lo
+
+        # Enumerate the candidates (only those within the window) and keep the closest year of each query
+        query_of_candidate = np.repeat(np.arange(len(lo)), n_candidates)
+        candidate = np.arange(n_candidates.sum()) - np.repeat(np.cumsum(n_candidates) - n_candidates, n_candidates) + np.repeat(lo, n_candidates)
+        gaps = np.abs((self.keys[candidate] & (2**_YEAR_BITS - 1)) - query_years[query_of_candidate])
+        order = np.lexsort((candidate, gaps, query_of_candidate))
+        first = order[np.r_[True, np.diff(query_of_candidate[order]) != 0]] if len(order) else order
+
+        dated_positions = np.flatnonzero(dated)
+        query_rows, index_rows, year_gaps = dated_positions[query_of_candidate[first]], self.rows[candidate[first]], gaps[first]
+        candidates_of_match = n_candidates[query_of_candidate[first]]
+
+        # Fallback on the undated movies
+        unmatched = known & ~np.isin(np.arange(len(codes)), query_rows)
+        fallback = unmatched & (self.undated[np.maximum(codes, 0)] >= 0)
+        fallback_rows = np.flatnonzero(fallback)
+        query_rows = np.concatenate([query_rows, fallback_rows])
+        index_rows = np.concatenate([index_rows, self.undated[codes[fallback_rows]]])
+        year_gaps = np.concatenate([year_gaps, np.full(len(fallback_rows), -1)])
+        candidates_of_match = np.concatenate([candidates_of_match, np.ones(len(fallback_rows), dtype=np.int64)])
+
+        order = np.argsort(query_rows, kind='stable')
+        return TitleMatch(query_rows[order], index_rows[order], year_gaps[order], len(codes), candidates_of_match[order])
+
+
+@dataclass
+class NameIndex:
+    """
+    Hash index of the normalized names of a table of people (see `normalize_names`), built once and queried with other tables.
+
+    Attributes:
+        names (pd.Index): The distinct normalized names (a hash table: their position is their code).
+        codes (np.ndarray): The code of the name of each indexed row (-1 for the missing ones).
+    """
+    names: pd.Index
+    codes: np.ndarray
+
+    @classmethod
+    def build(cls, names: pd.Series) -> "NameIndex":
+        codes, uniques = pd.factorize(normalize_names(names))
+        return cls(pd.Index(uniques), codes)
+
+    def lookup(self, names: pd.Series) -> np.ndarray:
+        # The code of each of the names (-1 for the names of nobody in the index)
+        return self.names.get_indexer(normalize_names(names).to_numpy(dtype=object))
+
+
+def raw_title_join_size(left_titles: pd.Series, right_titles: pd.Series) -> tuple[int,int]:
+    # The number of rows of an inner join on the raw titles, and of right rows it keeps, computed from the title counts (without the join)
+    left_counts, right_counts = left_titles.value_counts(), right_titles.value_counts()
+    left_counts, right_counts = left_counts.align(right_counts, join='inner')
+    return int((left_counts * right_counts).sum()), int(right_counts.sum())
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.utils.cache_utils import _nbytes, clear_memo, memoize_frames
+from src.utils.constants import NOTEBOOK_RUNCONFIG as cfg
+from src.utils.title_utils import TitleIndex
+from src.utils.data_utils import AwardSummary
+
+ARRAY_BYTES = 8_000 # 1000 float64
+
+
+@pytest.fixture(autouse=True)
+def empty_memo():
+    clear_memo()
+    yield
+    clear_memo()
+
+
+@memoize_frames
+def _ones(i: int) -> np.ndarray:
+    return np.full(ARRAY_BYTES // 8, float(i))
+
+
+@memoize_frames
+def _title_index(titles: pd.Series, years: pd.Series) -> TitleIndex:
+    return TitleIndex.build(titles, years)
+
+
+@memoize_frames
+def _summary(films: pd.DataFrame) -> AwardSummary:
+    return AwardSummary(films, pd.Index(["ACTING", "DIRECTING"]))
+
+
+@memoize_frames
+def _with_total(df: pd.DataFrame) -> pd.DataFrame:
+    return df.assign(total=df.sum(axis=1))
+
+
+def test_memoize_frames_evicts_the_least_recently_used_results(monkeypatch):
+    monkeypatch.setattr(cfg, "MEMO_MAX_BYTES", 2 * ARRAY_BYTES + 100)
+    _ones(0), _ones(1)
+    _ones(0) # Now the most recently used
+    _ones(2) # Evicts 1
+    assert _ones.cache_info()[:3] == (1, 3, 2)
+    _ones(0)
+    assert _ones.cache_info().hits == 2
+    _ones(1)
+    assert _ones.cache_info().misses == 4
+    assert _ones.cache_info().nbytes <= cfg.MEMO_MAX_BYTES
+
+
+def test_memoize_frames_skips_the_results_larger_than_the_budget(monkeypatch):
+    monkeypatch.setattr(cfg, "MEMO_MAX_BYTES", ARRAY_BYTES // 2)
+    _ones(0), _ones(0)
+    assert _ones.cache_info()[:3] == (0, 2, 0)
+
+
+def test_memoize_frames_returns_copies():
+    df = pd.DataFrame({"a": [1, 2], "b": [3, 4]})
+    first = _with_total(df)
+    first["total"] = -1
+    first.loc[0, "a"] = 100
+    second = _with_total(df)
+    assert second["total"].tolist() == [4, 6] and second["a"].tolist() == [1, 2]
+    assert _with_total.cache_info().hits == 1
+
+
+def test_memoize_frames_keys_on_the_content_of_the_frames():
+    df = pd.DataFrame({"a": [1, 2], "b": [3, 4]})
+    _with_total(df), _with_total(df.copy())
+    assert _with_total(df.assign(b=[3, 5]))["total"].tolist() == [4, 7]
+    assert _with_total.cache_info()[:3] == (1, 2, 2)
+
+
+def test_cache_clear_only_clears_its_function():
+    _ones(0), _with_total(pd.DataFrame({"a": [1]}))
+    _ones.cache_clear()
+    assert _ones.cache_info() == (0, 0, 0, 0)
+    assert _with_total.cache_info().entries == 1
+    _ones(0)
+    assert _ones.cache_info().misses == 1
+
+
+def test_nbytes_of_dataclasses_sums_their_fields():
+    index = TitleIndex.build(pd.Series([f"title {i}" for i in range(10_000)]), pd.Series(np.arange(10_000) % 50 + 1950))
+    assert _nbytes(index) >= index.keys.nbytes + index.rows.nbytes + index.titles.memory_usage(deep=True)
+
+
+def test_memoize_frames_returns_copies_of_dataclasses():
+    titles, years = pd.Series(["Heat", "Alien", "Up"]), pd.Series([1995, 1979, 2009])
+    index = _title_index(titles, years)
+    index.keys[:] = -1
+    index.rows[:] = -1
+    assert np.array_equal(_title_index(titles, years).rows, TitleIndex.build(titles, years).rows)
+
+    films = pd.DataFrame({"film": ["Heat"], "wins": [1], "categories": [0b11], "won_categories": [0b01]})
+    summary = _summary(films)
+    summary.films.loc[0, "wins"] = 100
+    summary.films["extra"] = 0
+    again = _summary(films)
+    assert again.films["wins"].tolist() == [1] and "extra" not in again.films
+    assert again.in_categories("DIRECTING").tolist() == [True]
+    assert _summary.cache_info().hits == 1
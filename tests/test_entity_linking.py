@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+from src.utils.entity_linking import assign_one_to_one, candidate_pairs, link_records, resolve_entities
+
+
+def _records(key, titles, years=None, runtimes=None, directors=None):
+    return link_records(pd.DataFrame({key: np.arange(len(titles))}), titles, years, runtimes, directors)
+
+
+# ============ ============ Blocking ============ ============
+
+def _pairs(left, right, **kwargs):
+    return set(zip(*(rows.tolist() for rows in candidate_pairs(left, right, **kwargs))))
+
+
+def test_candidate_pairs_block_on_the_title_tokens_within_the_tolerance():
+    left = _records("a", ["The Godfather", "Casablanca", "Heat", "Heat"], [1972, 1942, 1995, 1986])
+    right = _records("b", ["Godfather, The", "Casablanca", "Heat", "Vertigo"], [1973, 1950, 1995, 1958])
+    pairs = _pairs(left, right, tolerance=1)
+    assert (0, 0) in pairs # Same normalized title, one year apart
+    assert (2, 2) in pairs
+    assert (1, 1) not in pairs # Eight years apart
+    assert (3, 2) not in pairs # Same title, nine years apart
+    assert not any(right_row == 3 for _, right_row in pairs) # No title token in common with any left record
+
+
+def test_candidate_pairs_compare_the_undated_records_on_their_whole_title():
+    left = _records("a", ["Heat", "Heat Wave", "Casablanca"], [None, 1995, None])
+    right = _records("b", ["Heat", "Heat", "Casablanca Express"], [1995, 2010, 1989])
+    pairs = _pairs(left, right, tolerance=1)
+    assert {(0, 0), (0, 1)} <= pairs # Same normalized title, any year
+    assert (2, 2) not in pairs # A shared word is not enough without a year
+
+
+def test_candidate_pairs_are_distinct_and_sorted():
+    left = _records("a", ["Alien", "Aliens", "Alien"], [1979, 1986, 1979])
+    right = _records("b", ["Alien", "Alien"], [1979, 1980])
+    left_rows, right_rows = candidate_pairs(left, right, tolerance=1)
+    keys = left_rows * len(right) + right_rows
+    assert np.array_equal(keys, np.unique(keys))
+
+
+# ============ ============ Assignment ============ ============
+
+def _greedy(left_rows, right_rows, scores):
+    # Reference: the pairs taken one at a time by decreasing score (ties by left, then right row) while both records are free
+    kept, taken_left, taken_right = [], set(), set()
+    for i in np.lexsort((right_rows, left_rows, -scores)):
+        if left_rows[i] not in taken_left and right_rows[i] not in taken_right:
+            kept.append(i)
+            taken_left.add(left_rows[i])
+            taken_right.add(right_rows[i])
+    return np.sort(np.array(kept, dtype=np.int64))
+
+
+def test_assign_one_to_one_matches_the_sequential_greedy_assignment():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        n = rng.integers(1, 300)
+        left_rows, right_rows = rng.integers(0, 40, n), rng.integers(0, 40, n)
+        scores = rng.integers(0, 5, n) / 4 # Many ties
+        kept = assign_one_to_one(left_rows, right_rows, scores)
+        assert len(np.unique(left_rows[kept])) == len(kept)
+        assert len(np.unique(right_rows[kept])) == len(kept)
+        assert np.array_equal(kept, _greedy(left_rows, right_rows, scores))
+
+
+def test_assign_one_to_one_terminates_on_chains_and_empty_input():
+    # Each pair is the best of one of its records only: the chain is resolved one pair per round from its best end
+    n = 500
+    left_rows, right_rows = np.repeat(np.arange(n), 2)[1:], np.repeat(np.arange(n), 2)[:-1]
+    scores = np.linspace(1, 0, len(left_rows))
+    kept = assign_one_to_one(left_rows, right_rows, scores)
+    assert np.array_equal(kept, _greedy(left_rows, right_rows, scores))
+    assert len(assign_one_to_one(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0))) == 0
+
+
+# ============ ============ Resolution ============ ============
+
+def test_resolve_entities_links_fills_and_appends():
+    cmu = link_records(pd.DataFrame({"wikipedia_id": [10, 11, 12]}), ["The Godfather", "Casablanca", "Heat"], [1972, None, 1995], [175, 102, 170])
+    rt = link_records(pd.DataFrame({"rt_id": ["godfather", "casablanca", "up"]}), ["Godfather, The", "Casablanca", "Up"],
+                      [1972, 1942, 2009], [177, 102, 96], ["Francis Ford Coppola", "Michael Curtiz", "Pete Docter"])
+    oscars = link_records(pd.DataFrame({"oscar_film": ["The Godfather", "Up"]}), ["The Godfather", "Up"], [1972, 2009],
+                          directors=["Francis Ford Coppola", None])
+    films = resolve_entities({"CMU": cmu, "RT": rt, "Oscars": oscars}, tolerance=1, min_score=0.7)
+
+    assert len(films) == 4 # The three CMU movies, and "Up" (from RT, then linked by the Oscars)
+    godfather = films[films["wikipedia_id"] == 10].iloc[0]
+    assert godfather["rt_id"] == "godfather" and godfather["oscar_film"] == "The Godfather"
+    assert godfather["director"] == "Francis Ford Coppola" # Filled from RT
+    casablanca = films[films["wikipedia_id"] == 11].iloc[0]
+    assert casablanca["rt_id"] == "casablanca" and casablanca["year"] == 1942 # Undated in CMU, dated by RT
+    up = films[films["rt_id"] == "up"].iloc[0]
+    assert pd.isna(up["wikipedia_id"]) and up["oscar_film"] == "Up" and np.isnan(up["RT_score"])
+    assert films[films["wikipedia_id"] == 12]["rt_id"].isna().all()
+    for key in ("wikipedia_id", "rt_id", "oscar_film"):
+        assert not films[key].dropna().duplicated().any()
@@ -0,0 +1,45 @@
+import ast
+import numpy as np
+import pandas as pd
+import pytest
+from src.utils.freebase_utils import list_column_links, parse_freebase_column
+
+
+def _literal_eval_lists(column: pd.Series) -> list[list[str]]:
+    # The former parsing: one `ast.literal_eval` per row, missing values being empty dicts
+    return [[] if pd.isna(cell) else list(ast.literal_eval(cell).values()) for cell in column]
+
+
+COLUMNS = {
+    "plain": ['{"/m/07s9rl0": "Drama", "/m/01z4y": "Comedy"}', '{"/m/01z4y": "Comedy"}'],
+    "empty_dicts": ['{}', '{"/m/07s9rl0": "Drama"}', '{}', '{}'],
+    "missing": [np.nan, '{"/m/07s9rl0": "Drama"}', None, '{}'],
+    "escaped_quotes": ['{"/m/0a": "The \\"Best\\" Films", "/m/0b": "Drama"}', '{"/m/0b": "Drama"}', '{}'],
+    "non_ascii": ['{"/m/0c": "Fran\\u00e7ais", "/m/0d": "Español"}', '{"/m/0e": "\\u65e5\\u672c\\u8a9e", "/m/0c": "Fran\\u00e7ais"}'],
+    "spacing": ['{"/m/07s9rl0":"Drama" , "/m/01z4y" :  "Comedy"}', '{"/m/01z4y": "Comedy"}'],
+    "all_missing": [np.nan, None],
+}
+
+
+@pytest.mark.parametrize("name", COLUMNS)
+def test_parse_freebase_column_matches_literal_eval(name):
+    column = pd.Series(COLUMNS[name], dtype=object)
+    parsed = parse_freebase_column(column)
+    expected = _literal_eval_lists(column)
+    assert parsed.to_lists() == expected
+    assert parsed.counts().tolist() == [len(labels) for labels in expected]
+    assert parsed.first_labels().tolist() == [labels[0] if labels else None for labels in expected]
+
+
+def test_parse_freebase_column_codes_the_ids():
+    parsed = parse_freebase_column(pd.Series(COLUMNS["escaped_quotes"]))
+    assert parsed.ids.tolist() == ["/m/0a", "/m/0b"]
+    assert parsed.dictionary()["label"].tolist() == ['The "Best" Films', "Drama"]
+    assert parsed.rows.tolist() == [0, 0, 1]
+
+
+def test_list_column_links_counts_like_explode():
+    lists = pd.Series(_literal_eval_lists(pd.Series(COLUMNS["missing"] + COLUMNS["plain"], dtype=object)))
+    links = list_column_links(lists, "genre")
+    expected = lists.explode().dropna().value_counts().sort_index()
+    assert dict(zip(links.label_array(), links.aggregate())) == expected.to_dict()
@@ -0,0 +1,21 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from src.scripts.benchmarks import LAZY_MODULES
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_import_src_is_lazy_and_needs_no_raw_data(tmp_path):
+    # In a fresh interpreter, from a directory without `data/raw`: the datasets are only declared, and the heavy modules are not imported
+    code = ("import json,sys; from src import *; from src import ALL_DATASETS;"
+            f"print(json.dumps([[m for m in {LAZY_MODULES!r} if m in sys.modules], [ds.is_loaded for ds in ALL_DATASETS]]))")
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")]))}
+    result = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    eager_modules, loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    assert eager_modules == []
+    assert loaded and not any(loaded)
+    assert not (tmp_path / "data").exists()
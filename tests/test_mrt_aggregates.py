@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+from src.utils.data_utils import _mrt_preprocess_cells, mrt_preprocess_cells, mrt_movie_aggregates, mrt_cells_from_aggregates
+
+ARGS = ('originalScore', 'sa', 'id')
+
+
+def _reviews(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    scores = np.array(['3/4', '1/2', '4/5', 'B+', None, '7/10', '2.5/4'], dtype=object)
+    return pd.DataFrame({
+        'id': rng.choice([f"movie_{i}" for i in range(30)], n),
+        'reviewId': np.arange(n),
+        'creationDate': pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 365, n), unit='D'),
+        'isTopCritic': rng.choice([True, False], n),
+        'originalScore': rng.choice(scores, n),
+        'reviewState': rng.choice(['fresh', 'rotten'], n),
+        'sa': np.where(rng.random(n) < 0.1, np.nan, rng.uniform(-1, 1, n)),
+    })
+
+
+def test_cells_from_aggregates_match_the_cells_of_the_reviews():
+    reviews = _reviews()
+    comedy_ids = pd.Series([f"movie_{i}" for i in range(0, 30, 3)])
+    _mrt_preprocess_cells.cache_clear()
+    expected = mrt_preprocess_cells(reviews, *ARGS, comedy_ids, use_zscore=False, all_formats=False, normalize_by=None)
+    cells = mrt_cells_from_aggregates(mrt_movie_aggregates(reviews), comedy_ids, *ARGS)
+    pd.testing.assert_frame_equal(cells, expected, check_dtype=False, check_index_type=False)
@@ -0,0 +1,168 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.utils.constants import NOTEBOOK_RUNCONFIG as cfg
+from src.utils.data_utils import (link_oscar_actors, merge_ccmu_award_summary, merge_ccmu_rosc, oscar_actor_summary,
+                                  prepare_award_comparison_data, summarize_oscars)
+
+
+@pytest.fixture(autouse=True)
+def no_disk_cache(monkeypatch):
+    monkeypatch.setattr(cfg, "CACHE_DIR", None) # `summarize_oscars` is persisted
+
+
+def _cmu():
+    return pd.DataFrame({
+        "wikipedia_id": [1, 2, 3, 4, 5],
+        "title": ["The Godfather", "Heat", "Heat", "Amélie", "Titanic"],
+        "release_date": [1972, 1986, 1995, 2001, 1953],
+        "genres": [["Crime"], ["Thriller"], ["Crime"], ["Comedy"], ["Drama"]],
+    })
+
+
+def _nominations():
+    return pd.DataFrame({
+        "title": ["Godfather, The", "Heat", "Amelie", "Titanic", "Vertigo"],
+        "release_date": [1973, 1995, 2001, 1997, 1958], # One year late, exact, exact, a remake, not in CMU
+        "category": ["BEST PICTURE", "FILM EDITING", "ACTRESS IN A LEADING ROLE", "BEST PICTURE", "ART DIRECTION"],
+        "winner": [True, False, False, True, False],
+    })
+
+
+def test_merge_ccmu_rosc_joins_each_nomination_with_at_most_one_movie():
+    cmu, nominations = _cmu(), _nominations()
+    merged = merge_ccmu_rosc(cmu, nominations, year_tolerance=1)
+    assert merged.columns.tolist() == ["wikipedia_id", "title", "genres", "release_date", "category", "winner"]
+    assert merged["wikipedia_id"].tolist() == [1, 3, 4] # "Heat" (1995) is not joined with the 1986 one, nor "Titanic" with the 1953 one
+    assert merged["release_date"].tolist() == [1973, 1995, 2001] # The year of the nominated film
+    assert merged["category"].tolist() == ["BEST PICTURE", "FILM EDITING", "ACTRESS IN A LEADING ROLE"]
+
+    raw = cmu.merge(nominations, on="title") # The former join: both "Heat", the 1953 "Titanic", and neither variant spelling
+    assert sorted(raw["wikipedia_id"].tolist()) == [2, 3, 5]
+
+    assert merge_ccmu_rosc(cmu, nominations, year_tolerance=0)["wikipedia_id"].tolist() == [3, 4]
+    assert len(merge_ccmu_rosc(cmu, nominations.iloc[4:], year_tolerance=1)) == 0
+
+
+# ============ ============ Award summary ============ ============
+
+def _oscars():
+    return pd.DataFrame({
+        "film": ["Heat", "Heat", "Heat", "Alien", "Alien", "Heat", None],
+        "year_film": [1995, 1995, 1995, 1979, 1979, 1986, 1990],
+        "year_ceremony": [1996, 1996, 1997, 1980, 1980, 1987, 1991],
+        "category": ["FILM EDITING", "ACTOR", "ACTOR IN A LEADING ROLE", "ART DIRECTION", "CINEMATOGRAPHY (Color)", "FILM EDITING",
+                     "HONORARY AWARD"],
+        "name": ["Dov Hoenig", "Al Pacino", "Al Pacino", "Les Dilley", "Derek Vanlint", "Mark Goldblatt", "Someone"],
+        "winner": [False, True, False, True, False, False, True],
+    })
+
+
+def test_summarize_oscars_reduces_the_nominations_per_film():
+    summary = summarize_oscars(_oscars())
+    assert summary.categories.tolist() == ["ACTOR IN A LEADING ROLE", "CINEMATOGRAPHY", "FILM EDITING", "PRODUCTION DESIGN"]
+    films = summary.films
+    assert list(zip(films["film"], films["year_film"])) == [("Alien", 1979), ("Heat", 1986), ("Heat", 1995)] # The namesakes are kept apart
+    assert films["nominations"].tolist() == [2, 1, 3]
+    assert films["wins"].tolist() == [1, 0, 1]
+    assert films["categories"].tolist() == [0b1010, 0b0100, 0b0101]
+    assert films["won_categories"].tolist() == [0b1000, 0, 0b0001]
+    assert films["first_ceremony"].tolist() == [1980, 1987, 1996]
+
+    assert summary.in_categories("FILM EDITING").tolist() == [False, True, True]
+    assert summary.in_categories("ACTOR IN A LEADING ROLE", "PRODUCTION DESIGN", won=True).tolist() == [True, False, True]
+    assert summary.category_counts().tolist() == [1, 1, 2, 1]
+    assert summary.category_counts(won=True).tolist() == [1, 0, 0, 1]
+
+
+def test_prepare_award_comparison_data_counts_the_wins_per_movie():
+    movies = pd.DataFrame({
+        "wins": [2, 1, 0, 3],
+        "genres": [["Comedy"], ["Drama"], ["Comedy"], ["Comedy", "Drama"]],
+        "countries": [["United States of America", "United Kingdom"], ["United States of America"], ["France"], []],
+    })
+    comparison = prepare_award_comparison_data(movies)
+    assert comparison["countries"].tolist() == ["United States of America", "United Kingdom"] # France has no win
+    assert comparison["Winning_Movies_Total"].tolist() == [3, 2]
+    assert comparison["Winning_Comedies"].tolist() == [2, 2]
+    np.testing.assert_allclose(comparison["Comedy_Percentage"], [200 / 3, 100])
+
+
+def test_award_comparison_counts_each_win_once():
+    cmu = pd.DataFrame({
+        "wikipedia_id": [1, 2, 3],
+        "title": ["Heat", "Heat", "Alien"],
+        "release_date": [1995, 1986, 1979],
+        "genres": [["Crime"], ["Comedy"], ["Science Fiction"]],
+        "countries": [["United States of America"], ["United States of America"], ["United Kingdom"]],
+    })
+    movies = merge_ccmu_award_summary(cmu, _oscars(), year_tolerance=1)
+    assert movies["wikipedia_id"].tolist() == [1, 2, 3]
+    assert movies["wins"].tolist() == [1, 0, 1]
+    comparison = prepare_award_comparison_data(movies).set_index("countries")
+    # The former join on the raw titles credited the win of "Heat" (1995) to both movies, i.e. 2 wins (one of a comedy) for the US
+    assert comparison.loc["United States of America", ["Winning_Movies_Total", "Winning_Comedies"]].tolist() == [1, 0]
+    assert comparison.loc["United Kingdom", ["Winning_Movies_Total", "Winning_Comedies"]].tolist() == [1, 0]
+
+
+# ============ ============ Actors ============ ============
+
+def _actors_cmu():
+    return pd.DataFrame({
+        "wikipedia_id": [1, 2, 3, 4, 5, 6],
+        "title": ["Heat", "Scent of a Woman", "Big", "Cast Away", "Frankie and Johnny", "Dragnet"],
+        "release_date": [1995, 1992, 1988, 2000, 1991, 1987],
+        "genres": [["Crime"], ["Drama"], ["Comedy"], ["Drama"], ["Comedy", "Romance"], ["Comedy"]],
+    })
+
+
+def _characters():
+    return pd.DataFrame([
+        (1, "Al Pacino", "/m/pacino"), (2, "Al Pacino", "/m/pacino"), (5, "Al Pacino", "/m/pacino"),
+        (3, "Tom Hanks", "/m/hanks"), (3, "Tom Hanks", "/m/hanks"), (4, "Tom Hanks", "/m/hanks"), # Two characters in "Big"
+        (1, "John Smith", "/m/smith1"), (6, "John Smith", "/m/smith2"), # Namesakes
+        (4, "Helen Hunt", "/m/hunt"),
+        (6, "Nobody", None),
+        (99, "Ghost", "/m/ghost"), # In a movie missing from the cleaned CMU movies
+    ], columns=["wikipedia_id", "actor_name", "freebase_actor_id"])
+
+
+def _acting_oscars():
+    return pd.DataFrame([
+        ("Scent of a Woman", 1992, 1993, "ACTOR", "Al Pacino", True),
+        ("Scent of a Woman", 1992, 1993, "BEST PICTURE", "Martin Brest", False),
+        ("Dick Tracy", 1990, 1991, "ACTOR IN A SUPPORTING ROLE", "AL PACINO", False),
+        ("Big", 1988, 1989, "ACTOR", "Tom Hanks", False),
+        ("Big", 1988, 1989, "WRITING (Original Screenplay)", "Tom Hanks", True), # Not an acting category
+        ("Cast Away", 2000, 2001, "ACTOR IN A LEADING ROLE", "Tom Hanks", False),
+        ("Forrest Gump", 1994, 1995, "ACTOR IN A LEADING ROLE", "Tom Hanks", True),
+        ("As Good as It Gets", 1997, 1998, "ACTRESS IN A LEADING ROLE", "Hélen Hunt", True),
+        ("Heat", 1995, 1996, "ACTOR IN A SUPPORTING ROLE", "John Smith", False),
+        ("Unknown", 1993, 1994, "ACTOR IN A SUPPORTING ROLE", "John Smith", True),
+        ("Philadelphia", 1993, 1994, "ACTOR", "Denzel Washington", False),
+    ], columns=["film", "year_film", "year_ceremony", "category", "name", "winner"])
+
+
+def test_link_oscar_actors_links_the_acting_nominees():
+    links = link_oscar_actors(_actors_cmu(), _characters(), _acting_oscars(), year_tolerance=1)
+    assert links["film"].tolist() == ["Scent of a Woman", "Dick Tracy", "Big", "Cast Away", "Forrest Gump", "As Good as It Gets", "Heat",
+                                      "Unknown", "Philadelphia"] # Only the acting categories
+    assert links["freebase_actor_id"].tolist() == ["/m/pacino", "/m/pacino", "/m/hanks", "/m/hanks", "/m/hanks", "/m/hunt", "/m/smith1",
+                                                   pd.NA, pd.NA]
+    assert links["actor_link"].tolist() == ["film", "name", "film", "film", "name", "name", "film", np.nan, np.nan]
+
+
+def test_oscar_actor_summary_counts_the_nominations_and_the_comedies():
+    summary = oscar_actor_summary(_actors_cmu(), _characters(), _acting_oscars(), year_tolerance=1).set_index("freebase_actor_id")
+    assert sorted(summary.index) == ["/m/ghost", "/m/hanks", "/m/hunt", "/m/pacino", "/m/smith1", "/m/smith2"]
+    expected = pd.DataFrame({
+        "freebase_actor_id": ["/m/pacino", "/m/hanks", "/m/smith1", "/m/smith2", "/m/hunt", "/m/ghost"],
+        "movies": [3, 2, 1, 1, 1, 0],
+        "comedies": [1, 1, 0, 1, 0, 0],
+        "comedy_share": [1 / 3, 1 / 2, 0, 1, 0, np.nan],
+        "nominations": [2, 3, 1, 0, 1, 0],
+        "wins": [1, 1, 0, 0, 1, 0],
+        "first_nomination": pd.array([1991, 1989, 1996, None, 1998, None], dtype="Int16"),
+    }).set_index("freebase_actor_id")
+    pd.testing.assert_frame_equal(summary.loc[expected.index, expected.columns], expected, check_dtype=False)
+    assert summary.loc["/m/hanks", "actor_name"] == "Tom Hanks"
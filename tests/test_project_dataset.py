@@ -0,0 +1,117 @@
+import json
+import os
+import threading
+import pandas as pd
+import pytest
+from src.data.project_dataset import ProjectDataset, _RSSSampler, preload_datasets
+
+
+class _FakeDataset:
+    def __init__(self, name, fail=False):
+        self.name, self.fail = name, fail
+
+    @property
+    def df(self) -> pd.DataFrame:
+        if self.fail:
+            raise FileNotFoundError(f"{self.name}.csv")
+        return pd.DataFrame({"a": range(10)})
+
+
+def _running_samplers() -> list[_RSSSampler]:
+    samplers = [thread for thread in threading.enumerate() if isinstance(thread, _RSSSampler)]
+    for sampler in samplers:
+        sampler.join(timeout=1)
+    return [sampler for sampler in samplers if sampler.is_alive()]
+
+
+def test_preload_datasets_reports_and_raises_the_failures(capsys):
+    with pytest.raises(FileNotFoundError):
+        preload_datasets([_FakeDataset("ok"), _FakeDataset("broken", fail=True)])
+    out = capsys.readouterr().out
+    assert "Failed to preload broken: FileNotFoundError" in out
+    assert "ok" in out # The datasets which loaded are still reported
+    assert not _running_samplers()
+
+
+def test_preload_datasets_reports_the_failures_in_the_background(capsys):
+    futures = preload_datasets([_FakeDataset("ok"), _FakeDataset("broken", fail=True)], background=True)
+    assert futures["ok"].result()["df_bytes"] > 0
+    with pytest.raises(FileNotFoundError):
+        futures["broken"].result()
+    for thread in threading.enumerate():
+        if thread.name == "preload-report":
+            thread.join(timeout=5)
+    assert "Failed to preload broken: FileNotFoundError" in capsys.readouterr().out
+    assert not _running_samplers()
+
+
+# ============ ============ Arrow sidecars ============ ============
+
+def _dataset(path) -> ProjectDataset:
+    return ProjectDataset(str(path), "movies", "Test movies", {"title": "The title", "year": "The release year"},
+                          dtypes={"title": "string[pyarrow]", "year": "int32"})
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "movies.csv"
+    path.write_text("title,year\nHeat,1995\nAlien,1979\n")
+    return path
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    # The number of times the raw files are parsed
+    calls = []
+    read_source = ProjectDataset._read_source
+    monkeypatch.setattr(ProjectDataset, "_read_source", lambda self, *args, **kwargs: calls.append(self.path) or read_source(self, *args, **kwargs))
+    return calls
+
+
+def _touch(path, seconds=10):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 10**9))
+
+
+def test_sidecar_is_reused_by_later_loads(source, parses):
+    first = _dataset(source).df
+    assert _dataset(source).cache_path.is_file()
+    second = _dataset(source).df
+    assert len(parses) == 1
+    pd.testing.assert_frame_equal(first, second)
+    assert second["title"].dtype == "string[pyarrow]" and second["year"].dtype == "int32"
+
+
+def test_sidecar_is_invalidated_when_the_size_changes(source, parses):
+    _dataset(source).df
+    with open(source, "a") as f:
+        f.write("Up,2009\n")
+    assert _dataset(source).df["title"].tolist() == ["Heat", "Alien", "Up"]
+    assert len(parses) == 2
+
+
+def test_sidecar_is_invalidated_when_the_content_changes(source, parses):
+    _dataset(source).df
+    source.write_text("title,year\nHeat,1986\nAlien,1979\n") # Same size
+    _touch(source)
+    assert _dataset(source).df["year"].tolist() == [1986, 1979]
+    assert len(parses) == 2
+
+
+def test_sidecar_survives_a_touch_of_the_same_content(source, parses):
+    dataset = _dataset(source)
+    dataset.df
+    _touch(source)
+    assert _dataset(source).df["year"].tolist() == [1995, 1979]
+    assert len(parses) == 1
+    # The new mtime is stored, so that the next load does not hash the file again
+    assert dataset._cached_fingerprint()["mtime_ns"] == str(os.stat(source).st_mtime_ns)
+
+
+def test_sidecar_is_invalidated_when_the_dtypes_change(source, parses):
+    _dataset(source).df
+    dataset = _dataset(source)
+    dataset.dtypes = {"year": "int64"}
+    assert dataset.df["year"].dtype == "int64"
+    assert len(parses) == 2
+    assert json.loads(dataset._cached_fingerprint()["dtypes"]) == {"year": "int64"}
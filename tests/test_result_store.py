@@ -0,0 +1,69 @@
+import os
+import numpy as np
+import pandas as pd
+from src.utils.constants import NOTEBOOK_RUNCONFIG as cfg
+from src.utils.result_store import MANIFEST, ResultStore
+
+
+def _leaves(store, key):
+    return sorted(path.suffix for path in (store.root / key).iterdir() if path.name != MANIFEST)
+
+
+def test_result_store_roundtrips_the_frames_arrays_and_objects(tmp_path):
+    store = ResultStore(tmp_path)
+    frame = pd.DataFrame({"title": pd.array(["Heat", None], dtype="string[pyarrow]"), "year": np.array([1995, 1979], dtype=np.int16),
+                          "score": [0.5, np.nan]}, index=pd.Index([10, 20], name="wikipedia_id"))
+    series = pd.Series([1.0, 2.0], index=["a", "b"], name="wins")
+    array = np.arange(12, dtype=np.int32).reshape(3, 4)
+    lists = pd.DataFrame({"genres": [["Comedy"], []]}) # Parquet would not roundtrip the lists as lists
+    value = {"frame": frame, "pair": (series, array), "lists": lists, "meta": {"n": 3}}
+
+    store.put("key", value, "tests.stage")
+    assert _leaves(store, "key") == [".npz", ".parquet", ".parquet", ".pkl", ".pkl"]
+    found, loaded = store.get("key")
+    assert found
+    pd.testing.assert_frame_equal(loaded["frame"], frame)
+    assert isinstance(loaded["pair"], tuple)
+    pd.testing.assert_series_equal(loaded["pair"][0], series)
+    assert loaded["pair"][1].dtype == np.int32 and np.array_equal(loaded["pair"][1], array)
+    pd.testing.assert_frame_equal(loaded["lists"], lists)
+    assert loaded["meta"] == {"n": 3}
+
+    assert store.get("missing") == (False, None)
+    entry = store.entries().iloc[0]
+    assert entry["key"] == "key" and entry["function"] == "tests.stage" and entry["nbytes"] > 0
+
+
+def _put_entries(store, keys):
+    # Entries of the same size, used in the order of `keys`
+    for i, key in enumerate(keys):
+        store.put(key, np.full(1000, i, dtype=np.float64), f"tests.{key}")
+        os.utime(store.root / key / MANIFEST, (1_000_000 + i, 1_000_000 + i))
+    return store.entries()["nbytes"].max()
+
+
+def test_result_store_evicts_the_least_recently_used_entries(tmp_path, monkeypatch):
+    nbytes = _put_entries(ResultStore(tmp_path, max_bytes=10**9), ["a", "b", "c"])
+    store = ResultStore(tmp_path, max_bytes=int(2.5 * nbytes))
+    assert store.get("a")[0] # Now the most recently used
+    assert store.evict() == 1
+    assert sorted(store.entries()["key"]) == ["a", "c"]
+
+    store.put("d", np.zeros(1000), "tests.d") # Evicts "c"
+    assert store.entries()["key"].tolist() == ["d", "a"]
+    assert store.get("c") == (False, None)
+
+    monkeypatch.setattr(cfg, "RESULT_STORE_MAX_BYTES", nbytes) # The default budget
+    assert ResultStore(tmp_path).evict() == 1
+    assert store.entries()["key"].tolist() == ["d"]
+
+
+def test_result_store_purges_by_function(tmp_path):
+    store = ResultStore(tmp_path)
+    for key, function in [("a", "src.utils.data_utils.summarize_oscars"), ("b", "src.utils.data_utils.prepro_cmu_movies"),
+                          ("c", "src.utils.data_utils.summarize_oscars")]:
+        store.put(key, pd.DataFrame({"x": [1]}), function)
+    assert store.purge("summarize_oscars") == 2
+    assert store.entries()["key"].tolist() == ["b"]
+    assert store.purge() == 1
+    assert store.entries().empty and not any(tmp_path.iterdir())
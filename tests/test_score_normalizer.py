@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.utils.data_utils import ScoreStatus, mrt_normalize_scores
+
+S = ScoreStatus
+CASES = [
+    # Fractions
+    ("3/4", 0.75, S.FRACTION),
+    (" 3.5 / 5 ", 3.5 / 5, S.FRACTION),
+    ("7 out of 10", 7 / 10, S.FRACTION),
+    ("7 OF 10", 7 / 10, S.FRACTION),
+    (".5/1", 0.5, S.FRACTION),
+    ("+3/4", 0.75, S.FRACTION),
+    ("0/4", 0.0, S.FRACTION),
+    # Letter grades, F..A+ evenly spaced
+    ("A+", 1.0, S.LETTER),
+    ("a-", 10 / 12, S.LETTER),
+    ("B+", 9 / 12, S.LETTER),
+    ("C -", 4 / 12, S.LETTER),
+    ("F", 0.0, S.LETTER),
+    # Percentages
+    ("85%", 85 / 100, S.PERCENT),
+    ("100 %", 1.0, S.PERCENT),
+    # Stars, out of 5
+    ("3.5 stars", 3.5 / 5, S.STARS),
+    ("1 Star", 1 / 5, S.STARS),
+    # Out of range
+    ("5/4", np.nan, S.OUT_OF_RANGE),
+    ("120%", np.nan, S.OUT_OF_RANGE),
+    ("6 stars", np.nan, S.OUT_OF_RANGE),
+    # Garbage
+    ("3.5", np.nan, S.UNPARSED),
+    ("2/0", np.nan, S.UNPARSED),
+    ("-1/4", np.nan, S.UNPARSED),
+    ("B++", np.nan, S.UNPARSED),
+    ("great", np.nan, S.UNPARSED),
+    # Missing
+    ("", np.nan, S.MISSING),
+    ("   ", np.nan, S.MISSING),
+    (None, np.nan, S.MISSING),
+    (np.nan, np.nan, S.MISSING),
+]
+
+
+@pytest.mark.parametrize("raw,score,status", CASES)
+def test_mrt_normalize_scores(raw, score, status):
+    result = mrt_normalize_scores(pd.Series([raw], dtype=object)).iloc[0]
+    assert result["status"] == status
+    if np.isnan(score):
+        assert np.isnan(result["score"])
+    else:
+        assert result["score"] == np.float32(score)
+
+
+def test_mrt_normalize_scores_broadcasts_to_the_rows():
+    raws = [raw for raw, _, _ in CASES]
+    scores = pd.Series(raws + raws[::-1], index=np.arange(2 * len(raws))[::-1] * 10, dtype=object)
+    result = mrt_normalize_scores(scores)
+    assert result.index.equals(scores.index)
+    assert result.dtypes.tolist() == [np.float32, np.int8]
+    expected_status = [status for _, _, status in CASES]
+    assert result["status"].tolist() == expected_status + expected_status[::-1]
+    expected_score = np.array([score for _, score, _ in CASES], dtype=np.float32)
+    np.testing.assert_array_equal(result["score"].to_numpy(), np.concatenate([expected_score, expected_score[::-1]]))
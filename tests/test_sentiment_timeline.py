@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+from src.utils.data_utils import SentimentTimeline
+
+
+def _reviews():
+    return pd.DataFrame({
+        'id': ['a', 'a', None, 'b', 'b', 'b'],
+        'creationDate': ['2020-01-01', '2020-01-01', '2020-01-02', None, '2020-01-03', '2020-01-10'],
+        'sa': [0.5, np.nan, 0.1, 0.2, -0.4, 0.8],
+    })
+
+
+def test_from_reviews_drops_reviews_without_date_or_movie():
+    timeline = SentimentTimeline.from_reviews(_reviews())
+    assert list(timeline.ids) == ['a', 'b']
+    assert timeline.n.tolist() == [2, 1, 1]
+    assert timeline.n_sa.tolist() == [1, 1, 1]
+    assert np.allclose(timeline.sa_sum, [0.5, -0.4, 0.8])
+
+
+def test_window_is_relative_to_the_first_review():
+    timeline = SentimentTimeline.from_reviews(_reviews())
+    window = timeline.window(start=0, end=7)
+    assert window.loc['a', 'n'] == 2 and window.loc['b', 'n'] == 1
+    assert np.isclose(window.loc['b', 'sa_sum'], -0.4)
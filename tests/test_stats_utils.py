@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+from src.utils import stats_utils
+from src.utils.stats_utils import compare_groups
+
+
+def _groups(seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(0.5, 1, 300), rng.normal(0, 1, 400)
+
+
+def test_compare_groups_runs_in_process_by_default(monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("compare_groups started a process pool")
+    monkeypatch.setattr(stats_utils, "ProcessPoolExecutor", no_pool)
+    comparison = compare_groups(*_groups(), n_resamples=2_000)
+    assert comparison.p_permutation < 0.05
+    assert comparison.ci_low < comparison.difference < comparison.ci_high
+
+
+def test_compare_groups_does_not_depend_on_the_number_of_processes():
+    a, b = _groups(1)
+    in_process = compare_groups(a, b, n_resamples=2_000, n_jobs=1)
+    in_pool = compare_groups(a, b, n_resamples=2_000, n_jobs=2)
+    assert in_process == in_pool
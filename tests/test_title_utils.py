@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+from src.utils.title_utils import NameIndex, TitleIndex, normalize_names, normalize_titles
+
+
+def _matches(match):
+    return dict(zip(match.query_rows.tolist(), match.index_rows.tolist()))
+
+
+def test_normalize_titles_folds_articles_punctuation_and_unicode():
+    titles = pd.Series(["The Godfather", "Godfather, The", "Amélie", "AMELIE!", "Mr. & Mrs. Smith", "Mr and Mrs Smith",
+                        "An American in Paris", "American in Paris, An", "Star Wars: Episode IV", "star wars - episode iv",
+                        "Le Samouraï", "Samourai", None, "?!"], index=np.arange(14) * 3)
+    normalized = normalize_titles(titles)
+    assert normalized.index.equals(titles.index)
+    values = normalized.tolist()
+    for i in range(0, 12, 2):
+        assert values[i] == values[i + 1], (titles.iloc[i], titles.iloc[i + 1])
+    assert len(set(values[:12])) == 6
+    assert pd.isna(values[12]) and pd.isna(values[13])
+
+
+def test_match_keeps_the_closest_year_within_the_tolerance():
+    index = TitleIndex.build(pd.Series(["Heat", "Heat", "Alien", "Alien"]), pd.Series([1986, 1995, 1979, 1981]))
+    queries = pd.Series(["heat", "Heat", "Heat", "Alien", "Alien"])
+    match = index.match(queries, pd.Series([1995, 1987, 1990, 1980, 1982]), tolerance=1)
+    assert _matches(match) == {0: 1, 1: 0, 3: 2, 4: 3} # 1990 is too far from both, 1980 is a tie: the first indexed one
+    assert match.year_gaps.tolist() == [0, 1, 1, 1]
+    assert match.n_candidates.tolist() == [1, 1, 2, 1]
+    report = match.report()
+    assert report["matched"] == 4 and report["same_year"] == 1 and report["within_tolerance"] == 3 and report["ambiguous"] == 1
+
+    assert _matches(index.match(queries, pd.Series([1995, 1987, 1990, 1980, 1982]), tolerance=0)) == {0: 1}
+    assert _matches(index.match(pd.Series(["Heat"]), pd.Series([1990]), tolerance=5)) == {0: 0} # Four and five years: the closest
+
+
+def test_match_falls_back_on_the_only_undated_movie():
+    index = TitleIndex.build(pd.Series(["Casablanca", "Vertigo", "Vertigo", "Psycho"]), pd.Series([None, None, None, 1960]))
+    match = index.match(pd.Series(["Casablanca", "Vertigo", "Psycho", "Psycho"]), pd.Series([1942, 1958, 1998, None]), tolerance=1)
+    assert _matches(match) == {0: 0} # Two undated "Vertigo" cannot be told apart, and a dated movie is not a fallback
+    assert match.year_gaps.tolist() == [-1]
+
+
+def test_match_leaves_the_unknown_titles_unmatched_without_a_cartesian_product():
+    n = 200 # Remakes: a raw join on the titles would produce n * n rows
+    years = (np.arange(n) * 2 + 1800).tolist()
+    index = TitleIndex.build(pd.Series(["Hamlet"] * n + ["Heat"]), pd.Series(years + [1995]))
+    queries = pd.Series(["Hamlet"] * n + ["Vertigo", None, "Heat"])
+    match = index.match(queries, pd.Series(years + [1958, 1995, None]), tolerance=1)
+    assert _matches(match) == {i: i for i in range(n)}
+    assert match.n_queries == n + 3 and match.report()["match_rate"] == n / (n + 3)
+
+
+def test_normalize_names_ignores_case_spacing_punctuation_and_accents():
+    names = pd.Series(["Danny DeVito", "danny de vito", "Danny De-Vito", "Pénélope Cruz", "PENELOPE CRUZ", "Penelope Ann Miller",
+                       None, " - "])
+    normalized = normalize_names(names).tolist()
+    assert normalized[:3] == ["dannydevito"] * 3
+    assert normalized[3] == normalized[4] == "penelopecruz" != normalized[5]
+    assert pd.isna(normalized[6]) and pd.isna(normalized[7])
+
+
+def test_name_index_looks_up_the_normalized_names():
+    index = NameIndex.build(pd.Series(["Tom Hanks", None, "Al Pacino", "tom hanks"]))
+    assert index.codes.tolist() == [0, -1, 1, 0]
+    assert index.lookup(pd.Series(["AL PACINO", "Tom  Hanks", "Tom Hank", None])).tolist() == [1, 0, -1, -1]